@@ -11,7 +11,7 @@ from .cry_names import cry_names
 
 from .gbz80disasm import get_global_address, get_local_address
 from .labels import line_has_label
-from .crystal import music_classes as sound_classes
+from .crystal import music_command_table as sound_command_table
 from .crystal import (
     Command,
     SingleByteParam,
@@ -20,12 +20,12 @@ from .crystal import (
     load_rom,
 )
 
-rom = load_rom()
-rom = bytearray(rom)
-
 from . import configuration
 conf = configuration.Config()
 
+# the command classes read crystal's rom, so share it
+rom = load_rom()
+
 
 def is_comment(asm):
 	return asm.startswith(';')
@@ -340,9 +340,9 @@ class Channel:
 		return text
 
 	def get_sound_class(self, i):
-		for class_ in sound_classes:
-			if class_.id == i:
-				return class_
+		class_ = sound_command_table[i]
+		if class_ is not None:
+			return class_
 		if self.sfx:
 			if self.channel in [4, 8]:
 				return Noise
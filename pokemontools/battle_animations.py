@@ -14,6 +14,7 @@ from .crystal import (
 	DecimalParam,
 	BigEndianParam,
 	Command,
+	get_command_table,
 	load_rom
 )
 
@@ -23,7 +24,7 @@ from .audio import sort_asms
 
 from .wram import read_constants
 
-rom = bytearray(load_rom())
+rom = load_rom()
 
 sfx_constants = read_constants(os.path.join(conf.path, 'constants/sfx_constants.asm'))
 class SoundEffectParam(SingleByteParam):
@@ -137,6 +138,7 @@ def create_battle_animation_classes():
 	return classes
 
 battle_animation_classes = create_battle_animation_classes()
+battle_animation_table = get_command_table(battle_animation_classes)
 
 
 class BattleAnimWait(Command):
@@ -249,10 +251,7 @@ class BattleAnim:
 	def get_command_class(self, cmd):
 		if cmd < 0xd0:
 			return BattleAnimWait
-		for class_ in self.macros:
-			if class_.id == cmd:
-				return class_
-		return None
+		return get_command_table(self.macros)[cmd]
 
 
 def battle_anim_label(i):
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized planar 2bpp graphics, using numpy.
+
+Each function only handles regularly shaped images, and returns None for
+anything else so the caller can fall back to the pure python version in gfx.
+Everything returns None if numpy isn't installed.
+"""
+
+import functools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def vectorized(function):
+    """
+    Return None instead of calling <function> if numpy isn't available.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if numpy is None:
+            return None
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def get_tiles(image):
+    """
+    Return 2bpp image data as an array of 16-byte tiles.
+    """
+    data = numpy.frombuffer(bytes(bytearray(image)), dtype=numpy.uint8)
+    return data[:len(data) - len(data) % 0x10].reshape(-1, 0x10)
+
+
+def to_bytes(tiles):
+    return bytearray(numpy.ascontiguousarray(tiles, dtype=numpy.uint8).tobytes())
+
+
+@vectorized
+def to_lines(image, width):
+    """
+    Convert planar 2bpp image data to a 2d array of quaternary pixels.
+    """
+    if width % 8 or len(image) % 0x10:
+        return None
+    num_columns = width // 8
+    tiles = get_tiles(image)
+    if len(tiles) % num_columns:
+        return None
+    num_rows = len(tiles) // num_columns
+
+    # Each strip is a byte of low bits followed by a byte of high bits.
+    strips = tiles.reshape(num_rows, num_columns, 8, 2, 1)
+    bits = numpy.unpackbits(strips, axis=-1)
+    pixels = bits[..., 0, :] | (bits[..., 1, :] << 1)
+
+    return pixels.transpose(0, 2, 1, 3).reshape(num_rows * 8, width)
+
+
+@vectorized
+def from_lines(pixels, width):
+    """
+    Convert quaternary pixels, <width> to a line, to planar 2bpp image data.
+
+    Images less than a tile high are stored as short tiles.
+    """
+    if not width or len(pixels) % width:
+        return None
+    lines = numpy.frombuffer(bytes(bytearray(pixels)), dtype=numpy.uint8).reshape(-1, width)
+    height = len(lines)
+    tile_height = min(height, 8)
+    if width % 8 or not tile_height or height % tile_height:
+        return None
+    num_rows, num_columns = height // tile_height, width // 8
+
+    tiles = lines.reshape(num_rows, tile_height, num_columns, 8).transpose(0, 2, 1, 3)
+    bottom = numpy.packbits(tiles & 1, axis=-1)
+    top = numpy.packbits(tiles >> 1 & 1, axis=-1)
+    return to_bytes(numpy.concatenate([bottom, top], axis=-1))
+
+
+@vectorized
+def transpose_tiles(image, width):
+    """
+    Transpose a tile arrangement along line y=-x. See gfx.transpose.
+    """
+    if len(image) % 0x10:
+        return None
+    tiles = get_tiles(image)
+    order = numpy.argsort(numpy.arange(len(tiles)) % width, kind='stable')
+    return to_bytes(tiles[order])
+
+
+@vectorized
+def interleave_tiles(image, width):
+    """
+    See gfx.interleave.
+    """
+    if len(image) % 0x10:
+        return None
+    tiles = get_tiles(image)
+    if len(tiles) % (width * 2):
+        return None
+    tiles = tiles.reshape(-1, width, 2, 0x10).transpose(0, 2, 1, 3)
+    return to_bytes(tiles)
+
+
+@vectorized
+def deinterleave_tiles(image, width):
+    """
+    See gfx.deinterleave.
+    """
+    if len(image) % 0x10:
+        return None
+    tiles = get_tiles(image)
+    if len(tiles) % (width * 2):
+        return None
+    tiles = tiles.reshape(-1, 2, width, 0x10).transpose(0, 2, 1, 3)
+    return to_bytes(tiles)
+
+
+@vectorized
+def transpose_pics(image, w, h):
+    """
+    Transpose each w*h-tile pic in an image of consecutive pics.
+    Any trailing tiles are left alone.
+    """
+    pic_length = w * h * 0x10
+    length = len(image) - len(image) % pic_length
+    tiles = get_tiles(image[:length]).reshape(-1, w, h, 0x10).transpose(0, 2, 1, 3)
+    return to_bytes(tiles) + bytearray(image[length:])
+
+
+@vectorized
+def arrange_pics(image, width, w, h):
+    """
+    Cut w*h-tile pics out of an image <width> tiles wide, left to right
+    and then top to bottom, and transpose each one.
+    """
+    if len(image) % 0x10:
+        return None
+    tiles = get_tiles(image)
+    if width % w or len(tiles) % (width * h):
+        return None
+    tiles = tiles.reshape(-1, h, width // w, w, 0x10).transpose(0, 2, 3, 1, 4)
+    return to_bytes(tiles)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache for build outputs, keyed by a hash of their inputs.
+"""
+
+import os
+import hashlib
+import tempfile
+
+
+def hash_key(*parts):
+    """
+    Hash some data and settings into a cache key.
+    """
+    sha = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            part = bytes(part)
+        else:
+            part = repr(part).encode('utf-8')
+        sha.update('{}:'.format(len(part)).encode('utf-8'))
+        sha.update(part)
+    return sha.hexdigest()
+
+
+class Cache(object):
+    """
+    A directory of files named by key, evicting the least recently used
+    entries when the total size goes over max_size.
+
+    Entries are written to a temporary file and renamed into place, so
+    several processes can share a cache.
+    """
+
+    def __init__(self, path, max_size=0x4000000):
+        self.path = path
+        self.max_size = max_size
+        self.size = None
+
+    def get_filename(self, key):
+        return os.path.join(self.path, key)
+
+    def get(self, key):
+        """
+        Return the data stored for key, or None.
+        """
+        filename = self.get_filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                data = bytearray(f.read())
+            # Keep track of use for eviction.
+            os.utime(filename, None)
+        except (IOError, OSError):
+            return None
+        return data
+
+    def set(self, key, data):
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                if not os.path.isdir(self.path):
+                    raise
+
+        handle, temp = tempfile.mkstemp(dir=self.path, prefix='.')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(bytearray(data))
+        try:
+            os.rename(temp, self.get_filename(key))
+        except OSError:
+            # Someone else got there first.
+            os.remove(temp)
+            return
+
+        if self.size is None:
+            self.size = self.get_size()
+        else:
+            self.size += len(data)
+        if self.size > self.max_size:
+            self.evict()
+
+    def get_entries(self):
+        """
+        Return (mtime, size, filename) for each entry, oldest first.
+        """
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for name in os.listdir(self.path):
+            if name.startswith('.'):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+        return sorted(entries)
+
+    def get_size(self):
+        return sum(size for mtime, size, filename in self.get_entries())
+
+    def evict(self, target=None):
+        """
+        Remove the least recently used entries until the cache is under target
+        (by default, three quarters of max_size, so eviction doesn't run on every write).
+        """
+        if target is None:
+            target = self.max_size * 3 // 4
+        entries = self.get_entries()
+        size = sum(size for mtime, size, filename in entries)
+        for mtime, entry_size, filename in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            size -= entry_size
+        self.size = size
+
+    def clear(self):
+        self.evict(target=0)
@@ -9,20 +9,20 @@ from .crystal import (
     get_label_from_line,
     get_address_from_line_comment,
     AsmSection,
-    direct_load_rom,
     direct_load_asm,
 )
 
 from .romstr import (
-    RomStr,
     AsmList,
 )
 
+from .romimage import load_rom_image
+
 def load_rom(path):
     """
-    Load a ROM file into an abbreviated RomStr object.
+    Load a ROM file into a RomImage.
     """
-    return direct_load_rom(filename=path)
+    return load_rom_image(path)
 
 def load_asm(path):
     """
@@ -38,6 +38,15 @@ class Config(object):
         if "save_state_path" not in self._config:
             self._config["save_state_path"] = os.path.join(self._config["path"], "save-states/")
 
+        # cached build outputs go into ./.pokemontools-cache/
+        if "cache_path" not in self._config:
+            self._config["cache_path"] = os.path.join(self._config["path"], ".pokemontools-cache/")
+
+        # anything that isn't safe to share goes into ~/.cache/pokemontools/
+        if "user_cache_path" not in self._config:
+            user_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            self._config["user_cache_path"] = os.path.join(user_cache, "pokemontools/")
+
         # assume rom is at ./baserom.gbc
         if "rom" not in self._config:
             self._config["rom_path"] = os.path.join(self._config["path"], "baserom.gbc")
@@ -12,6 +12,13 @@ import json
 from copy import copy, deepcopy
 import subprocess
 import logging
+import hashlib
+import threading
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 # for capwords
 import string
@@ -51,6 +58,7 @@ from . import chars
 from . import labels
 from . import pksv
 from . import romstr
+from . import sym
 from . import pointers
 from . import interval_map
 from . import trainers
@@ -66,6 +74,8 @@ is_valid_address = addresses.is_valid_address
 from . import old_text_script
 OldTextScript = old_text_script
 
+from . import cache
+from .romimage import load_rom_image
 from . import configuration
 conf = configuration.Config()
 
@@ -118,16 +128,14 @@ def map_name_cleaner(input):
                  replace("hooh", "HoOh").\
                  replace(" ", "")
 
-rom = romstr.RomStr(None)
+rom = None
 
 def direct_load_rom(filename=None):
-    """loads bytes into memory"""
+    """maps the rom into memory, sharing it with anything else that loaded it"""
     if filename == None:
         filename = os.path.join(conf.path, "baserom.gbc")
     global rom
-    file_handler = open(filename, "rb")
-    rom = romstr.RomStr(file_handler.read())
-    file_handler.close()
+    rom = load_rom_image(filename)
     return rom
 
 def load_rom(filename=None):
@@ -167,7 +175,7 @@ def rom_until(offset, byte, rom=None, strings=True, debug=True):
     return rom.until(offset, byte, strings=strings, debug=debug)
 
 def how_many_until(byte, starting, rom):
-    index = rom.find(byte, starting)
+    index = rom.find(bytearray([byte]), starting)
     return index - starting
 
 def load_map_group_offsets(map_group_pointer_table, map_group_count, rom=None):
@@ -185,18 +193,18 @@ def calculate_pointer_from_bytes_at(address, bank=False):
     """calculates a pointer from 2 bytes at a location
     or 3-byte pointer [bank][2-byte pointer] if bank=True"""
     if bank == True:
-        bank = ord(rom[address])
+        bank = rom[address]
         address += 1
     elif bank == False or bank == None:
         bank = pointers.calculate_bank(address)
     elif bank == "reverse" or bank == "reversed":
-        bank = ord(rom[address+2])
+        bank = rom[address+2]
     elif type(bank) == int:
         pass
     else:
         raise Exception("bad bank given to calculate_pointer_from_bytes_at")
-    byte1 = ord(rom[address])
-    byte2 = ord(rom[address+1])
+    byte1 = rom[address]
+    byte2 = rom[address+1]
     temp  = byte1 + (byte2 << 8)
     if temp == 0:
         return None
@@ -298,7 +306,7 @@ class TextScript(object):
         if self.address in [0x26ef, 0x26f2, 0x6ee, 0x1071, 0x5ce33, 0x69523, 0x7ee98, 0x72176, 0x7a578, 0x19c09b, 0x19768c]:
             return None
 
-        text_command_classes = self.text_command_classes
+        text_command_table = get_command_table(self.text_command_classes)
         script_parse_table = self.script_parse_table
         current_address = copy(self.address)
         start_address = copy(current_address)
@@ -329,15 +337,10 @@ class TextScript(object):
         # for each command found...
         while not end:
             # get the current scripting byte
-            cur_byte = ord(rom[current_address])
-
-            # reset the command class (last command was probably different)
-            scripting_command_class = None
+            cur_byte = rom[current_address]
 
             # match the command id byte to a scripting command class like MainText
-            for class_ in text_command_classes:
-                if class_[1].id == cur_byte:
-                    scripting_command_class = class_[1]
+            scripting_command_class = text_command_table[cur_byte]
 
             if self.address == 0x9c00e and self.debug:
                 if current_address > 0x9c087:
@@ -460,9 +463,9 @@ class EncodedText(object):
         offset = self.address
 
         # read until $57, $50 or $58
-        jump57 = how_many_until(chr(0x57), offset, rom)
-        jump50 = how_many_until(chr(0x50), offset, rom)
-        jump58 = how_many_until(chr(0x58), offset, rom)
+        jump57 = how_many_until(0x57, offset, rom)
+        jump50 = how_many_until(0x50, offset, rom)
+        jump58 = how_many_until(0x58, offset, rom)
 
         # whichever command comes first
         jump = min([jump57, jump50, jump58])
@@ -498,8 +501,7 @@ class EncodedText(object):
 
         line_count = 0
         current_line = []
-        for pbyte in subsection:
-            byte = ord(pbyte)
+        for byte in bytearray(subsection):
             current_line.append(byte)
             if  byte == 0x4f or byte == 0x51 or byte == 0x55:
                 lines[line_count] = current_line
@@ -755,7 +757,7 @@ class SingleByteParam():
         # parse bytes from ROM
         self.parse()
 
-    def parse(self): self.byte = ord(rom[self.address])
+    def parse(self): self.byte = rom[self.address]
 
     def get_dependencies(self, recompute=False, global_dependencies=set()):
         return []
@@ -1053,9 +1055,9 @@ class MoneyByteParam(MultiByteParam):
         return str(z) + "\ndb "+str(y)+"\ndb "+str(x)
 
 def read_money(address, dohex=False):
-    z = ord(rom[address])
-    y = ord(rom[address+1])
-    x = ord(rom[address+2])
+    z = rom[address]
+    y = rom[address+1]
+    x = rom[address+2]
     answer = x + (y << 8) + (z << 16)
     if not dohex:
         return answer
@@ -1077,7 +1079,7 @@ class CoinByteParam(MultiByteParam):
 
 class MapGroupParam(SingleByteParam):
     def to_asm(self):
-        map_id = ord(rom[self.address+1])
+        map_id = rom[self.address+1]
         map_constant_label = get_map_constant_label(map_id=map_id, map_group=self.byte, map_internal_ids=self.map_internal_ids) # like PALLET_TOWN
         if map_constant_label == None:
             return str(self.byte)
@@ -1089,10 +1091,10 @@ class MapGroupParam(SingleByteParam):
 class MapIdParam(SingleByteParam):
     def parse(self):
         SingleByteParam.parse(self)
-        self.map_group = ord(rom[self.address-1])
+        self.map_group = rom[self.address-1]
 
     def to_asm(self):
-        map_group = ord(rom[self.address-1])
+        map_group = rom[self.address-1]
         map_constant_label = get_map_constant_label(map_id=self.byte, map_group=map_group, map_internal_ids=self.map_internal_ids)
         if map_constant_label == None:
             return str(self.byte)
@@ -1273,6 +1275,9 @@ class Command(object):
     is_rgbasm_macro = False
     base_label = "UnseenLabel_"
 
+    # made on first use, see label
+    _label = None
+
     def __init__(self, address=None, *pargs, **kwargs):
         """params:
         address     - where the command starts
@@ -1287,9 +1292,6 @@ class Command(object):
         # set up some variables
         self.address = address
         self.last_address = None
-        # setup the label based on base_label if available
-        label = self.base_label + hex(self.address)
-        self.label = Label(name=label, address=address, object=self)
         # params are where this command's byte parameters are stored
         self.params = {}
         self.dependencies = None
@@ -1303,6 +1305,20 @@ class Command(object):
         # start parsing this command's parameter bytes
         self.parse()
 
+    @property
+    def label(self):
+        """
+        The label based on base_label. Most commands never need one, so it
+        isn't made until something asks for it.
+        """
+        if self._label is None:
+            self._label = Label(name=self.base_label + hex(self.address), address=self.address, object=self)
+        return self._label
+
+    @label.setter
+    def label(self, label):
+        self._label = label
+
     def get_dependencies(self, recompute=False, global_dependencies=set()):
         dependencies = []
         #if self.dependencies != None and not recompute:
@@ -1367,16 +1383,18 @@ class Command(object):
             current_address = self.address+1
         else:
             current_address = self.address
-        byte = ord(rom[self.address])
+        byte = rom[self.address]
         if not self.override_byte_check and (not byte == self.id):
             raise Exception("byte ("+hex(byte)+") != self.id ("+hex(self.id)+")")
         i = 0
+        # every param gets the same settings
+        args = dict((k, v) for (k, v) in self.args.items() if k != "parent")
         for (key, param_type) in self.param_types.items():
             name = param_type["name"]
             klass = param_type["class"]
             # make an instance of this class, like SingleByteParam()
             # or ItemLabelByte.. by making an instance, obj.parse() is called
-            obj = klass(address=current_address, name=name, parent=self, **dict([(k,v) for (k, v) in self.args.items() if k not in ["parent"]]))
+            obj = klass(address=current_address, name=name, parent=self, **args)
             # save this for later
             self.params[i] = obj
             # increment our counters
@@ -1403,7 +1421,7 @@ class GivePoke(Command):
 
     def parse(self):
         self.params = {}
-        byte = ord(rom[self.address])
+        byte = rom[self.address]
         if not byte == self.id:
             raise Exception("this should never happen")
         current_address = self.address+1
@@ -1498,7 +1516,7 @@ class MovementCommand(Command):
     #    return []
 
     def parse(self):
-        if ord(rom[self.address]) < 0x45:
+        if rom[self.address] < 0x45:
             # this is mostly handled in to_asm
             pass
         else:
@@ -1562,6 +1580,35 @@ movement_command_bases = {
     0x55: ["step_shake", ["displacement", DecimalParam]],
 }
 
+# command byte -> (classes, table), see get_command_table
+command_tables = {}
+
+def get_command_table(classes):
+    """
+    Return a list of the command class for each byte, built once for each
+    list of command classes. Classes can also be given as (name, class)
+    pairs, the way inspect.getmembers returns them.
+
+    When more than one class has the same id, the last one wins, same as
+    looping over the whole list.
+    """
+    key = id(classes)
+    if key in command_tables and command_tables[key][0] is classes:
+        return command_tables[key][1]
+
+    table = [None] * 0x100
+    for class_ in classes:
+        if type(class_) == tuple:
+            class_ = class_[1]
+        # allow lists of ids
+        ids = class_.id if type(class_.id) == list else [class_.id]
+        for id_ in ids:
+            if id_ is not None and 0 <= id_ < len(table):
+                table[id_] = class_
+
+    command_tables[key] = (classes, table)
+    return table
+
 # create MovementCommands from movement_command_bases
 def create_movement_commands(debug=False):
     """
@@ -1627,6 +1674,7 @@ def create_movement_commands(debug=False):
     return movement_command_classes2
 
 movement_command_classes = create_movement_commands()
+movement_command_table = get_command_table(movement_command_classes)
 
 all_movements = []
 class ApplyMovementData(object):
@@ -1690,20 +1738,13 @@ class ApplyMovementData(object):
         # for each command found...
         while not end:
             # get the current scripting byte
-            cur_byte = ord(rom[current_address])
-
-            # reset the command class (last command was probably different)
-            scripting_command_class = None
+            cur_byte = rom[current_address]
 
             # match the command id byte to a scripting command class like "step half"
-            for class_ in movement_command_classes:
-                # allow lists of ids
-                if (type(class_.id) == list and cur_byte in class_.id) \
-                   or class_.id == cur_byte:
-                    scripting_command_class = class_
+            scripting_command_class = movement_command_table[cur_byte]
 
             # temporary fix for applymovement scripts
-            if ord(rom[current_address]) == 0x47:
+            if rom[current_address] == 0x47:
                 end = True
 
             # no matching command found
@@ -1711,7 +1752,7 @@ class ApplyMovementData(object):
             if scripting_command_class == None:
                 scripting_command_class = MovementDBCommand
                 #scripting_command_class = deepcopy(MovementCommand)
-                #scripting_command_class.id = scripting_command_class.byte = ord(rom[current_address])
+                #scripting_command_class.id = scripting_command_class.byte = rom[current_address]
                 #scripting_command_class.macro_name = "db"
                 #scripting_command_class.size = 1
                 #scripting_command_class.override_byte_check = True
@@ -1815,9 +1856,9 @@ class MainText(TextCommand):
             offset = offset + 1
 
         # read until $50, $57 or $58 (not sure about $58...)
-        jump57 = how_many_until(chr(0x57), offset, rom)
-        jump50 = how_many_until(chr(0x50), offset, rom)
-        jump58 = how_many_until(chr(0x58), offset, rom)
+        jump57 = how_many_until(0x57, offset, rom)
+        jump50 = how_many_until(0x50, offset, rom)
+        jump58 = how_many_until(0x58, offset, rom)
 
         # pick whichever one comes first
         jump = min([jump57, jump50, jump58])
@@ -2230,6 +2271,7 @@ text_command_classes = inspect.getmembers(sys.modules[__name__], \
                        lambda obj: inspect.isclass(obj) and \
                        issubclass(obj, TextCommand) and \
                        obj != TextCommand and obj != PokedexText)
+text_command_table = get_command_table(text_command_classes)
 
 # byte: [name, [param1 name, param1 type], [param2 name, param2 type], ...]
 # 0x9E: ["verbosegiveitem", ["item", ItemLabelByte], ["quantity", SingleByteParam]],
@@ -2436,6 +2478,7 @@ def create_command_classes(debug=False):
     # later an individual klass will be instantiated to handle something
     return klasses
 command_classes = create_command_classes()
+command_table = get_command_table(command_classes)
 
 
 class BigEndianParam(object):
@@ -2558,6 +2601,7 @@ def create_music_command_classes(debug=False):
     return klasses
 
 music_classes = create_music_command_classes()
+music_command_table = get_command_table(music_classes)
 
 class OctaveParam(DecimalParam):
     @staticmethod
@@ -2814,6 +2858,7 @@ def create_effect_command_classes(debug=False):
     return klasses
 
 effect_classes = create_effect_command_classes()
+effect_command_table = get_command_table(effect_classes)
 
 
 
@@ -3010,15 +3055,10 @@ class Script(object):
         # for each command found..
         while not end:
             # get the current scripting byte
-            cur_byte = ord(rom[current_address])
-
-            # reset the command class (last command was probably different)
-            scripting_command_class = None
+            cur_byte = rom[current_address]
 
             # match the command id byte to a scripting command class like GivePoke
-            for class_ in command_classes:
-                if class_.id == cur_byte:
-                    scripting_command_class = class_
+            scripting_command_class = command_table[cur_byte]
 
             # no matching command found (not implemented yet)- just end this script
             # NOTE: might be better to raise an exception and end the program?
@@ -3684,7 +3724,7 @@ class TrainerHeader(object):
         address = self.address
 
         # figure out how many bytes until 0x50 "@"
-        jump = how_many_until(chr(0x50), address, rom)
+        jump = how_many_until(0x50, address, rom)
 
         # parse the "@" into the name
         self.name = parse_text_at(address, jump+1)
@@ -3693,7 +3733,7 @@ class TrainerHeader(object):
         current_address = address + jump + 1
 
         # figure out the pokemon data type
-        self.data_type = ord(rom[current_address])
+        self.data_type = rom[current_address]
 
         current_address += 1
 
@@ -3765,7 +3805,7 @@ class TrainerPartyMonParser(object):
                 current_address += obj.size
                 i += 1
             pkmn += 1
-            if ord(rom[current_address]) == 0xFF:
+            if rom[current_address] == 0xFF:
                 break
         self.last_address = current_address
         return True
@@ -3943,7 +3983,7 @@ def trainer_name_from_group(group_id, trainer_id=0):
     bank = pointers.calculate_bank(0x39999)
     ptr_address = 0x39999 + ((group_id - 1)*2)
     address = calculate_pointer_from_bytes_at(ptr_address, bank=bank)
-    text = parse_text_at2(address, how_many_until(chr(0x50), address, rom))
+    text = parse_text_at2(address, how_many_until(0x50, address, rom))
     return text
 
 def make_trainer_group_name_trainer_ids(trainer_group_table, debug=True):
@@ -4246,7 +4286,7 @@ class PeopleEvent(Command):
             obj = klass(address=current_address, name=name, debug=self.debug, force=self.force, map_group=self.map_group, map_id=self.map_id, bank=self.bank)
             self.params[i] = obj
             if i == 7:
-                color_function_byte = ord(rom[current_address])
+                color_function_byte = rom[current_address]
                 lower_bits = color_function_byte & 0xF
                 higher_bits = color_function_byte >> 4
                 is_regular_script = lower_bits == 00
@@ -4359,8 +4399,8 @@ def old_parse_people_event_bytes(some_bytes, address=None, map_group=None, map_i
                 extra_portion = {
                     "event_type": "give_item",
                     "give_item_data_address": ptr_address,
-                    "item_id": ord(rom[ptr_address]),
-                    "item_qty": ord(rom[ptr_address+1]),
+                    "item_id": rom[ptr_address],
+                    "item_qty": rom[ptr_address+1],
                 }
             if is_trainer:
                 logging.debug(
@@ -4465,8 +4505,8 @@ class SignpostRemoteScriptChunk(SignpostRemoteBase):
         address = self.address
         bank = self.bank
 
-        #event_flag_byte1 = ord(rom[address])
-        #event_flag_byte2 = ord(rom[address+1])
+        #event_flag_byte1 = rom[address]
+        #event_flag_byte2 = rom[address+1]
         event_flag = MultiByteParam(address=address, map_group=self.map_group, map_id=self.map_id, debug=self.debug)
         self.params.append(event_flag)
 
@@ -4624,10 +4664,10 @@ class Signpost(Command):
             pointer = ptr_byte1 + (ptr_byte2 << 8)
             address = pointers.calculate_pointer(pointer, bank)
 
-            event_flag_byte1 = ord(rom[address])
-            event_flag_byte2 = ord(rom[address+1])
-            script_ptr_byte1 = ord(rom[address+2])
-            script_ptr_byte2 = ord(rom[address+3])
+            event_flag_byte1 = rom[address]
+            event_flag_byte2 = rom[address+1]
+            script_ptr_byte1 = rom[address+2]
+            script_ptr_byte2 = rom[address+3]
             script_address = calculate_pointer_from_bytes_at(address+2, bank=bank)
 
             output += " remote_chunk@"+hex(address)+" remote_script@"+hex(script_address)
@@ -4655,7 +4695,7 @@ class Signpost(Command):
             pointer = ptr_byte1 + (ptr_byte2 << 8)
             address = pointers.calculate_pointer(pointer, bank)
 
-            item_id         = ord(rom[address+2])
+            item_id         = rom[address+2]
             output += " item_id="+str(item_id)
             logging.debug(output)
 
@@ -4668,8 +4708,8 @@ class Signpost(Command):
             mb = PointerLabelParam(address=self.address+3, map_group=self.map_group, map_id=self.map_id, debug=self.debug)
             self.params.append(mb)
 
-            #event_flag_byte1 = ord(rom[address])
-            #event_flag_byte2 = ord(rom[address+1])
+            #event_flag_byte1 = rom[address]
+            #event_flag_byte2 = rom[address+1]
             #self.event_flag_bytes = [event_flag_byte1, event_flag_byte2]
             #self.item_id = item_id
         elif func == 8:
@@ -4879,7 +4919,7 @@ class MapHeader(object):
         self.bank = HexByte(address=address)
         self.tileset = HexByte(address=address+1)
         self.permission = DecimalParam(address=address+2)
-        self.second_map_header_address = pointers.calculate_pointer(ord(rom[address+3])+(ord(rom[address+4])<<8), self.bank.byte)
+        self.second_map_header_address = pointers.calculate_pointer(rom[address+3]+(rom[address+4]<<8), self.bank.byte)
         # TODO: is the bank really supposed to be 0x25 all the time ??
         self.second_map_header = SecondMapHeader(self.second_map_header_address, map_group=self.map_group, map_id=self.map_id, debug=self.debug)
         all_second_map_headers.append(self.second_map_header)
@@ -4987,8 +5027,8 @@ class SecondMapHeader(object):
         self.script_header = MapScriptHeader(self.script_header_address, map_group=self.map_group, map_id=self.map_id, debug=self.debug)
         all_map_script_headers.append(self.script_header)
 
-        self.event_bank = ord(rom[address+6])
-        self.event_header_address = calculate_pointer_from_bytes_at(address+9, bank=ord(rom[address+6]))
+        self.event_bank = rom[address+6]
+        self.event_header_address = calculate_pointer_from_bytes_at(address+9, bank=rom[address+6])
         self.event_header = MapEventHeader(self.event_header_address, map_group=self.map_group, map_id=self.map_id, debug=self.debug)
         self.connection_byte = DecimalParam(address=address+11)
         all_map_event_headers.append(self.event_header)
@@ -5099,11 +5139,11 @@ class Connection(object):
         is_vertical   = ((self.direction == "north") or (self.direction == "south"))
         is_horizontal = ((self.direction == "east") or (self.direction == "west"))
 
-        connected_map_group_id = ord(rom[current_address])
+        connected_map_group_id = rom[current_address]
         self.connected_map_group_id = connected_map_group_id
         current_address += 1
 
-        connected_map_id = ord(rom[current_address])
+        connected_map_id = rom[current_address]
         self.connected_map_id = connected_map_id
         current_address += 1
 
@@ -5126,13 +5166,13 @@ class Connection(object):
         #   c.tileDataPointer = gb.Get2BytePointer(p);
         #
         # tauwasser calls this "connection strip pointer"
-        tile_data_pointer = ord(rom[current_address]) + (ord(rom[current_address+1]) << 8)
+        tile_data_pointer = rom[current_address] + (rom[current_address+1] << 8)
         strip_pointer = tile_data_pointer
         self.strip_pointer = tile_data_pointer
         current_address += 2
 
         # 10:19 <comet> memoryotherpointer is <comet> what johtomap calls OMDL (in ram where the tiles start getting pulled from the other map)
-        memory_other_pointer = ord(rom[current_address]) + (ord(rom[current_address+1]) << 8)
+        memory_other_pointer = rom[current_address] + (rom[current_address+1] << 8)
         # 10:42 <comet> it would be a good idea to rename otherpointer strippointer or striploc
         # 10:42 <comet> since thats more accurate
         # 11:05 <comet> Above: C803h + xoffset
@@ -5150,19 +5190,19 @@ class Connection(object):
         current_address += 2
 
         # length of the connection strip in blocks
-        connection_strip_length = ord(rom[current_address])
+        connection_strip_length = rom[current_address]
         current_address += 1
-        connected_map_width     = ord(rom[current_address])
+        connected_map_width     = rom[current_address]
         current_address += 1
 
         self.connection_strip_length = connection_strip_length
         self.connected_map_width     = connected_map_width
 
-        y_position_after_map_change = ord(rom[current_address])
+        y_position_after_map_change = rom[current_address]
         yoffset = y_position_after_map_change
         current_address += 1
 
-        x_position_after_map_change = ord(rom[current_address])
+        x_position_after_map_change = rom[current_address]
         xoffset = x_position_after_map_change
         current_address += 1
 
@@ -5177,7 +5217,7 @@ class Connection(object):
         #   Above: C701h + Height_of_connected_map * (Width_of_connected_map + 6)
         #   Left: C706h + 2 * Width_of_connected_map
         #   Below/Right: C707h + Width_of_connected_map
-        window = ord(rom[current_address]) + (ord(rom[current_address+1]) << 8)
+        window = rom[current_address] + (rom[current_address+1] << 8)
         current_address += 2
 
         self.window = window
@@ -5777,7 +5817,7 @@ class MapBlockData(object):
             # dump to file
             #bytes = rom.interval(self.address, self.width.byte*self.height.byte, strings=True)
             bytes = rom[self.address : self.address + self.width.byte*self.height.byte]
-            file_handler = open(map_path, "w")
+            file_handler = open(map_path, "wb")
             file_handler.write(bytes)
             file_handler.close()
 
@@ -5820,12 +5860,12 @@ class MapEventHeader(object):
         bank = pointers.calculate_bank(self.address) # or use self.bank
         logging.debug("event header address is {0}".format(hex(address)))
 
-        filler1 = ord(rom[address])
-        filler2 = ord(rom[address+1])
+        filler1 = rom[address]
+        filler2 = rom[address+1]
         self.fillers = [filler1, filler2]
 
         # warps
-        warp_count = ord(rom[address+2])
+        warp_count = rom[address+2]
         warp_byte_count = warp_byte_size * warp_count
         after_warps = address + 3 + warp_byte_count
         warps = parse_warps(address+3, warp_count, bank=bank, map_group=map_group, map_id=map_id, debug=debug)
@@ -5833,7 +5873,7 @@ class MapEventHeader(object):
         self.warps = warps
 
         # triggers (based on xy location)
-        xy_trigger_count = ord(rom[after_warps])
+        xy_trigger_count = rom[after_warps]
         trigger_byte_count = trigger_byte_size * xy_trigger_count
         xy_triggers = parse_xy_triggers(after_warps+1, xy_trigger_count, bank=bank, map_group=map_group, map_id=map_id, debug=debug)
         after_triggers = after_warps + 1 + trigger_byte_count
@@ -5841,7 +5881,7 @@ class MapEventHeader(object):
         self.xy_triggers = xy_triggers
 
         # signposts
-        signpost_count = ord(rom[after_triggers])
+        signpost_count = rom[after_triggers]
         signpost_byte_count = signpost_byte_size * signpost_count
         # signposts = rom.interval(after_triggers+1, signpost_byte_count)
         signposts = parse_signposts(after_triggers+1, signpost_count, bank=bank, map_group=map_group, map_id=map_id, debug=debug)
@@ -5850,7 +5890,7 @@ class MapEventHeader(object):
         self.signposts = signposts
 
         # people events
-        people_event_count = ord(rom[after_signposts])
+        people_event_count = rom[after_signposts]
         people_event_byte_count = people_event_byte_size * people_event_count
         # people_events_bytes = rom.interval(after_signposts+1, people_event_byte_count)
         # people_events = parse_people_event_bytes(people_events_bytes, address=after_signposts+1, map_group=map_group, map_id=map_id)
@@ -6010,7 +6050,7 @@ class MapScriptHeader(object):
         map_id = self.map_id
         debug = self.debug
         #[[Number1 of pointers] Number1 * [2byte pointer to script][00][00]]
-        self.trigger_count = ord(rom[address])
+        self.trigger_count = rom[address]
         self.triggers = []
         ptr_line_size = 4
         groups = helpers.grouper(rom.interval(address+1, self.trigger_count * ptr_line_size, strings=False), count=ptr_line_size)
@@ -6208,18 +6248,18 @@ class PokedexEntry(object):
     def parse(self):
         # eww.
         address = self.address
-        jump = how_many_until(chr(0x50), address, rom)
+        jump = how_many_until(0x50, address, rom)
         self.species = parse_text_at(address, jump+1)
         address = address + jump + 1
 
-        self.weight = ord(rom[address  ]) + (ord(rom[address+1]) << 8)
-        self.height = ord(rom[address+2]) + (ord(rom[address+3]) << 8)
+        self.weight = rom[address  ] + (rom[address+1] << 8)
+        self.height = rom[address+2] + (rom[address+3] << 8)
         address += 4
 
-        jump = how_many_until(chr(0x50), address, rom)
+        jump = how_many_until(0x50, address, rom)
         self.page1 = PokedexText(address)
         address = address + jump + 1
-        jump = how_many_until(chr(0x50), address, rom)
+        jump = how_many_until(0x50, address, rom)
         self.page2 = PokedexText(address)
 
         self.last_address = address + jump + 1
@@ -6949,7 +6989,7 @@ class Asm(object):
 
 def list_things_in_bank(bank):
     objects = []
-    for blah in script_parse_table.items():
+    for blah in script_parse_table.overlapping(bank * 0x4000, (bank + 1) * 0x4000):
         object = blah[1]
         if hasattr(object, "address") and pointers.calculate_bank(object.address) == bank:
             objects.append(object)
@@ -7088,6 +7128,24 @@ def get_ram_label(address):
         return wram.wram_labels[address][-1]
     return None
 
+# a SymbolIndex of the last list of labels given to get_label_for
+all_labels_index = (None, 0, None)
+
+def get_all_labels_index(labels):
+    """
+    Return a SymbolIndex of a list of labels from get_labels_between,
+    rebuilding it only when the list is replaced or grows.
+    """
+    global all_labels_index
+    if all_labels_index[0] is not labels or all_labels_index[1] != len(labels):
+        index = sym.SymbolIndex()
+        for thing in labels:
+            address = thing["address"]
+            local_address = address if address < 0x4000 else address % 0x4000 + 0x4000
+            index.add(thing["label"], thing.get("bank", 0), local_address, address=address)
+        all_labels_index = (labels, len(labels), index)
+    return all_labels_index[2]
+
 def get_label_for(address, _all_labels=None, _script_parse_table=None):
     """
     returns a label assigned to a particular address
@@ -7111,9 +7169,9 @@ def get_label_for(address, _all_labels=None, _script_parse_table=None):
         return None
 
     # the old way
-    for thing in _all_labels:
-        if thing["address"] == address:
-            return thing["label"]
+    label = get_all_labels_index(_all_labels).get_absolute(address)
+    if label is not None:
+        return label
 
     # the new way
     obj = _script_parse_table[address]
@@ -7138,6 +7196,9 @@ class Label(object):
     This label is simply a way to keep track of what objects have
     been previously written to file.
     """
+    # There's one of these for most parsed objects, so keep them small.
+    __slots__ = ["address", "object", "line_number", "is_in_file", "address_is_in_file", "name"]
+
     def __init__(self, name=None, address=None, line_number=None, object=None, is_in_file=None, address_is_in_file=None, add_to_globals=True):
         assert address != None, "need an address"
         assert is_valid_address(address), "address must be valid"
@@ -7340,7 +7401,171 @@ def add_map_offsets_into_map_names(map_group_offsets, map_names=None):
 
 rom_parsed = False
 
-def parse_rom(rom=None, _skip_wram_labels=False, _parse_map_header_at=None, debug=False):
+# Parsed roms are pickled here, so the parse only has to happen once per rom.
+# Unpickling can run arbitrary code, so this is in the user's own cache
+# directory instead of the (possibly shared) project directory.
+# Each entry is a few MB, so leave room for more than one.
+parse_rom_cache = cache.Cache(os.path.join(conf.user_cache_path, 'parse_rom'), max_size=0x10000000)
+
+# Parsed objects point at each other, and pickle recurses through every
+# link, so a long chain of scripts goes far past the default recursion
+# limit. Pickle in a thread with a big stack and a limit that fits in it.
+pickle_stack_size = 0x10000000
+pickle_recursion_limit = 0x40000
+
+# Bump this if parsing changes in a way the source hash won't catch.
+parse_rom_cache_version = 1
+
+# The module state that parse_rom fills in. These are pickled together, so
+# objects shared between them stay shared.
+parsed_rom_state = [
+    "map_names",
+    "script_parse_table",
+    "trainer_group_table",
+    "trainer_group_maximums",
+    "all_map_headers",
+    "all_second_map_headers",
+    "all_map_event_headers",
+    "all_map_script_headers",
+    "all_texts",
+    "all_movements",
+    "all_warps",
+    "all_xy_triggers",
+    "all_people_events",
+    "all_signposts",
+    "all_new_labels",
+    "texts",
+    "string_to_text_texts",
+    "pksv_no_names",
+    "strip_pointer_data",
+    "strip_destination_data",
+    "wrong_norths",
+    "wrong_easts",
+    "wrong_souths",
+    "wrong_wests",
+]
+
+# parse_rom's results depend on the rest of the package too (pksv, chars,
+# pointers, interval_map...), so all of its source goes into the cache key.
+parser_source_path = os.path.dirname(os.path.abspath(__file__))
+
+def get_parser_version(path=None):
+    """
+    Return a hash of the package's source, so that parse_rom's cache is
+    thrown out whenever the parser or anything it uses changes.
+    """
+    if path is None:
+        path = parser_source_path
+    sha = hashlib.sha1()
+    for directory, dirnames, filenames in sorted(os.walk(path)):
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            filename = os.path.join(directory, filename)
+            sha.update(os.path.relpath(filename, path).encode("utf-8"))
+            with open(filename, "rb") as source:
+                sha.update(hashlib.sha1(source.read()).digest())
+    return sha.hexdigest()
+
+def get_parse_rom_key(rom):
+    if isinstance(rom, str) and not isinstance(rom, bytes):
+        # RomStr is text on python 3.
+        rom = rom.encode("utf-8")
+    return cache.hash_key("parse_rom", hashlib.sha1(rom).hexdigest(), parse_rom_cache_version, get_parser_version())
+
+def call_with_deep_stack(function, *args):
+    """
+    Return function(*args), called in a thread with room for deep recursion.
+    Exceptions are raised again in the calling thread.
+    """
+    result = {}
+    def run():
+        try:
+            result["value"] = function(*args)
+        except Exception as exception:
+            result["exception"] = exception
+
+    stack_size = threading.stack_size()
+    recursion_limit = sys.getrecursionlimit()
+    try:
+        threading.stack_size(pickle_stack_size)
+    except ValueError:
+        # The stack size can't be changed here, so make do with the usual limit.
+        return function(*args)
+    try:
+        sys.setrecursionlimit(max(recursion_limit, pickle_recursion_limit))
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(stack_size)
+        sys.setrecursionlimit(recursion_limit)
+
+    if "exception" in result:
+        raise result["exception"]
+    return result["value"]
+
+def save_parsed_rom(key):
+    """
+    Pickle the parsed rom state into parse_rom_cache.
+    """
+    state = dict((name, globals()[name]) for name in parsed_rom_state)
+    try:
+        data = call_with_deep_stack(pickle.dumps, state, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError, RuntimeError) as exception:
+        # RuntimeError covers running out of recursion on a deep script graph.
+        logging.warning("Couldn't cache the parsed rom: {0}".format(exception))
+        return False
+    parse_rom_cache.set(key, data)
+    return True
+
+def load_parsed_rom(key):
+    """
+    Restore the parsed rom state from parse_rom_cache. Returns False if it
+    isn't cached.
+
+    The lists, dicts and the script_parse_table are filled in place, since
+    other modules (and classes like Command) hold references to them.
+
+    Loading a pickle can run any code it names, so only point
+    parse_rom_cache at a directory that nobody else can write to.
+    """
+    data = parse_rom_cache.get(key)
+    if data is None:
+        return False
+    try:
+        state = call_with_deep_stack(pickle.loads, bytes(data))
+        # Read the interval maps back out before touching anything, so a map
+        # pickled with different internals is a miss instead of a broken map.
+        intervals = dict(
+            (name, list(value.items()))
+            for (name, value) in state.items()
+            if isinstance(value, interval_map.IntervalMap)
+        )
+    except Exception as exception:
+        # A stale or truncated entry can fail in any number of ways. Parse again instead.
+        logging.warning("Couldn't load the cached parsed rom: {0}".format(exception))
+        return False
+
+    for name in parsed_rom_state:
+        current, value = globals()[name], state[name]
+        if isinstance(current, list):
+            current[:] = value
+        elif isinstance(current, dict):
+            current.clear()
+            current.update(value)
+        elif isinstance(current, interval_map.IntervalMap):
+            current.__init__()
+            for ((start, stop), item) in intervals[name]:
+                current[start:stop] = item
+        else:
+            globals()[name] = value
+    return True
+
+def parse_rom(rom=None, _skip_wram_labels=False, _parse_map_header_at=None, debug=False, use_cache=True):
+    global rom_parsed
+    global trainer_group_table
+
     if not rom:
         # read the rom and figure out the offsets for maps
         rom = direct_load_rom()
@@ -7349,6 +7574,14 @@ def parse_rom(rom=None, _skip_wram_labels=False, _parse_map_header_at=None, debu
     if not _skip_wram_labels:
         setup_wram_labels()
 
+    # a custom map header parser won't give the same results
+    use_cache = use_cache and _parse_map_header_at is None
+    if use_cache:
+        key = get_parse_rom_key(rom)
+        if load_parsed_rom(key):
+            rom_parsed = True
+            return map_names
+
     # figure out the map offsets
     map_group_offsets = load_map_group_offsets(map_group_pointer_table=map_group_pointer_table, map_group_count=map_group_count, rom=rom)
 
@@ -7363,13 +7596,14 @@ def parse_rom(rom=None, _skip_wram_labels=False, _parse_map_header_at=None, debu
     find_trainer_ids_from_scripts(script_parse_table=script_parse_table, trainer_group_maximums=trainer_group_maximums)
 
     # and parse the main TrainerGroupTable once we know the max number of trainers
-    #global trainer_group_table
     trainer_group_table = TrainerGroupTable(trainer_group_maximums=trainer_group_maximums, trainers=trainers, script_parse_table=script_parse_table)
 
     # improve duplicate trainer names
     make_trainer_group_name_trainer_ids(trainer_group_table)
 
-    global rom_parsed
+    if use_cache:
+        save_parsed_rom(key)
+
     rom_parsed = True
 
     return map_names
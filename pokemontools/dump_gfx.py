@@ -3,11 +3,10 @@ from __future__ import absolute_import
 from .gfx import *
 from .pokemon_constants import pokemon_constants
 from . import trainers
-from . import romstr
+from .romimage import load_rom_image
 
 def load_rom(filename=config.rom_path):
-    rom = romstr.RomStr.load(filename=filename)
-    return bytearray(rom)
+    return load_rom_image(filename)
 
 def rom_offset(bank, address):
     if address < 0x4000 or address >= 0x8000:
@@ -46,8 +45,8 @@ def make_sizes(num_monsters=251):
     return '\n'.join(' ' * 8 + ', '.join(split(sizes, 16)))
 
 
-def decompress_fx_by_id(i, fxs=0xcfcf6):
-    rom = load_rom()
+def decompress_fx_by_id(i, fxs=0xcfcf6, rom=None):
+    if rom is None: rom = load_rom()
     addr = fxs + i * 4
 
     num_tiles = rom[addr]
@@ -58,10 +57,11 @@ def decompress_fx_by_id(i, fxs=0xcfcf6):
     fx = Decompressed(rom, start=offset)
     return fx
 
-def rip_compressed_fx(dest='gfx/fx', num_fx=40, fxs=0xcfcf6):
+def rip_compressed_fx(rom=None, dest='gfx/fx', num_fx=40, fxs=0xcfcf6):
+    if rom is None: rom = load_rom()
     for i in xrange(num_fx):
         name = '%.3d' % i
-        fx = decompress_fx_by_id(i, fxs)
+        fx = decompress_fx_by_id(i, fxs, rom)
         filename = os.path.join(dest, name + '.2bpp.lz')
         to_file(filename, fx.compressed_data)
 
@@ -159,7 +159,6 @@ num_trainers = 67
 trainer_names = [t['constant'] for i, t in trainers.trainer_group_names.items()]
 
 def decompress_trainer_by_id(rom, i, crystal=True):
-    rom = load_rom()
     if crystal:
         bank_offset = 0x36
     else:
@@ -172,11 +171,11 @@ def decompress_trainer_by_id(rom, i, crystal=True):
     trainer = Decompressed(rom, start=address)
     return trainer
 
-def rip_compressed_trainer_pics(rom):
+def rip_compressed_trainer_pics(rom, dest='gfx/trainers', crystal=True):
     for t in xrange(num_trainers):
         trainer_name = trainer_names[t].lower().replace('_','')
-        trainer  = decompress_trainer_by_id(t)
-        filename = os.path.join('gfx/trainers/', trainer_name + '.6x6.2bpp.lz')
+        trainer  = decompress_trainer_by_id(rom, t, crystal)
+        filename = os.path.join(dest, trainer_name + '.6x6.2bpp.lz')
         to_file(filename, trainer.compressed_data)
 
 
@@ -7,9 +7,13 @@ from __future__ import absolute_import
 
 import os
 import argparse
+import multiprocessing
+from collections import namedtuple
 from ctypes import c_int8
 
 from . import configuration
+from . import sym
+from .romimage import load_rom_image
 from .wram import read_constants
 
 z80_table = [
@@ -223,7 +227,7 @@ z80_table = [
 	('rst $8', 0),                 # cf
 	('ret nc', 0),                 # d0
 	('pop de', 0),                 # d1
-	('jp nc, ${:04x}', 2),         # d2
+	('jp nc, {}', 2),              # d2
 	('db $d3', 0),                 # d3
 	('call nc, {}', 2),            # d4
 	('push de', 0),                # d5
@@ -231,7 +235,7 @@ z80_table = [
 	('rst $10', 0),                # d7
 	('ret c', 0),                  # d8
 	('reti', 0),                   # d9
-	('jp c, ${:04x}', 2),          # da
+	('jp c, {}', 2),               # da
 	('db $db', 0),                 # db
 	('call c, {}', 2),             # dc
 	('db $dd', 2),                 # dd
@@ -307,10 +311,132 @@ bit_ops_table = [
 ]
 
 unconditional_returns = [0xc9, 0xd9]
+conditional_returns = [0xc0, 0xc8, 0xd0, 0xd8]
 absolute_jumps = [0xc3, 0xc2, 0xca, 0xd2, 0xda]
 call_commands = [0xcd, 0xc4, 0xcc, 0xd4, 0xdc]
 relative_jumps = [0x18, 0x20, 0x28, 0x30, 0x38]
 unconditional_jumps = [0xc3, 0x18]
+indirect_jumps = [0xe9]
+
+# where execution can start without being called
+entry_points = [0x100] + list(range(0x00, 0x40, 0x08)) + list(range(0x40, 0x68, 0x08))
+
+# kinds of bytes in a code map
+DATA = 0
+CODE = 1
+ARGUMENT = 2
+
+# kinds of operands
+NO_OPERAND = 0
+BYTE_OPERAND = 1
+HRAM_OPERAND = 2
+RELATIVE_OPERAND = 3
+WORD_OPERAND = 4
+BIT_OPERAND = 5
+
+# flow types, as bits
+JUMP = 1 << 0
+CALL = 1 << 1
+RETURN = 1 << 2
+END = 1 << 3 # execution doesn't go on to the next instruction
+INVALID = 1 << 4
+
+def writes_a(asm):
+	"""
+	Return True if the instruction <asm> (from z80_table or bit_ops_table)
+	changes register a.
+	"""
+	mnemonic, _, operands = asm.partition(' ')
+	if mnemonic in ('adc', 'sub', 'sbc', 'and', 'xor', 'or', 'cpl', 'daa', 'rla', 'rra', 'rlca', 'rrca'):
+		return True
+	if mnemonic == 'add':
+		return not operands.startswith(('hl', 'sp'))
+	if mnemonic == 'ld':
+		return operands.startswith('a,')
+	if mnemonic in ('inc', 'dec'):
+		return operands == 'a'
+	if mnemonic == 'pop':
+		return operands == 'af'
+	if mnemonic in ('bit', 'cp'):
+		return False
+	# rotates, shifts and res/set
+	return operands.endswith(' a') or operands == 'a'
+
+# opcodes that change a (not counting calls)
+a_writes = set(byte for byte in range(0x100) if writes_a(z80_table[byte][0]))
+# and the same for the byte after $cb
+bit_op_a_writes = set(byte for byte in range(0x100) if writes_a(bit_ops_table[byte]))
+
+Opcode = namedtuple('Opcode', ['byte', 'format', 'length', 'operand', 'flow'])
+Instruction = namedtuple('Instruction', ['address', 'opcode', 'arg'])
+
+def make_opcode(byte):
+	"""
+	Classify an opcode from z80_table and the opcode lists above.
+	"""
+	opcode_str, opcode_nargs = z80_table[byte]
+
+	if byte == 0xcb:
+		operand = BIT_OPERAND
+	elif byte in relative_jumps:
+		operand = RELATIVE_OPERAND
+	elif byte == 0xe0 or byte == 0xf0:
+		operand = HRAM_OPERAND
+	elif opcode_nargs == 1:
+		operand = BYTE_OPERAND
+	elif opcode_nargs == 2:
+		operand = WORD_OPERAND
+	else:
+		operand = NO_OPERAND
+
+	flow = 0
+	if byte in relative_jumps or byte in absolute_jumps or byte in indirect_jumps:
+		flow |= JUMP
+	if byte in call_commands:
+		flow |= CALL
+	if byte in unconditional_returns or byte in conditional_returns:
+		flow |= RETURN
+	if byte in unconditional_jumps or byte in unconditional_returns or byte in indirect_jumps:
+		flow |= END
+	if opcode_str.startswith('db') and byte != 0x10:
+		flow |= INVALID
+
+	return Opcode(byte, opcode_str, opcode_nargs + 1, operand, flow)
+
+opcodes = [make_opcode(byte) for byte in range(0x100)]
+
+def decode_instruction(rom, offset):
+	"""
+	Decode the instruction at <offset>.
+
+	The argument is the target address of a relative jump, the
+	little-endian word of a 16-bit operand, or else the byte after the
+	opcode (None if there isn't one).
+	"""
+	opcode = opcodes[rom[offset]]
+	if opcode.operand == NO_OPERAND:
+		arg = None
+	elif opcode.operand == WORD_OPERAND:
+		arg = rom[offset + 2] << 8 | rom[offset + 1]
+	elif opcode.operand == RELATIVE_OPERAND:
+		arg = offset + 2 + c_int8(rom[offset + 1]).value
+	else:
+		arg = rom[offset + 1]
+	return Instruction(offset, opcode, arg)
+
+def decode(rom, offset, end=None):
+	"""
+	Decode instructions one after another from <offset>, stopping at
+	<end> (or the end of the rom) or an instruction that runs past it.
+	"""
+	if end is None or end > len(rom):
+		end = len(rom)
+	while offset < end:
+		if offset + opcodes[rom[offset]].length > end:
+			break
+		instruction = decode_instruction(rom, offset)
+		yield instruction
+		offset += instruction.opcode.length
 
 
 def asm_label(address):
@@ -329,7 +455,7 @@ def get_local_address(address):
 	"""
 	Return the local address of a rom address.
 	"""
-	bank = address / 0x4000
+	bank = address // 0x4000
 	address &= 0x3fff
 	if bank:
 		return address + 0x4000
@@ -361,8 +487,31 @@ def all_byte_labels_are_defined(byte_labels):
 	"""
 	return (False not in [label["definition"] for label in byte_labels.values()])
 
+class LabelTable(dict):
+	"""
+	Labels by local address, as dicts of name, usage and definition.
+
+	The addresses of labels that aren't defined yet are kept in a set,
+	so checking for them doesn't mean going over every label.
+	"""
+
+	def __init__(self):
+		dict.__init__(self)
+		self.undefined = set()
+
+	def add(self, address, name, usage=0, definition=False):
+		self[address] = {"name": name, "usage": usage}
+		self.define(address, definition)
+
+	def define(self, address, definition=True):
+		self[address]["definition"] = definition
+		if definition:
+			self.undefined.discard(address)
+		else:
+			self.undefined.add(address)
+
 def load_rom(path='baserom.gbc'):
-	return bytearray(open(path, 'rb').read())
+	return load_rom_image(path)
 
 def read_symfile(path='baserom.sym'):
 	"""
@@ -416,6 +565,14 @@ def load_symbols(path):
 		
 	return sym, reverse_sym, wram_sym, sram_sym
 
+def load_symbol_index(path):
+	"""
+	Return a SymbolIndex of the labels in an rgbds .sym file.
+	The parsed file is cached, so this is quick if it hasn't changed.
+	Like load_symbols, the last label at an address wins.
+	"""
+	return sym.SymbolIndex(sym.read_symfile(path), first_wins=False)
+
 def get_symbol(sym, address, bank=0):
 	if sym:
 		if 0x0000 <= address < 0x4000:
@@ -440,7 +597,7 @@ def get_banked_ram_sym(sym, address):
 	return None
 
 def create_address_comment(offset):
-	comment_bank = offset / 0x4000
+	comment_bank = offset // 0x4000
 	if comment_bank != 0:
 		comment_bank_addr = (offset % 0x4000) + 0x4000
 	else:
@@ -449,8 +606,7 @@ def create_address_comment(offset):
 	return " ; %x (%x:%x)" % (offset, comment_bank, comment_bank_addr)
 			
 def offset_is_used(labels, offset):
-	if offset in labels.keys():
-		return 0 < labels[offset]["usage"]
+	return offset in labels and 0 < labels[offset]["usage"]
 
 class Disassembler(object):
 	"""
@@ -464,13 +620,10 @@ class Disassembler(object):
 		self.config = config
 		self.spacing = '\t'
 		self.rom = None
-		self.sym = None
-		self.rsym = None
+		self.symbols = sym.SymbolIndex()
 		self.gbhw = None
 		self.vram = None
-		self.sram = None
 		self.hram = None
-		self.wram = None
 
 	def initialize(self, rom, symfile):
 		"""
@@ -481,7 +634,7 @@ class Disassembler(object):
 		
 		path = os.path.join(self.config.path, symfile)
 		if os.path.exists(path):
-			self.sym, self.rsym, self.wram, self.sram = load_symbols(path)
+			self.symbols = load_symbol_index(path)
 
 		path = os.path.join(self.config.path, 'gbhw.asm')
 		
@@ -524,26 +677,27 @@ class Disassembler(object):
 		return label
 
 	def get_symbol(self, address, bank):
-		symbol = get_symbol(self.sym, address, bank)
+		symbol = self.symbols.get(bank, address)
 		if symbol == 'NULL' and address == 0 and bank == 0:
 			return None
 		return symbol
 
 	def get_wram(self, address):
-		symbol = get_banked_ram_sym(self.wram, address)
+		symbol = self.symbols.get_unbanked(address)
 		if symbol == 'NULL' and address == 0:
 			return None
 		return symbol
 		
 	def get_sram(self, address):
-		symbol = get_banked_ram_sym(self.sram, address)
+		symbol = self.symbols.get_unbanked(address)
 		if symbol == 'NULL' and address == 0:
 			return None
 		return symbol
 		
 	def find_address_from_label(self, label):
-		if self.rsym:
-			return self.rsym.get(label)
+		bank_address = self.symbols.get_bank_address(label)
+		if bank_address and bank_address[1] < 0x8000:
+			return get_global_address(bank_address[1], bank_address[0])
 		
 		return None
 
@@ -566,7 +720,7 @@ class Disassembler(object):
 		
 		debug = False
 				
-		bank_id = start_offset / 0x4000
+		bank_id = start_offset // 0x4000
 		
 		stop_offset_undefined = False
 		
@@ -584,10 +738,12 @@ class Disassembler(object):
 		offset = start_offset
 		current_byte_number = 0 #start from the beginning		
 
-		byte_labels = {}
-		data_tables = {}
+		byte_labels = LabelTable()
+		data_tables = LabelTable()
 		
-		output = "Func_%x:%s\n" % (start_offset,create_address_comment(start_offset))
+		# Lines are kept as (kind, text, address), and only rendered once all
+		# the labels are known, so unused labels can be left out as they go.
+		output = [('text', "Func_%x:%s" % (start_offset,create_address_comment(start_offset)), None)]
 		is_data = False
 		
 		while True:
@@ -597,83 +753,67 @@ class Disassembler(object):
 			
 			local_offset = get_local_address(offset)
 			
-			data_label_used = offset_is_used(data_tables, local_offset)
-			byte_label_used = offset_is_used(byte_labels, local_offset)
-			data_label_created = local_offset in data_tables.keys()
-			byte_label_created = local_offset in byte_labels.keys()
+			data_label_created = local_offset in data_tables
+			byte_label_created = local_offset in byte_labels
 			
 			if byte_label_created:
 			# if a byte label exists, remove any significance if there is a data label that exists
 				if data_label_created:
-					data_line_label = data_tables[local_offset]["name"]
 					data_tables[local_offset]["usage"] = 0
 				else:
-					data_line_label = data_label(offset)
-					data_tables[local_offset] = {}
-					data_tables[local_offset]["name"] = data_line_label
-					data_tables[local_offset]["usage"] = 0
+					data_tables.add(local_offset, data_label(offset))
 					
-				line_label = byte_labels[local_offset]["name"]
 				byte_labels[local_offset]["usage"] += 1
-				output += "\n"
 			elif data_label_created and parse_data:
 			# go add usage to a data label if it exists
-				data_line_label = data_tables[local_offset]["name"]
 				data_tables[local_offset]["usage"] += 1
 				
-				line_label = asm_label(offset)
-				byte_labels[local_offset] = {}
-				byte_labels[local_offset]["name"] = line_label
-				byte_labels[local_offset]["usage"] = 0
-				output += "\n"
+				byte_labels.add(local_offset, asm_label(offset))
 			else:
 			# create both a data and byte label if neither exist
-				data_line_label = data_label(offset)
-				data_tables[local_offset] = {}
-				data_tables[local_offset]["name"] = data_line_label
-				data_tables[local_offset]["usage"] = 0
-					
-				line_label = asm_label(offset)
-				byte_labels[local_offset] = {}
-				byte_labels[local_offset]["name"] = line_label
-				byte_labels[local_offset]["usage"] = 0
+				data_tables.add(local_offset, data_label(offset))
+				byte_labels.add(local_offset, asm_label(offset))
 
 			# any labels created not above are now used, so mark them as "defined"
-			byte_labels[local_offset]["definition"] = True
-			data_tables[local_offset]["definition"] = True
+			byte_labels.define(local_offset)
+			data_tables.define(local_offset)
 			
-			# for now, output the byte and data labels (unused labels will be removed later
-			output += line_label + "\n" + data_line_label + "\n"
+			# for now, output the byte and data labels (unused labels will be left out later)
+			output += [
+				('byte label', byte_labels[local_offset]["name"], local_offset),
+				('data label', data_tables[local_offset]["name"], local_offset),
+			]
 			
 			# get the current byte
 			opcode_byte = rom[offset]
 			
 			# process the current byte if this is code or parse data has not been set
 			if not is_data or not parse_data:
-				# fetch the opcode string from a predefined table
-				opcode_str = z80_table[opcode_byte][0]
-				# fetch the number of arguments
-				opcode_nargs = z80_table[opcode_byte][1]
-				# get opcode arguments in advance (may not be used)
-				opcode_arg_1 = rom[offset+1]
-				opcode_arg_2 = rom[offset+2]
+				# decode the opcode and its argument using the precomputed opcode table
+				instruction = decode_instruction(rom, offset)
+				opcode = instruction.opcode
+				opcode_str = opcode.format
+				
+				# most lines don't refer to a data label
+				opcode_line_kind = 'text'
+				opcode_line_address = None
 				
-				if opcode_nargs == 0:
+				if opcode.length == 1:
 				# set output string simply as the opcode
 					opcode_output_str = opcode_str
 				
-				elif opcode_nargs == 1:
+				elif opcode.length == 2:
 				# opcodes with 1 argument
-					if opcode_byte != 0xcb: # bit opcodes are handled separately
+					if opcode.operand != BIT_OPERAND: # bit opcodes are handled separately
 						
-						if opcode_byte in relative_jumps:
+						if opcode.operand == RELATIVE_OPERAND:
 						# if the current opcode is a relative jump, generate a label for the address we're jumping to
 							# get the address of the location to jump to
-							target_address = offset + 2 + c_int8(opcode_arg_1).value
+							target_address = instruction.arg
 							# get the local address to use as a key for byte_labels and data_tables
 							local_target_address = get_local_address(target_address)
 							
-							if local_target_address in byte_labels.keys():
+							if local_target_address in byte_labels:
 							# if the label has already been created, increase the usage and set output to the already created label
 								byte_labels[local_target_address]["usage"] += 1
 								opcode_output_str = byte_labels[local_target_address]["name"]
@@ -683,30 +823,27 @@ class Disassembler(object):
 							else:
 							# create a new label
 								opcode_output_str = asm_label(target_address)
-								byte_labels[local_target_address] = {}
-								byte_labels[local_target_address]["name"] = opcode_output_str
 								# we know the label is used once, so set the usage to 1
-								byte_labels[local_target_address]["usage"] = 1
 								# since the label has not been output yet, mark it as "not defined"
-								byte_labels[local_target_address]["definition"] = False
+								byte_labels.add(local_target_address, opcode_output_str, usage=1, definition=False)
 							
 							# check if the target address conflicts with any data labels
-							if local_target_address in data_tables.keys():
+							if local_target_address in data_tables:
 								# if so, remove any instances of it being used and set it as defined
 								data_tables[local_target_address]["usage"] = 0
-								data_tables[local_target_address]["definition"] = True
+								data_tables.define(local_target_address)
 							
 							# format the resulting argument into the output string
 							opcode_output_str = opcode_str.format(opcode_output_str)
 							
 							# debug function
-							if created_but_unused_labels_exist(byte_labels) and debug:
-								output += create_address_comment(offset)
+							if debug and byte_labels.undefined:
+								opcode_output_str += create_address_comment(offset)
 						
-						elif opcode_byte == 0xe0 or opcode_byte == 0xf0:
+						elif opcode.operand == HRAM_OPERAND:
 						# handle gameboy hram read/write opcodes
 							# create the address
-							high_ram_address = 0xff00 + opcode_arg_1
+							high_ram_address = 0xff00 + instruction.arg
 							# search for an hram constant if possible
 							high_ram_label = self.find_label(high_ram_address, bank_id)
 							# if we couldn't find one, default to the address
@@ -718,22 +855,22 @@ class Disassembler(object):
 						
 						else:
 						# if this isn't a relative jump or hram read/write, just format the byte into the opcode string
-							opcode_output_str = opcode_str.format(opcode_arg_1)
+							opcode_output_str = opcode_str.format(instruction.arg)
 					
 					else:
 					# handle bit opcodes by fetching the opcode from a separate table
-						opcode_output_str = bit_ops_table[opcode_arg_1]
+						opcode_output_str = bit_ops_table[instruction.arg]
 				
-				elif opcode_nargs == 2:
+				elif opcode.length == 3:
 				# opcodes with a pointer as an argument
-					# format the two arguments into a little endian 16-bit pointer
-					local_target_offset = opcode_arg_2 << 8 | opcode_arg_1
+					# the two arguments are decoded as a little endian 16-bit pointer
+					local_target_offset = instruction.arg
 					# get the global offset of the pointer
 					target_offset = get_global_address(local_target_offset, bank_id)
 					# attempt to look for a matching label
 					target_label = self.find_label(target_offset, bank_id)
 					
-					if opcode_byte in call_commands + absolute_jumps:
+					if opcode.flow & (CALL | JUMP):
 						if target_label is None:
 						# if this is a call or jump opcode and the target label is not defined, create an undocumented label descriptor
 							target_label = "Func_%x" % target_offset
@@ -748,29 +885,27 @@ class Disassembler(object):
 								# fetch the already created byte label
 								target_label = byte_labels[local_target_offset]["name"]
 								# prevent this address from being treated as a data label
-								if local_target_offset in data_tables.keys():
+								if local_target_offset in data_tables:
 									data_tables[local_target_offset]["usage"] = 0
 								else:
-									data_tables[local_target_offset] = {}
-									data_tables[local_target_offset]["name"] = target_label
-									data_tables[local_target_offset]["usage"] = 0
-									data_tables[local_target_offset]["definition"] = True
+									data_tables.add(local_target_offset, target_label, definition=True)
 									
 							elif local_target_offset >= 0x8000 or not parse_data:
 							# do not create a label if this is a wram label or parse_data is not set
 								target_label = "$%x" % local_target_offset
 							
-							elif local_target_offset in data_tables.keys():
-							# if the target offset has been created as a data label, increase usage and use the already defined name
-								data_tables[local_target_offset]["usage"] += 1
-								target_label = data_tables[local_target_offset]["name"]	
 							else:
-							# for now, treat this as a data label, but do not set it as used (will be replaced later if unused)
-								target_label = data_label(target_offset)
-								data_tables[local_target_offset] = {}
-								data_tables[local_target_offset]["name"] = target_label
-								data_tables[local_target_offset]["usage"] = 0
-								data_tables[local_target_offset]["definition"] = False
+								if local_target_offset in data_tables:
+								# if the target offset has been created as a data label, increase usage
+									data_tables[local_target_offset]["usage"] += 1
+								else:
+								# for now, treat this as a data label, but do not set it as used (will be replaced later if unused)
+									data_tables.add(local_target_offset, data_label(target_offset))
+								
+								# the label is filled in once we know whether it was used
+								opcode_line_kind = 'data reference'
+								opcode_line_address = local_target_offset
+								target_label = '{0}'
 							
 					# format the label that was created into the opcode string
 					opcode_output_str = opcode_str.format(target_label)	
@@ -780,19 +915,19 @@ class Disassembler(object):
 					raise ValueError("Invalid amount of args.")
 				
 				# append the formatted opcode output string to the output
-				output += self.spacing + opcode_output_str + "\n" #+ " ; " + hex(offset)
+				output += [(opcode_line_kind, self.spacing + opcode_output_str, opcode_line_address)]
 				# increase the current byte number and offset by the amount of arguments plus 1 (opcode itself)
-				current_byte_number += opcode_nargs + 1
-				offset += opcode_nargs + 1
+				current_byte_number += opcode.length
+				offset += opcode.length
 				
 			else:
 				# output a single lined db, using the current byte
-				output += self.spacing + "db ${:02x}\n".format(opcode_byte) #+ " ; " + hex(offset)
+				output += [('text', self.spacing + "db ${:02x}".format(opcode_byte), None)]
 				# manually increment offset and current byte number
 				offset += 1
 				current_byte_number += 1
 				# stop treating the current code as data if we're parsing over a byte label
-				if get_local_address(offset) in byte_labels.keys():
+				if get_local_address(offset) in byte_labels:
 					is_data = False
 			
 			# update the local offset
@@ -802,51 +937,33 @@ class Disassembler(object):
 			if hard_stop and offset >= stop_offset:
 				break
 			# check if this is the end of the function, or we're processing data
-			elif (opcode_byte in unconditional_jumps + unconditional_returns) or is_data:
+			# (not jp hl, which output_bank_opcodes has always disassembled past)
+			elif opcodes[opcode_byte].flow & END and opcode_byte not in indirect_jumps or is_data:
 				# define data if it is located at the current offset
-				if local_offset not in byte_labels.keys() and local_offset in data_tables.keys() and created_but_unused_labels_exist(data_tables) and parse_data:
+				if local_offset not in byte_labels and local_offset in data_tables and data_tables.undefined and parse_data:
 					is_data = True
 				#stop reading at a jump, relative jump or return
-				elif all_byte_labels_are_defined(byte_labels) and (offset >= stop_offset or stop_offset_undefined):
+				elif not byte_labels.undefined and (offset >= stop_offset or stop_offset_undefined):
 					break
-				# otherwise, add some spacing
-				output += "\n"
-		
-		# before returning output, we need to clean up some things
-		
-		# first, clean up on unused byte labels
-		for label_line in byte_labels.values():
-			if label_line["usage"] == 0:
-				output = output.replace((label_line["name"] + "\n"), "")
-		
-		# clean up on unused data labels
-		# this is slightly trickier to do as arguments for two byte variables use data labels
 		
-		# create a list of the output lines including the newlines
-		output_lines = [e+"\n" for e in output.split("\n") if e != ""]
-		
-		# go through each label
-		for label_addr in data_tables.keys():
-			# get the label dict
-			label_line = data_tables[label_addr]
-			# check if this label is unused
-			if label_line["usage"] == 0:
-				# get label name
-				label_name = label_line["name"]
-				# loop over all output lines
-				for i, line in enumerate(output_lines):
-					if line.startswith(label_name):
-					# remove line if it starts with the current label
-						output_lines.pop(i)
-					elif label_name in line:
-					# if the label is used in a load-based opcode, replace it with the raw hex reference
-						output_lines[i] = output_lines[i].replace(label_name, "$%x" % get_local_address(label_addr))
+		# now that all the labels are known, render the output
+		# unused labels are left out, and unused data labels are replaced with the raw hex reference
+		output_lines = []
+		for kind, text, address in output:
+			if kind == 'byte label':
+				if byte_labels[address]["usage"] == 0:
+					continue
+			elif kind == 'data label':
+				if data_tables[address]["usage"] == 0:
+					continue
+			elif kind == 'data reference':
+				if data_tables[address]["usage"] == 0:
+					text = text.format("$%x" % address)
+				else:
+					text = text.format(data_tables[address]["name"])
+			output_lines += [text + "\n"]
 		
-		# convert the modified list of lines into a string
 		output = "".join(output_lines)
-		
-		# tone down excessive spacing
-		output = output.replace("\n\n\n","\n\n")
 
 		# add the offset of the final location
 		if include_last_address:
@@ -854,6 +971,217 @@ class Disassembler(object):
 		
 		return [output, offset, stop_offset, byte_labels, data_tables]
 
+	def get_seeds(self):
+		"""
+		Return the rom addresses to start tracing from:
+		the entry points, and every rom label in the symfile.
+		"""
+		seeds = set(entry_points)
+		for bank, address, label in self.symbols:
+			if address < 0x8000:
+				seeds.add(get_global_address(address, bank))
+		return sorted(seed for seed in seeds if seed < len(self.rom))
+
+	def trace_rom(self, seeds=None):
+		"""
+		Follow calls and jumps from <seeds> over the whole rom.
+
+		Return a code map, marking each byte as DATA, CODE (the first byte of
+		an instruction) or ARGUMENT, and a dict of resolved jump and call
+		targets by the address of the instruction.
+
+		Jumps from home into a switchable bank can only be resolved if the
+		bank is known. It's inferred from an "ld a, n" before a write to the
+		mbc (0:2000-3fff), as long as nothing in between changes a (calls
+		and rsts included), and is inherited by anything called from a
+		switchable bank.
+		"""
+		if seeds is None:
+			seeds = self.get_seeds()
+
+		rom = self.rom
+		code_map = bytearray(len(rom))
+		targets = {}
+
+		worklist = [(seed, None) for seed in reversed(seeds)]
+		while worklist:
+			address, bank = worklist.pop()
+			if address >= 0x4000:
+				bank = address // 0x4000
+			bank_end = min(len(rom), (address // 0x4000 + 1) * 0x4000)
+			a = None
+
+			for instruction in decode(rom, address, bank_end):
+				address = instruction.address
+				opcode = instruction.opcode
+
+				# stop at code that's already been traced, and at invalid opcodes
+				if code_map[address] != DATA or opcode.flow & INVALID:
+					break
+
+				code_map[address] = CODE
+				code_map[address + 1:address + opcode.length] = bytearray([ARGUMENT] * (opcode.length - 1))
+
+				target = None
+				if opcode.operand == RELATIVE_OPERAND:
+					target = instruction.arg
+					# relative jumps can't leave the bank
+					if target // 0x4000 != address // 0x4000:
+						target = None
+				elif opcode.flow & (CALL | JUMP) and opcode.operand == WORD_OPERAND:
+					if instruction.arg < 0x4000:
+						target = instruction.arg
+					elif instruction.arg < 0x8000 and bank is not None:
+						target = get_global_address(instruction.arg, bank)
+				elif opcode.byte == 0xea and 0x2000 <= instruction.arg < 0x4000:
+					if a is not None and address < 0x4000:
+						bank = a or 1
+
+				# keep track of a, as long as it's a known constant
+				if opcode.byte == 0x3e:
+					a = instruction.arg
+				elif opcode.byte in a_writes or opcode.flow & CALL or opcode.format.startswith('rst'):
+					a = None
+				elif opcode.byte == 0xcb and instruction.arg in bit_op_a_writes:
+					a = None
+
+				if target is not None and target < len(rom):
+					targets[address] = target
+					if code_map[target] == DATA:
+						worklist.append((target, bank))
+
+				if opcode.flow & END:
+					break
+
+		return code_map, targets
+
+	def get_rom_labels(self, seeds, code_map, targets):
+		"""
+		Return label names by rom address for every seed and jump target.
+		"""
+		labels = {}
+		for address in set(seeds) | set(targets.values()):
+			# a label inside an instruction would never be output
+			if code_map[address] == ARGUMENT:
+				continue
+			label = self.get_symbol(get_local_address(address), address // 0x4000)
+			if label is None:
+				label = "Func_%x" % address
+			labels[address] = label
+		return labels
+
+	def output_bank(self, bank, code_map, targets, labels):
+		"""
+		Output a whole bank of a traced rom as asm.
+		Anything that wasn't reached as code is output as data.
+		"""
+		rom = self.rom
+		start = bank * 0x4000
+		end = min(len(rom), start + 0x4000)
+
+		if bank:
+			output = ['SECTION "bank%x", ROMX[$4000], BANK[$%x]' % (bank, bank)]
+		else:
+			output = ['SECTION "bank0", ROM0[$0]']
+
+		address = start
+		while address < end:
+			if address in labels:
+				output += ['', labels[address] + ":" + create_address_comment(address)]
+
+			if code_map[address] != CODE:
+				# group data into lines of up to 8 bytes, broken up by labels and code
+				data_end = address + 1
+				while data_end < end and data_end - address < 8 and code_map[data_end] != CODE and data_end not in labels:
+					data_end += 1
+				output += [self.spacing + "db " + ", ".join("$%02x" % byte for byte in rom[address:data_end])]
+				address = data_end
+				continue
+
+			instruction = decode_instruction(rom, address)
+			opcode = instruction.opcode
+
+			if opcode.operand == NO_OPERAND:
+				opcode_output_str = opcode.format
+			elif opcode.operand == BIT_OPERAND:
+				opcode_output_str = bit_ops_table[instruction.arg]
+			elif targets.get(address) in labels:
+				opcode_output_str = opcode.format.format(labels[targets[address]])
+			elif opcode.operand == HRAM_OPERAND:
+				high_ram_label = self.find_label(0xff00 + instruction.arg, bank)
+				if high_ram_label is None:
+					high_ram_label = "$%x" % (0xff00 + instruction.arg)
+				opcode_output_str = opcode.format.format(high_ram_label)
+			elif opcode.operand == RELATIVE_OPERAND:
+				opcode_output_str = opcode.format.format("$%x" % get_local_address(instruction.arg))
+			elif opcode.operand == WORD_OPERAND:
+				target_label = self.find_label(instruction.arg, bank)
+				if target_label is None:
+					target_label = "$%x" % instruction.arg
+				opcode_output_str = opcode.format.format(target_label)
+			else:
+				opcode_output_str = opcode.format.format(instruction.arg)
+
+			output += [self.spacing + opcode_output_str]
+			address += opcode.length
+
+		return "\n".join(output) + "\n"
+
+	def output_rom(self, path='.', seeds=None, jobs=1):
+		"""
+		Trace the whole rom, and write each bank to <path>/bank<n>.asm.
+		The code map is written to <path>/code_map.bin, a byte per rom byte.
+
+		Banks are output across <jobs> processes (0 for one per cpu).
+		Labels are resolved for the whole rom first, so each bank can be
+		output on its own.
+		"""
+		if seeds is None:
+			seeds = self.get_seeds()
+
+		code_map, targets = self.trace_rom(seeds)
+		labels = self.get_rom_labels(seeds, code_map, targets)
+
+		with open(os.path.join(path, 'code_map.bin'), 'wb') as f:
+			f.write(code_map)
+
+		banks = range((len(self.rom) + 0x3fff) // 0x4000)
+
+		if not jobs:
+			jobs = multiprocessing.cpu_count()
+
+		if jobs == 1 or len(banks) <= 1:
+			outputs = (self.output_bank(bank, code_map, targets, labels) for bank in banks)
+			pool = None
+		else:
+			# forked workers share the rom and tables instead of copying them for each bank
+			pool = multiprocessing.Pool(min(jobs, len(banks)), init_bank_worker, (self, code_map, targets, labels))
+			outputs = pool.imap(output_bank_worker, banks, chunksize=4)
+
+		filenames = []
+		try:
+			for bank, output in zip(banks, outputs):
+				filename = os.path.join(path, 'bank%02x.asm' % bank)
+				with open(filename, 'w') as f:
+					f.write(output)
+				filenames += [filename]
+		finally:
+			if pool is not None:
+				pool.close()
+				pool.join()
+		return filenames
+
+# what each worker process needs to output a bank, set once by init_bank_worker
+bank_worker_state = None
+
+def init_bank_worker(disasm, code_map, targets, labels):
+	global bank_worker_state
+	bank_worker_state = (disasm, code_map, targets, labels)
+
+def output_bank_worker(bank):
+	disasm, code_map, targets, labels = bank_worker_state
+	return disasm.output_bank(bank, code_map, targets, labels)
+
 def get_raw_addr(addr):
 	if addr:
 		if ":" in addr:
@@ -879,7 +1207,9 @@ if __name__ == "__main__":
 	ap.add_argument("-nw", "--no-write", dest="no_write", action="store_true")
 	ap.add_argument("-d", "--dry-run", dest="dry_run", action="store_true")
 	ap.add_argument("-pd", "--parse_data", dest="parse_data", action="store_true")
-	ap.add_argument('offset')
+	ap.add_argument("-a", "--all", dest="output_dir", nargs="?", const=".", help="disassemble the whole rom into a file per bank")
+	ap.add_argument("-j", "--jobs", dest="jobs", type=int, default=1, help="number of processes to use with --all (0 for one per cpu)")
+	ap.add_argument('offset', nargs='?')
 	ap.add_argument('end', nargs='?')
 	
 	args = ap.parse_args()
@@ -897,18 +1227,26 @@ if __name__ == "__main__":
 	disasm = Disassembler(conf)
 	disasm.initialize(args.rom, args.symfile)
 	
-	# get global address of the start and stop offsets
-	start_addr = get_raw_addr(args.offset)
-	stop_addr = get_raw_addr(args.end)
-	
-	# run the disassembler and return the output
-	output = disasm.output_bank_opcodes(start_addr,stop_addr,hard_stop=args.dry_run,parse_data=args.parse_data)[0]
-	
-	# suppress output if quiet flag is set
-	if not args.quiet:
-		print(output)
-	
-	# only write to the output file if the no write flag is unset
-	if not args.no_write:
-		with open(args.filename, "w") as f:
-			f.write(output)
\ No newline at end of file
+	# disassemble the whole rom instead, if asked to
+	if args.output_dir is not None:
+		for filename in disasm.output_rom(args.output_dir, jobs=args.jobs):
+			if not args.quiet:
+				print(filename)
+	elif args.offset is None:
+		ap.error("an offset is required unless disassembling the whole rom")
+	else:
+		# get global address of the start and stop offsets
+		start_addr = get_raw_addr(args.offset)
+		stop_addr = get_raw_addr(args.end)
+		
+		# run the disassembler and return the output
+		output = disasm.output_bank_opcodes(start_addr,stop_addr,hard_stop=args.dry_run,parse_data=args.parse_data)[0]
+		
+		# suppress output if quiet flag is set
+		if not args.quiet:
+			print(output)
+		
+		# only write to the output file if the no write flag is unset
+		if not args.no_write:
+			with open(args.filename, "w") as f:
+				f.write(output)
@@ -4,15 +4,27 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import sys
+import functools
+import multiprocessing
+import traceback
 from . import png
 from math import sqrt, floor, ceil
 import argparse
 import operator
+import collections
 
 from . import configuration
 config = configuration.Config()
 
-from .lz import Compressed, Decompressed
+from . import bitplanes
+from . import cache
+from .lz import Compressed, Decompressed, compressor_version, bit_flipped
+
+# Compressed graphics are kept in <cache_path>/lz/ (.pokemontools-cache/ in
+# the working directory by default), since compressing is slow.
+# It's safe to delete. Use --no-cache to leave it alone.
+lz_cache = cache.Cache(os.path.join(config.cache_path, 'lz'))
 
 
 def split(list_, interval):
@@ -75,6 +87,10 @@ def transpose(tiles, width=None):
     return [tile for i, tile in tiles]
 
 def transpose_tiles(image, width=None):
+    if width:
+        transposed = bitplanes.transpose_tiles(image, width)
+        if transposed is not None:
+            return transposed
     return connect(transpose(get_tiles(image), width))
 
 def interleave(tiles, width):
@@ -109,9 +125,15 @@ def deinterleave(tiles, width):
     return deinterleaved
 
 def interleave_tiles(image, width):
+    interleaved = bitplanes.interleave_tiles(image, width)
+    if interleaved is not None:
+        return interleaved
     return connect(interleave(get_tiles(image), width))
 
 def deinterleave_tiles(image, width):
+    deinterleaved = bitplanes.deinterleave_tiles(image, width)
+    if deinterleaved is not None:
+        return deinterleaved
     return connect(deinterleave(get_tiles(image), width))
 
 
@@ -139,8 +161,15 @@ def condense_tiles_to_map(tiles, pic=0):
     new_tiles = tiles[:pic]
     tilemap   = list(range(pic))
 
+    # The first index of each unique tile.
+    indexes = {}
+    for i, tile in enumerate(new_tiles):
+        indexes.setdefault(tuple(tile), i)
+
     for i, tile in enumerate(tiles[pic:]):
-        if tile not in new_tiles:
+        key = tuple(tile)
+        if key not in indexes:
+            indexes[key] = len(new_tiles)
             new_tiles.append(tile)
 
         if pic:
@@ -153,11 +182,63 @@ def condense_tiles_to_map(tiles, pic=0):
             if tile == new_tiles[pic_i]:
                 tilemap.append(pic_i)
             else:
-                tilemap.append(new_tiles.index(tile))
+                tilemap.append(indexes[key])
         else:
-            tilemap.append(new_tiles.index(tile))
+            tilemap.append(indexes[key])
     return new_tiles, tilemap
 
+"""
+Tilemap attribute bits for flipped tiles.
+"""
+x_flip = 0x20
+y_flip = 0x40
+
+def flip_tile(tile, attributes):
+    """
+    Flip a 2bpp tile horizontally and/or vertically.
+    """
+    tile = list(tile)
+    if attributes & x_flip:
+        tile = [bit_flipped[byte] for byte in tile]
+    if attributes & y_flip:
+        tile = connect(reversed(list(split(tile, 2))))
+    return tile
+
+def condense_image_to_flipped_map(image):
+    """
+    Like condense_image_to_map, but also match tiles that are flipped versions of each other.
+    Returns the new image, the tilemap, and the attributes for each tile in the tilemap.
+    """
+    tiles = get_tiles(image)
+    new_tiles, tilemap, attrmap = condense_tiles_to_flipped_map(tiles)
+    new_image = connect(new_tiles)
+    return new_image, tilemap, attrmap
+
+def condense_tiles_to_flipped_map(tiles):
+    """
+    Reduce a sequence of tiles to unique tiles, treating flipped tiles as repeats.
+    Returns the new tiles, the tilemap, and the flip attributes for each tile in the tilemap.
+    """
+    new_tiles = []
+    tilemap = []
+    attrmap = []
+
+    # Each unique tile is indexed under every way it can be flipped.
+    indexes = {}
+
+    for tile in tiles:
+        key = tuple(tile)
+        if key not in indexes:
+            index = len(new_tiles)
+            new_tiles.append(tile)
+            for attributes in (y_flip | x_flip, y_flip, x_flip, 0):
+                indexes[tuple(flip_tile(tile, attributes))] = index, attributes
+        index, attributes = indexes[key]
+        tilemap.append(index)
+        attrmap.append(attributes)
+
+    return new_tiles, tilemap, attrmap
+
 def test_condense_tiles_to_map():
     test = condense_tiles_to_map(list('abcadbae'))
     if test != (list('abcde'), [0, 1, 2, 0, 3, 1, 0, 4]):
@@ -194,11 +275,29 @@ def decompress_file(filein, fileout=None):
 def compress_file(filein, fileout=None):
     with open(filein, 'rb') as f:
         image = bytearray(f.read())
-    lz = Compressed(image)
+    lz = lz_compress(image)
 
     if fileout == None:
         fileout = filein + '.lz'
-    to_file(fileout, lz.output)
+    to_file(fileout, lz)
+
+
+def lz_compress(data, **kwargs):
+    """
+    Compress <data>, reusing the output from lz_cache if it was compressed before.
+    Keyword arguments are passed on to Compressed.
+    Set lz_cache to None to always compress from scratch.
+    """
+    data = bytearray(data)
+    if lz_cache is None:
+        return bytearray(Compressed(data, **kwargs).output)
+
+    key = cache.hash_key(data, compressor_version, sorted(kwargs.items()))
+    lz = lz_cache.get(key)
+    if lz is None:
+        lz = bytearray(Compressed(data, **kwargs).output)
+        lz_cache.set(key, lz)
+    return lz
 
 
 def bin_to_rgb(word):
@@ -283,6 +382,36 @@ def to_lines(image, width):
     return lines
 
 
+def to_planar(qmap, width, height):
+    """
+    Convert lines of quaternary pixels to planar 2bpp tiles.
+    """
+    tile_width  = 8
+    tile_height = 8
+    num_columns = max(width, tile_width) // tile_width
+    num_rows = max(height, tile_height) // tile_height
+    image = []
+
+    for row in range(num_rows):
+        for column in range(num_columns):
+
+            # Split it up into strips to convert to planar data
+            for strip in range(min(tile_height, height)):
+                anchor = (
+                    row * num_columns * tile_width * tile_height +
+                    column * tile_width +
+                    strip * width
+                )
+                line = qmap[anchor : anchor + tile_width]
+                bottom, top = 0, 0
+                for bit, quad in enumerate(line):
+                    bottom += (quad & 1) << (7 - bit)
+                    top += (quad // 2 & 1) << (7 - bit)
+                image += [bottom, top]
+
+    return image
+
+
 def dmg2rgb(word):
     """
     For PNGs.
@@ -448,10 +577,14 @@ def convert_2bpp_to_png(image, **kwargs):
 
         trailing = len(image) % pic_length
 
-        pic = []
-        for i in range(0, len(image) - trailing, pic_length):
-            pic += transpose_tiles(image[i:i+pic_length], h)
-        image = bytearray(pic) + image[len(image) - trailing:]
+        transposed = bitplanes.transpose_pics(image, w, h)
+        if transposed is not None:
+            image = transposed
+        else:
+            pic = []
+            for i in range(0, len(image) - trailing, pic_length):
+                pic += transpose_tiles(image[i:i+pic_length], h)
+            image = bytearray(pic) + image[len(image) - trailing:]
 
         # Pad out trailing lines.
         image += pad_color * 0x10 * ((w - (len(image) // 0x10) % h) % w)
@@ -494,24 +627,53 @@ def convert_2bpp_to_png(image, **kwargs):
         else:
             raise Exception('Image can\'t be divided into tiles (%d px)!' % (px_length(image)))
 
-    # convert tiles to lines
-    lines = to_lines(flatten(image), width)
-
     if pal_file == None:
         palette   = None
         greyscale = True
         bitdepth  = 2
-        px_map    = [[3 - pixel for pixel in line] for line in lines]
 
     else: # gbc color
         palette   = pal_to_png(pal_file)
         greyscale = False
         bitdepth  = 8
-        px_map    = [[pixel for pixel in line] for line in lines]
+
+    # px_map is a generator, so lines are only converted as they're written.
+    px_map = get_png_lines(image, width, height, greyscale)
 
     return width, height, palette, greyscale, bitdepth, px_map
 
 
+# Greyscale pngs are white to black, the reverse of Game Boy shades.
+greyscale_table = bytearray([3, 2, 1, 0]) + bytearray(range(4, 0x100))
+
+def get_png_lines(image, width, height, greyscale=False):
+    """
+    Yield rows of png pixels from planar 2bpp image data, one tile row at a time.
+    """
+    def convert(chunk):
+        lines = bitplanes.to_lines(chunk, width)
+        if lines is not None:
+            lines = lines.tolist()
+        else:
+            lines = to_lines(flatten(chunk), width)
+        for line in lines:
+            line = bytearray(line)
+            if greyscale:
+                line = line.translate(greyscale_table)
+            yield line
+
+    # Short tile rows can't be split up.
+    if height % 8:
+        for line in convert(image):
+            yield line
+        return
+
+    row_length = width // 8 * 0x10
+    for i in range(0, len(image), row_length):
+        for line in convert(image[i : i + row_length]):
+            yield line
+
+
 def get_pic_animation(tmap, w, h):
     """
     Generate pic animation data from a combined tilemap of each frame.
@@ -522,18 +684,20 @@ def get_pic_animation(tmap, w, h):
     frames = list(split(tmap, w * h))
     base = frames.pop(0)
     bitmasks = []
+    bitmask_indexes = {}
 
     for i in range(len(frames)):
         frame_text += '\tdw .frame{}\n'.format(i + 1)
 
     for i, frame in enumerate(frames):
-        bitmask = map(operator.ne, frame, base)
-        if bitmask not in bitmasks:
+        bitmask = list(map(operator.ne, frame, base))
+        key = tuple(bitmask)
+        if key not in bitmask_indexes:
+            bitmask_indexes[key] = len(bitmasks)
             bitmasks.append(bitmask)
-        which_bitmask = bitmasks.index(bitmask)
+        which_bitmask = bitmask_indexes[key]
 
-        mask = iter(bitmask)
-        masked_frame = filter(lambda _: next(mask), frame)
+        masked_frame = [tile for tile, changed in zip(frame, bitmask) if changed]
 
         frame_text += '.frame{}\n'.format(i + 1)
         frame_text += '\tdb ${:02x} ; bitmask\n'.format(which_bitmask)
@@ -594,6 +758,11 @@ def export_png_to_2bpp(filein, fileout=None, palout=None, **kwargs):
         tilemap_path = os.path.splitext(fileout)[0] + '.tilemap'
         to_file(tilemap_path, tmap)
 
+        attrmap = arguments.get('attrmap')
+        if attrmap != None:
+            attrmap_path = os.path.splitext(fileout)[0] + '.attrmap'
+            to_file(attrmap_path, attrmap)
+
     palette = arguments.get('palette')
     if palout == None:
         palout = os.path.splitext(fileout)[0] + '.pal'
@@ -633,92 +802,53 @@ def png_to_2bpp(filein, **kwargs):
         'interleave': False,
         'norepeat': False,
         'tilemap': False,
+        'flip': False,
     }
     arguments.update(kwargs)
 
     if type(filein) is str:
         filein = open(filein, 'rb')
 
-    width, height, rgba, info = png.Reader(filein).asRGBA8()
+    # Decode the png once. The palette has to be picked before any pixels
+    # are converted, so keep the raw rows around for the second pass.
+    width, height, rgba, info = png.Reader(file=filein).asRGBA8()
+    rgba = list(rgba)
+    colors, counts = count_colors(get_rgba_lines(rgba))
 
-    # png.Reader returns flat pixel data. Nested is easier to work with
-    len_px  = len('rgba')
-    image   = []
-    palette = []
-    for line in rgba:
-        newline = []
-        for px in range(0, len(line), len_px):
-            color = dict(zip('rgba', line[px:px+len_px]))
-            if color not in palette:
-                if len(palette) < 4:
-                    palette += [color]
-                else:
-                    # TODO Find the nearest match
-                    print('WARNING: %s: Color %s truncated to' % (filein, color), end=' ')
-                    color = sorted(palette, key=lambda x: sum(x.values()))[0]
-                    print(color)
-            newline += [color]
-        image += [newline]
-
-    assert len(palette) <= 4, '%s: palette should be 4 colors, is really %d (%s)' % (filein, len(palette), palette)
-
-    # Pad out smaller palettes with greyscale colors
-    greyscale = {
-        'black': { 'r': 0x00, 'g': 0x00, 'b': 0x00, 'a': 0xff },
-        'grey':  { 'r': 0x55, 'g': 0x55, 'b': 0x55, 'a': 0xff },
-        'gray':  { 'r': 0xaa, 'g': 0xaa, 'b': 0xaa, 'a': 0xff },
-        'white': { 'r': 0xff, 'g': 0xff, 'b': 0xff, 'a': 0xff },
-    }
-    preference = 'white', 'black', 'grey', 'gray'
-    for hue in map(greyscale.get, preference):
-        if len(palette) >= 4:
-            break
-        if hue not in palette:
-            palette += [hue]
-
-    palette.sort(key=lambda x: sum(x.values()))
+    if len(counts) > 4:
+        print('WARNING: %s: %d colors reduced to 4' % (filein, len(counts)))
 
-    # Game Boy palette order
-    palette.reverse()
+    palette, color_ids = quantize(colors, counts)
 
     # Map pixels to quaternary color ids
     padding = get_image_padding(width, height)
     width += padding['left'] + padding['right']
     height += padding['top'] + padding['bottom']
-    pad = bytearray([0])
 
-    qmap = []
-    qmap += pad * width * padding['top']
-    for line in image:
-        qmap += pad * padding['left']
-        for color in line:
-            qmap += [palette.index(color)]
-        qmap += pad * padding['right']
-    qmap += pad * width * padding['bottom']
+    def get_qmap_lines():
+        pad = bytearray([0])
+        for i in range(padding['top']):
+            yield pad * width
+        for line in get_rgba_lines(rgba):
+            line = bytearray(map(color_ids.__getitem__, line))
+            yield pad * padding['left'] + line + pad * padding['right']
+        for i in range(padding['bottom']):
+            yield pad * width
 
     # Graphics are stored in tiles instead of lines
     tile_width  = 8
-    tile_height = 8
+    tile_height = min(8, height)
     num_columns = max(width, tile_width) // tile_width
-    num_rows = max(height, tile_height) // tile_height
-    image = []
-
-    for row in range(num_rows):
-        for column in range(num_columns):
-
-            # Split it up into strips to convert to planar data
-            for strip in range(min(tile_height, height)):
-                anchor = (
-                    row * num_columns * tile_width * tile_height +
-                    column * tile_width +
-                    strip * width
-                )
-                line = qmap[anchor : anchor + tile_width]
-                bottom, top = 0, 0
-                for bit, quad in enumerate(line):
-                    bottom += (quad & 1) << (7 - bit)
-                    top += (quad // 2 & 1) << (7 - bit)
-                image += [bottom, top]
+    image = bytearray()
+    qmap = bytearray()
+    for i, line in enumerate(get_qmap_lines()):
+        qmap += line
+        if (i + 1) % tile_height == 0:
+            tile_row = bitplanes.from_lines(qmap, width)
+            if tile_row is None:
+                tile_row = bytearray(to_planar(qmap, width, tile_height))
+            image += tile_row
+            qmap = bytearray()
 
     dim = arguments['pic_dimensions']
     if dim:
@@ -731,41 +861,138 @@ def png_to_2bpp(filein, **kwargs):
             if h % w == 0:
                 h = w
 
-        tiles = get_tiles(image)
-        pic_length = w * h
         tile_width = width // 8
-        trailing = len(tiles) % pic_length
-        new_image = []
-        for block in range(len(tiles) // pic_length):
-            offset = (h * tile_width) * ((block * w) // tile_width) + ((block * w) % tile_width)
-            pic = []
-            for row in range(h):
-                index = offset + (row * tile_width)
-                pic += tiles[index:index + w]
-            new_image += transpose(pic, w)
-        new_image += tiles[len(tiles) - trailing:]
-        image = connect(new_image)
+        arranged = bitplanes.arrange_pics(image, tile_width, w, h)
+        if arranged is not None:
+            image = arranged
+        else:
+            tiles = get_tiles(image)
+            pic_length = w * h
+            trailing = len(tiles) % pic_length
+            new_image = []
+            for block in range(len(tiles) // pic_length):
+                offset = (h * tile_width) * ((block * w) // tile_width) + ((block * w) % tile_width)
+                pic = []
+                for row in range(h):
+                    index = offset + (row * tile_width)
+                    pic += tiles[index:index + w]
+                new_image += transpose(pic, w)
+            new_image += tiles[len(tiles) - trailing:]
+            image = connect(new_image)
 
     # Remove any tile padding used to make the png rectangular.
     image = image[:len(image) - arguments['tile_padding'] * 0x10]
 
     tmap = None
+    attrmap = None
 
     if arguments['interleave']:
         image = deinterleave_tiles(image, num_columns)
 
     if arguments['pic_dimensions']:
         image, tmap = condense_image_to_map(image, w * h)
+    elif arguments['norepeat'] and arguments['flip']:
+        image, tmap, attrmap = condense_image_to_flipped_map(image)
+        if not arguments['tilemap']:
+            tmap, attrmap = None, None
     elif arguments['norepeat']:
         image, tmap = condense_image_to_map(image)
         if not arguments['tilemap']:
             tmap = None
 
-    arguments.update({ 'palette': palette, 'tmap': tmap, })
+    arguments.update({ 'palette': palette, 'tmap': tmap, 'attrmap': attrmap, })
 
     return image, arguments
 
 
+"""
+Game Boy shades in palette order (lightest first).
+"""
+dmg_shades = [0xff, 0xaa, 0x55, 0x00]
+
+def get_luminance(color):
+    """
+    Perceived brightness of an (r, g, b, a) color over a white background.
+    """
+    r, g, b, a = color
+    luminance = (r * 299 + g * 587 + b * 114) / 1000
+    return (luminance * a + 0xff * (0xff - a)) / 0xff
+
+def get_rgba_lines(rgba):
+    """
+    Group flat rgba8 lines from png.Reader into (r, g, b, a) colors.
+    """
+    for line in rgba:
+        yield list(zip(line[0::4], line[1::4], line[2::4], line[3::4]))
+
+
+def count_colors(lines):
+    """
+    Return the colors in an image in the order they appear, and how many there are of each.
+    """
+    colors = []
+    counts = collections.Counter()
+    for line in lines:
+        counts.update(line)
+        if len(counts) > len(colors):
+            seen = set(colors)
+            for color in line:
+                if color not in seen:
+                    seen.add(color)
+                    colors += [color]
+    return colors, counts
+
+
+def quantize(colors, counts):
+    """
+    Pick a 4-color palette for an image with the given colors (in order of
+    appearance) and color counts.
+
+    Images with 4 colors or less keep their colors, padded out with greyscale.
+    Otherwise, each color goes to the nearest of the 4 Game Boy shades by
+    luminance, and the most common color for each shade represents it.
+
+    Return the palette (as rgba dicts, in Game Boy order) and a dict of
+    color ids for each (r, g, b, a) color in the image.
+    """
+    if len(counts) <= 4:
+        # Keep colors in the order they appear.
+        palette = list(colors)
+
+        # Pad out smaller palettes with greyscale colors
+        # (white, black, grey, gray)
+        for shade in (0xff, 0x00, 0x55, 0xaa):
+            if len(palette) >= 4:
+                break
+            hue = (shade, shade, shade, 0xff)
+            if hue not in palette:
+                palette += [hue]
+
+        palette.sort(key=sum)
+
+        # Game Boy palette order
+        palette.reverse()
+
+        color_ids = dict((color, palette.index(color)) for color in counts)
+
+    else:
+        color_ids = {}
+        shades = [[] for shade in dmg_shades]
+        for color in counts:
+            luminance = get_luminance(color)
+            i = min(range(len(dmg_shades)), key=lambda i: abs(dmg_shades[i] - luminance))
+            color_ids[color] = i
+            shades[i] += [color]
+
+        palette = [
+            max(colors, key=counts.get) if colors else (shade, shade, shade, 0xff)
+            for shade, colors in zip(dmg_shades, shades)
+        ]
+
+    palette = [dict(zip('rgba', color)) for color in palette]
+    return palette, color_ids
+
+
 def export_palette(palette, filename):
     """
     Export a palette from png to rgb macros in a .pal file.
@@ -791,7 +1018,7 @@ def png_to_lz(filein):
 
     export_png_to_2bpp(filein)
     image = open(name+'.2bpp', 'rb').read()
-    to_file(name+'.2bpp'+'.lz', Compressed(image).output)
+    to_file(name+'.2bpp'+'.lz', lz_compress(image))
 
 
 def convert_2bpp_to_1bpp(data):
@@ -804,9 +1031,10 @@ def convert_1bpp_to_2bpp(data):
     """
     Convert 1bpp image data to planar 2bpp (black/white).
     """
-    output = []
-    for i in data:
-        output += [i, i]
+    data = bytearray(data)
+    output = bytearray(len(data) * 2)
+    output[0::2] = data
+    output[1::2] = data
     return output
 
 
@@ -895,7 +1123,7 @@ def convert_to_png(filenames=[]):
 def compress(filenames=[]):
     for filename in filenames:
         data = open(filename, 'rb').read()
-        lz_data = Compressed(data).output
+        lz_data = lz_compress(data)
         to_file(filename + '.lz', lz_data)
 
 def decompress(filenames=[]):
@@ -919,24 +1147,144 @@ def try_decompress(filename):
     return filename, name, extension
 
 
+conversion_methods = {
+    '2bpp': convert_to_2bpp,
+    '1bpp': convert_to_1bpp,
+    'png':  convert_to_png,
+    'lz':   compress,
+    'unlz': decompress,
+}
+
+def get_output_filename(mode, filename):
+    """
+    Return the name of the file that converting <filename> with <mode> writes.
+    """
+    if mode == 'lz':
+        return filename + '.lz'
+    name, extension = os.path.splitext(filename)
+    if mode == 'unlz':
+        return name
+    if extension == '.lz':
+        name = os.path.splitext(name)[0]
+    return name + '.' + mode
+
+def is_up_to_date(filename, fileout):
+    """
+    Return True if <fileout> exists and is at least as new as <filename>.
+    """
+    if not os.path.exists(fileout):
+        return False
+    return os.path.getmtime(fileout) >= os.path.getmtime(filename)
+
+def init_convert_worker(use_cache):
+    """
+    Set up a worker process to match the parent. Workers may have imported
+    gfx fresh (spawn on macOS and Windows), so settings like --no-cache
+    have to be passed along explicitly.
+    """
+    if not use_cache:
+        global lz_cache
+        lz_cache = None
+
+def convert_file(method_and_filename):
+    """
+    Convert one file with method(filename). Return (filename, result, error).
+    """
+    method, filename = method_and_filename
+    try:
+        return filename, method(filename), None
+    except Exception:
+        return filename, None, traceback.format_exc()
+
+def run_conversions(method, filenames, jobs=1, initializer=None, initargs=(), report=None):
+    """
+    Convert each of <filenames> with method(filename), spread across <jobs>
+    processes (0 for one per cpu). <method> has to be picklable.
+
+    Workers are set up with initializer(*initargs), which also runs in this
+    process if there's only one job. Errors are written to stderr as each
+    file finishes, report(filename, result) is called for everything else,
+    and the names of any files that failed are returned.
+    """
+    tasks = [(method, filename) for filename in filenames]
+
+    if not jobs:
+        jobs = multiprocessing.cpu_count()
+
+    failed = []
+    def finish(results):
+        for filename, result, error in results:
+            if error:
+                sys.stderr.write('{}: {}'.format(filename, error))
+                failed.append(filename)
+            elif report:
+                report(filename, result)
+
+    if jobs == 1 or len(tasks) <= 1:
+        if initializer:
+            initializer(*initargs)
+        finish(map(convert_file, tasks))
+        return failed
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    pool = multiprocessing.Pool(min(jobs, len(tasks)), initializer, initargs)
+    try:
+        finish(pool.imap_unordered(convert_file, tasks, chunksize))
+    finally:
+        pool.close()
+        pool.join()
+
+    return failed
+
+def convert_with_mode(mode, filename):
+    conversion_methods[mode]([filename])
+
+def convert_files(mode, filenames, jobs=1, update=False, use_cache=True):
+    """
+    Convert <filenames> with <mode>, spread across <jobs> processes.
+
+    With update, files whose output is newer than the input are skipped.
+    Without use_cache, lz_cache is left alone in every process.
+    Errors are reported as each file finishes, and the names of any files
+    that failed are returned.
+    """
+
+    if update:
+        filenames = [
+            filename for filename in filenames
+            if not is_up_to_date(filename, get_output_filename(mode, filename))
+        ]
+
+    global lz_cache
+    saved_cache = lz_cache
+    try:
+        return run_conversions(
+            functools.partial(convert_with_mode, mode),
+            filenames,
+            jobs=jobs,
+            initializer=init_convert_worker,
+            initargs=(use_cache,),
+        )
+    finally:
+        # With one job, the worker setup happened in this process.
+        lz_cache = saved_cache
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('mode')
     ap.add_argument('filenames', nargs='*')
+    ap.add_argument('-j', '--jobs', type=int, default=1, help='number of processes to use (0 for one per cpu)')
+    ap.add_argument('-u', '--update', action='store_true', help='skip files whose output is newer')
+    ap.add_argument('--no-cache', action='store_true', help='always compress from scratch, without reading or writing .pokemontools-cache/')
     args = ap.parse_args()
 
-    method = {
-        '2bpp': convert_to_2bpp,
-        '1bpp': convert_to_1bpp,
-        'png':  convert_to_png,
-        'lz':   compress,
-        'unlz': decompress,
-    }.get(args.mode, None)
-
-    if method == None:
+    if args.mode not in conversion_methods:
         raise Exception("Unknown conversion method!")
 
-    method(args.filenames)
+    failed = convert_files(args.mode, args.filenames, jobs=args.jobs, update=args.update, use_cache=not args.no_cache)
+    if failed:
+        raise Exception("Failed to convert {} files!".format(len(failed)))
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from bisect import bisect_left, bisect_right
-try:
-    from future_builtins import zip
-except ImportError:
-    pass
 
 
 class IntervalMap(object):
@@ -16,84 +12,164 @@ class IntervalMap(object):
     >>> i[6:10] = "hello cruel world"
     >>> print i[4]
     "hello world"
+
+    Setting an interval overwrites whatever was mapped there before, so the
+    intervals never overlap. They're kept sorted in chunks of at most
+    2 * chunk_size (a two-level b-tree), so lookups and inserts stay cheap
+    no matter how many intervals there are.
     """
 
+    chunk_size = 256
+
     def __init__(self):
         """initializes an empty IntervalMap"""
-        self._bounds = []
-        self._items = []
-        self._upperitem = None
+        # each chunk is a list of [starts, stops, values]
+        self._chunks = []
+        # the first start of each chunk
+        self._firsts = []
 
-    def __setitem__(self, _slice, _value):
-        """sets an interval mapping"""
-        assert isinstance(_slice, slice), 'The key must be a slice object'
+    def _find(self, point):
+        """
+        Return (chunk, index) of the last interval starting at or before
+        <point>, or (-1, -1) if there isn't one.
+        """
+        chunk = bisect_right(self._firsts, point) - 1
+        if chunk < 0:
+            return -1, -1
+        return chunk, bisect_right(self._chunks[chunk][0], point) - 1
 
-        if _slice.start is None:
-            start_point = -1
-        else:
-            start_point = bisect_left(self._bounds, _slice.start)
+    def _insert(self, start, stop, value):
+        if not self._chunks:
+            self._chunks.append([[start], [stop], [value]])
+            self._firsts.append(start)
+            return
 
-        if _slice.stop is None:
-            end_point = -1
-        else:
-            end_point = bisect_left(self._bounds, _slice.stop)
+        chunk = max(bisect_right(self._firsts, start) - 1, 0)
+        self._insert_at(chunk, bisect_left(self._chunks[chunk][0], start), start, stop, value)
 
-        if start_point>=0:
-            if start_point < len(self._bounds) and self._bounds[start_point]<_slice.start:
-                start_point += 1
+    def _insert_at(self, chunk, index, start, stop, value):
+        starts, stops, values = self._chunks[chunk]
+        starts.insert(index, start)
+        stops.insert(index, stop)
+        values.insert(index, value)
+        self._firsts[chunk] = starts[0]
 
-            if end_point>=0:
-                self._bounds[start_point:end_point] = [_slice.start, _slice.stop]
-                if start_point < len(self._items):
-                    self._items[start_point:end_point] = [self._items[start_point], _value]
-                else:
-                    self._items[start_point:end_point] = [self._upperitem, _value]
+        if len(starts) > self.chunk_size * 2:
+            half = self.chunk_size
+            self._chunks.insert(chunk + 1, [starts[half:], stops[half:], values[half:]])
+            self._firsts.insert(chunk + 1, starts[half])
+            del starts[half:], stops[half:], values[half:]
+
+    def _remove(self, start, stop):
+        """
+        Clear <start> to <stop>, trimming any intervals that hang over
+        either end.
+        """
+        removed = list(self._overlapping(start, stop))
+        for interval_start, interval_stop, value in removed:
+            chunk, index = self._find(interval_start)
+            starts, stops, values = self._chunks[chunk]
+            del starts[index], stops[index], values[index]
+            if starts:
+                self._firsts[chunk] = starts[0]
             else:
-                self._bounds[start_point:] = [_slice.start]
-                if start_point < len(self._items):
-                    self._items[start_point:] = [self._items[start_point], _value]
+                del self._chunks[chunk], self._firsts[chunk]
+
+        if removed:
+            interval_start, interval_stop, value = removed[0]
+            if interval_start < start:
+                self._insert(interval_start, start, value)
+            interval_start, interval_stop, value = removed[-1]
+            if interval_stop > stop:
+                self._insert(stop, interval_stop, value)
+
+    def _overlapping(self, start, stop):
+        """
+        Yield (start, stop, value) for each interval overlapping <start>
+        to <stop>, in order.
+        """
+        chunk, index = self._find(start)
+        if chunk < 0:
+            chunk, index = 0, 0
+        elif self._chunks[chunk][1][index] <= start:
+            index += 1
+
+        while chunk < len(self._chunks):
+            starts, stops, values = self._chunks[chunk]
+            while index < len(starts):
+                if starts[index] >= stop:
+                    return
+                yield starts[index], stops[index], values[index]
+                index += 1
+            chunk += 1
+            index = 0
+
+    def __setitem__(self, _slice, _value):
+        """sets an interval mapping"""
+        assert isinstance(_slice, slice), 'The key must be a slice object'
+
+        start = float('-inf') if _slice.start is None else _slice.start
+        stop = float('inf') if _slice.stop is None else _slice.stop
+        if start >= stop:
+            return
+
+        # Most intervals land in a gap, so check for that before anything else.
+        chunk, index = self._find(start)
+        if chunk < 0 and self._chunks:
+            chunk = 0
+        if self._chunks:
+            starts, stops, values = self._chunks[chunk]
+            if index < 0 or stops[index] <= start:
+                if index + 1 < len(starts):
+                    following = starts[index + 1]
+                elif chunk + 1 < len(self._chunks):
+                    following = self._firsts[chunk + 1]
                 else:
-                    self._items[start_point:] = [self._upperitem]
-                self._upperitem = _value
-        else:
-            if end_point>=0:
-                self._bounds[:end_point] = [_slice.stop]
-                self._items[:end_point] = [_value]
-            else:
-                self._bounds[:] = []
-                self._items[:] = []
-                self._upperitem = _value
+                    following = stop
+                if following >= stop:
+                    if _value is not None:
+                        self._insert_at(chunk, index + 1, start, stop, _value)
+                    return
+
+        self._remove(start, stop)
+        if _value is not None:
+            self._insert(start, stop, _value)
 
     def __getitem__(self,_point):
         """gets a value from the mapping"""
         assert not isinstance(_point, slice), 'The key cannot be a slice object'
 
-        index = bisect_right(self._bounds, _point)
-        if index < len(self._bounds):
-            return self._items[index]
-        else:
-            return self._upperitem
+        chunk = bisect_right(self._firsts, _point) - 1
+        if chunk >= 0:
+            starts, stops, values = self._chunks[chunk]
+            index = bisect_right(starts, _point) - 1
+            if _point < stops[index]:
+                return values[index]
+        return None
+
+    def overlapping(self, start=None, stop=None):
+        """returns an iterator over the items overlapping start to stop,
+        in the same format as items()"""
+        start = float('-inf') if start is None else start
+        stop = float('inf') if stop is None else stop
+        for interval_start, interval_stop, value in self._overlapping(start, stop):
+            yield (
+                None if interval_start == float('-inf') else interval_start,
+                None if interval_stop == float('inf') else interval_stop,
+            ), value
 
     def items(self):
         """returns an iterator with each item being
         ((low_bound, high_bound), value)
         these items are returned in order"""
-        previous_bound = None
-        for (b, v) in zip(self._bounds, self._items):
-            if v is not None:
-                yield (previous_bound, b), v
-            previous_bound = b
-        if self._upperitem is not None:
-            yield (previous_bound, None), self._upperitem
+        return self.overlapping()
 
     def values(self):
         """returns an iterator with each item being a stored value
         the items are returned in order"""
-        for v in self._items:
-            if v is not None:
+        for starts, stops, values in self._chunks:
+            for v in values:
                 yield v
-        if self._upperitem is not None:
-            yield self._upperitem
 
     def __repr__(self):
         s = []
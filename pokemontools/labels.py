@@ -36,6 +36,7 @@ class Labels(object):
             self.path = os.path.join(self.config.path, self.filename)
 
         self.labels = sym.read_symfile(self.path)
+        self.index = sym.SymbolIndex(self.labels)
 
 def find_symfile_in_dir(path):
     for filename in os.listdir(path):
@@ -4,6 +4,8 @@ Pokemon Crystal data de/compression.
 """
 from __future__ import print_function
 
+import bisect
+
 """
 A rundown of Pokemon Crystal's compression scheme:
 
@@ -43,11 +45,207 @@ If 0xff is encountered instead of a command, decompression ends.
 """
 lz_end = 0xff
 
+"""
+Bump this whenever Compressed output changes, so cached output is thrown out.
+"""
+compressor_version = 2
+
 
 bit_flipped = [
     sum(((byte >> i) & 1) << (7 - i) for i in range(8))
     for byte in range(0x100)
 ]
+bit_flip_table = bytearray(bit_flipped)
+
+
+def byte_view(data):
+    """
+    Return data as a sequence of ints, without copying it where possible.
+
+    bytearrays are used as-is. Other buffers (bytes, mmap) get a memoryview.
+    Python 2 buffers index to characters, so those are still copied.
+    """
+    if isinstance(data, bytearray):
+        return data
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return bytearray(data)
+    if not hasattr(view, 'cast'):
+        return bytearray(data)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view
+
+
+"""
+Lookbacks shorter than this are never worth a command, so they aren't indexed.
+"""
+min_lookback = 3
+
+
+def match_length(a, i, b, j, limit):
+    """
+    Return the length of the common prefix of a[i:] and b[j:], up to limit.
+
+    Slices are compared in exponentially growing steps,
+    so a match of length n only takes O(log n) comparisons.
+    """
+    length = 0
+    step = 1
+    while length < limit:
+        step = min(step, limit - length)
+        if a[i + length : i + length + step] == b[j + length : j + length + step]:
+            length += step
+            step *= 2
+        elif step > 1:
+            step //= 2
+        else:
+            break
+    return length
+
+
+def is_two_byte_offset(address, index):
+    """
+    Lookbacks within 0x80 bytes use a one-byte negative offset. Anything else is absolute.
+    """
+    return not (0 < address - index - 1 <= 0x7f)
+
+
+class LookbackIndex:
+    """
+    Find the best repeat, flip or reverse source for any address in some data.
+
+    Each method gets its own source string: the data itself, the data
+    with each byte bit-flipped, and the data backwards. A lookback for any
+    method is then just a forward match between the data and its source.
+
+    The positions of every 3-byte sequence in each source are indexed
+    once up front. A search only walks the chain for the bytes at the
+    address, nearest index first, so the total time is near-linear.
+    """
+
+    # How many candidates to try before settling for the best so far.
+    max_chain = 0x40
+
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.size = len(self.data)
+
+        self.sources = {
+            'repeat':  self.data,
+            'flip':    self.data.translate(bit_flip_table),
+            'reverse': self.data[::-1],
+        }
+
+        self.chains = {}
+        for method, source in self.sources.items():
+            chains = {}
+            for position in range(self.size - min_lookback + 1):
+                key = bytes(source[position : position + min_lookback])
+                chains.setdefault(key, []).append(position)
+            self.chains[method] = chains
+
+    def candidates(self, method, address):
+        """
+        Yield (index, position in source) for each usable index, nearest first.
+        """
+        key = bytes(self.data[address : address + min_lookback])
+        positions = self.chains[method].get(key, [])
+
+        if method == 'reverse':
+            # Reversed data is read backwards from the index, so position = size - 1 - index.
+            first = bisect.bisect_right(positions, self.size - 1 - address)
+            for position in positions[first : first + self.max_chain]:
+                yield self.size - 1 - position, position
+        else:
+            last = bisect.bisect_left(positions, address)
+            for position in reversed(positions[max(0, last - self.max_chain) : last]):
+                yield position, position
+
+    def find(self, method, address):
+        """
+        Return the (length, index) of the best lookback at address, or (0, None).
+
+        One-byte offsets are worth an extra byte of length. Ties go to the nearest index.
+        """
+        limit = min(max_length, self.size - address)
+        if limit < min_lookback:
+            return 0, None
+
+        source = self.sources[method]
+        lookback = 0, None
+        best_score = 0
+
+        for index, position in self.candidates(method, address):
+            two_byte = is_two_byte_offset(address, index)
+
+            # Skip anything too short to beat the best so far with one comparison.
+            needed = best_score + two_byte + 1
+            if needed > limit:
+                if two_byte and address - index > 1:
+                    # Every index from here on is two bytes too.
+                    break
+                continue
+            if two_byte and index >= 0x8000:
+                # Absolute offsets with bit 7 set would be read as negative.
+                continue
+            if self.data[address : address + needed] != source[position : position + needed]:
+                continue
+
+            length = needed + match_length(self.data, address + needed, source, position + needed, limit - needed)
+            lookback = length, index
+            best_score = length - two_byte
+
+            if length == limit:
+                # Indexes further back can't do any better.
+                break
+
+        return lookback
+
+
+class RangeMin:
+    """
+    Minimum (value, index) over a range of a list that is filled in from the end.
+
+    A sparse table: level k holds the minimum of the 2**k values starting at
+    each index. Setting a value only needs the values after it, and ranges of
+    up to max_length can be queried in constant time.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.levels = [[None] * size]
+        while 1 << len(self.levels) <= min(size, max_length):
+            self.levels.append([None] * size)
+
+    def set(self, index, value):
+        self.levels[0][index] = value, index
+        span = 1
+        for level, below in zip(self.levels[1:], self.levels):
+            if index + span * 2 > self.size:
+                break
+            level[index] = min(below[index], below[index + span])
+            span *= 2
+
+    def min(self, start, stop):
+        level = self.levels[(stop - start).bit_length() - 1]
+        return min(level[start], level[stop - (1 << ((stop - start).bit_length() - 1))])
+
+
+def cheapest_commands(table, address, length):
+    """
+    Yield the (cost, end) of the cheapest command at address covering up to length bytes,
+    once for a short command (1-byte header) and once for a long one (2-byte header).
+    """
+    short = min(length, lowmax)
+    if short > 0:
+        cost, end = table.min(address + 1, address + short + 1)
+        yield cost + 1, end
+    long_ = min(length, max_length)
+    if long_ > lowmax:
+        cost, end = table.min(address + lowmax + 1, address + long_ + 1)
+        yield cost + 2, end
 
 
 class Compressed:
@@ -62,6 +260,9 @@ class Compressed:
         c.data = data
         lz = c.compress()
 
+    For the smallest output rather than matching the target compressor:
+        lz = Compressed(data, optimal=True).output
+
     There are some issues with reproducing the target compressor.
     Some notes are listed here:
         - the criteria for detecting a lookback is inconsistent
@@ -101,9 +302,10 @@ class Compressed:
             'commands': lz_commands,
             'debug': False,
             'literal_only': False,
+            'optimal': False,
         })
 
-        self.arg_names = 'data', 'commands', 'debug', 'literal_only'
+        self.arg_names = 'data', 'commands', 'debug', 'literal_only', 'optimal'
 
         self.__dict__.update(kwargs)
         self.__dict__.update(dict(zip(self.arg_names, args)))
@@ -117,7 +319,7 @@ class Compressed:
 
         self.data = list(bytearray(self.data))
 
-        self.indexes = {}
+        self.lookback_index = LookbackIndex(self.data)
         self.lookbacks = {}
         for method in self.lookback_methods:
             self.lookbacks[method] = {}
@@ -127,6 +329,11 @@ class Compressed:
         self.output  = []
         self.literal = None
 
+        if self.optimal:
+            self.compress_optimal()
+            self.output += [lz_end]
+            return self.output
+
         while self.address < self.end:
 
             if self.score():
@@ -143,11 +350,97 @@ class Compressed:
         self.output += [lz_end]
         return self.output
 
+    def compress_optimal(self):
+        """
+        Find the smallest possible encoding instead of picking a winner at each address.
+
+        cost[i] is the fewest bytes needed to encode data[i:]. Working backwards,
+        each command at i can cover any length up to its run (or match) length,
+        so the best choice is a range minimum over the costs that follow.
+        Lookbacks come from the same precomputed index as the greedy parser.
+        """
+        self.reset_scores()
+
+        end = self.end
+        data = self.data
+
+        # Lengths of runs starting at each address.
+        blanks = [0] * (end + 1)
+        iterates = [0] * (end + 1)
+        alternates = [0] * (end + 1)
+        for i in reversed(range(end)):
+            if data[i] == 0:
+                blanks[i] = blanks[i + 1] + 1
+            iterates[i] = iterates[i + 1] + 1 if i + 1 < end and data[i + 1] == data[i] else 1
+            if i + 2 < end and data[i + 2] == data[i]:
+                alternates[i] = alternates[i + 1] + 1
+            else:
+                alternates[i] = min(end - i, 2)
+        # alternate needs both of its bytes, even for a length of 1.
+        alternates[end - 1] = 0
+
+        # cost[i] for runs, cost[i] + i for literals.
+        costs = RangeMin(end + 1)
+        literal_costs = RangeMin(end + 1)
+        costs.set(end, 0)
+        literal_costs.set(end, end)
+
+        choices = [None] * end
+
+        for i in reversed(range(end)):
+            lengths = {
+                'blank':     (blanks[i], 0),
+                'iterate':   (iterates[i], 1),
+                'alternate': (alternates[i], 2),
+            }
+            for method in self.lookback_methods:
+                length, index = self.find_lookback(method, i)
+                if index is not None:
+                    lengths[method] = (length, 1 + is_two_byte_offset(i, index))
+
+            best = None
+            for method in self.preference:
+                if method not in lengths:
+                    continue
+                length, extra = lengths[method]
+                for cost, j in cheapest_commands(costs, i, length):
+                    cost += extra
+                    if best is None or cost < best[0]:
+                        best = cost, method, j - i
+
+            for cost, j in cheapest_commands(literal_costs, i, end - i):
+                # The literal bytes themselves are the j - i in literal_costs.
+                cost -= i
+                if best is None or cost < best[0]:
+                    best = cost, 'literal', j - i
+
+            cost, method, length = best
+            choices[i] = method, length
+            costs.set(i, cost)
+            literal_costs.set(i, cost + i)
+
+        self.address = 0
+        while self.address < end:
+            method, length = choices[self.address]
+            if method == 'literal':
+                self.literal = self.address
+                self.address += length
+                self.do_literal()
+                continue
+            if method == 'iterate':
+                self.helpers[method] = data[self.address : self.address + 1]
+            elif method == 'alternate':
+                self.helpers[method] = data[self.address : self.address + 2]
+            elif method in self.lookback_methods:
+                self.offsets[method] = self.find_lookback(method, self.address)[1]
+            self.do_cmd(method, length)
+            self.address += length
+
     def reset_scores(self):
         self.scores = {}
         self.offsets = {}
         self.helpers = {}
-        for method in self.min_scores.iterkeys():
+        for method in self.min_scores.keys():
             self.scores[method] = 0
 
     def bit_flip(self, byte):
@@ -164,7 +457,8 @@ class Compressed:
     def score(self):
         self.reset_scores()
 
-        map(self.score_literal, ['iterate', 'alternate', 'blank'])
+        for method in ['iterate', 'alternate', 'blank']:
+            self.score_literal(method)
 
         for method in self.lookback_methods:
             self.scores[method], self.offsets[method] = self.find_lookback(method, self.address)
@@ -174,7 +468,7 @@ class Compressed:
         return any(
             score
           > self.min_scores[method] + int(score > lowmax)
-            for method, score in self.scores.iteritems()
+            for method, score in self.scores.items()
         )
 
     def stop_short(self):
@@ -211,10 +505,6 @@ class Compressed:
                 self.find_lookback(method, address)
 
     def find_lookback(self, method, address=None):
-        """Temporarily stubbed, because the real function doesn't run in polynomial time."""
-        return 0, None
-
-    def broken_find_lookback(self, method, address=None):
         if address is None:
             address = self.address
 
@@ -222,78 +512,11 @@ class Compressed:
         if existing != None:
             return existing
 
-        lookback = 0, None
-
-        # Better to not carelessly optimize at the moment.
-        """
-        if address < 2:
-            return lookback
-        """
-
-        byte = self.read(address)
-        if byte is None:
-            return lookback
-
-        direction, mutate = {
-            'repeat':  ( 1, int),
-            'reverse': (-1, int),
-            'flip':    ( 1, self.bit_flip),
-        }[method]
-
-        # Doesn't seem to help
-        """
-        if mutate == self.bit_flip:
-            if byte == 0:
-                self.lookbacks[method][address] = lookback
-                return lookback
-        """
-
-        data_len = len(self.data)
-        is_two_byte_index = lambda index: int(index < address - 0x7f)
-
-        for index in self.get_indexes(mutate(byte)):
-
-            if index >= address:
-                break
-
-            old_length, old_index = lookback
-            if direction == 1:
-                if old_length > data_len - index: break
-            else:
-                if old_length > index: continue
-
-            if self.read(index) in [None]: continue
-
-            length = 1 # we know there's at least one match, or we wouldn't be checking this index
-            while 1:
-                this_byte = self.read(address + length)
-                that_byte = self.read(index + length * direction)
-                if that_byte == None or this_byte != mutate(that_byte):
-                    break
-                length += 1
-
-            score = length - is_two_byte_index(index)
-            old_score = old_length - is_two_byte_index(old_index)
-            if score >= old_score or (score == old_score and length > old_length):
-                # XXX maybe avoid two-byte indexes when possible
-                if score >= lookback[0] - is_two_byte_index(lookback[1]):
-                    lookback = length, index
+        lookback = self.lookback_index.find(method, address)
 
         self.lookbacks[method][address] = lookback
         return lookback
 
-    def get_indexes(self, byte):
-        if byte not in self.indexes:
-            self.indexes[byte] = []
-            index = -1
-            while 1:
-                try:
-                    index = self.data.index(byte, index + 1)
-                except ValueError:
-                    break
-                self.indexes[byte].append(index)
-        return self.indexes[byte]
-
     def score_literal(self, method):
         address = self.address
 
@@ -315,12 +538,11 @@ class Compressed:
         self.helpers[method] = compare
 
     def do_winner(self):
-        winners = filter(
-            lambda method_score:
-                method_score[1]
-              > self.min_scores[method_score[0]] + int(method_score[1] > lowmax),
-            self.scores.iteritems()
-        )
+        winners = [
+            (method, score)
+            for method, score in self.scores.items()
+            if score > self.min_scores[method] + int(score > lowmax)
+        ]
         winners.sort(
             key = lambda method_score1: (
                 -(method_score1[1] - self.min_scores[method_score1[0]] - int(method_score1[1] > lowmax)),
@@ -362,11 +584,11 @@ class Compressed:
             offset = self.offsets[cmd]
             # Negative offsets are one byte.
             # Positive offsets are two.
-            if 0 < start_address - offset - 1 <= 0x7f:
+            if not is_two_byte_offset(start_address, offset):
                 offset = (start_address - offset - 1) | 0x80
                 output += [offset]
             else:
-                output += [offset / 0x100, offset % 0x100] # big endian
+                output += [offset >> 8, offset & 0xff] # big endian
 
         if self.debug:
             print(' '.join(map(str, [
@@ -396,6 +618,12 @@ class Decompressed:
 
     To decompress from offset 0x80000 in a rom:
         data = Decompressed(rom, start=0x80000).output
+
+    The rom isn't copied, so it can be a bytearray or an mmap.
+    Only the compressed bytes that were read are kept, in compressed_data.
+
+    Commands are only recorded for command_list() in debug mode:
+        print(Decompressed(lz, debug=True).command_list())
     """
 
     lz = None
@@ -455,10 +683,13 @@ class Decompressed:
         if lz is not None:
             self.lz = lz
 
-        self.lz = bytearray(self.lz)
+        self.lz = byte_view(self.lz)
 
         self.used_commands = []
-        self.output = []
+
+        # Blanks are free, since the output starts out zeroed.
+        self.output = bytearray(self.measure())
+        self.output_address = 0
 
         while 1:
 
@@ -482,20 +713,65 @@ class Decompressed:
                 self.length = (next(self) & 0b00011111) + 1
 
             self.__class__.__dict__[self.cmd_name](self)
-
-            self.used_commands += [(
-                self.cmd_name,
-                {
-                    'length':     self.length,
-                    'address':    cmd_address,
-                    'offset':     self.offset,
-                    'cmd_length': self.address - cmd_address,
-                    'direction':  self.direction,
-                }
-            )]
+            self.output_address += self.length
+
+            if self.debug:
+                self.used_commands += [(
+                    self.cmd_name,
+                    {
+                        'length':     self.length,
+                        'address':    cmd_address,
+                        'offset':     self.offset,
+                        'cmd_length': self.address - cmd_address,
+                        'direction':  self.direction,
+                    }
+                )]
 
         # Keep track of the data we just decompressed.
-        self.compressed_data = self.lz[self.start : self.address]
+        self.compressed_data = bytearray(self.lz[self.start : self.address])
+        self.compressed_length = self.address - self.start
+
+        return self.output
+
+
+    def measure(self):
+        """
+        Return the length of the decompressed data by reading only the command headers.
+        """
+        lz = self.lz
+        address = self.address
+        length = 0
+
+        parameter_lengths = {
+            'literal':   None,
+            'iterate':   1,
+            'alternate': 2,
+            'blank':     0,
+        }
+
+        while lz[address] != lz_end:
+            cmd = lz[address] >> 5
+            if self.command_names.get(cmd) == 'long':
+                cmd = (lz[address] & 0b00011100) >> 2
+                cmd_length = (lz[address] & 0b00000011) * 0x100 + lz[address + 1] + 1
+                address += 2
+            else:
+                cmd_length = (lz[address] & 0b00011111) + 1
+                address += 1
+
+            name = self.command_names.get(cmd)
+            if name == 'literal':
+                address += cmd_length
+            elif name in parameter_lengths:
+                address += parameter_lengths[name]
+            elif lz[address] >= 0x80:
+                address += 1
+            else:
+                address += 2
+
+            length += cmd_length
+
+        return length
 
 
     @property
@@ -507,6 +783,8 @@ class Decompressed:
         self.address += 1
         return byte
 
+    __next__ = next
+
     @property
     def cmd_name(self):
         return self.command_names.get(self.cmd)
@@ -517,7 +795,7 @@ class Decompressed:
         if self.byte >= 0x80: # negative
             # negative
             offset = next(self) & 0x7f
-            offset = len(self.output) - offset - 1
+            offset = self.output_address - offset - 1
         else:
             # positive
             offset =  next(self) * 0x100
@@ -526,31 +804,34 @@ class Decompressed:
         self.offset = offset
 
 
+    def write(self, data):
+        self.output[ self.output_address : self.output_address + self.length ] = data
+
     def literal(self):
         """
         Copy data directly.
         """
-        self.output  += self.lz[ self.address : self.address + self.length ]
+        self.write(self.lz[ self.address : self.address + self.length ])
         self.address += self.length
 
     def iterate(self):
         """
         Write one byte repeatedly.
         """
-        self.output += [next(self)] * self.length
+        self.write(bytearray([next(self)]) * self.length)
 
     def alternate(self):
         """
         Write alternating bytes.
         """
-        alts = [next(self), next(self)]
-        self.output += [ alts[x & 1] for x in range(self.length) ]
+        alts = bytearray([next(self), next(self)])
+        self.write((alts * ((self.length + 1) // 2))[:self.length])
 
     def blank(self):
         """
         Write zeros.
         """
-        self.output += [0] * self.length
+        pass
 
     def flip(self):
         """
@@ -558,7 +839,7 @@ class Decompressed:
 
         Example: 11100100 -> 00100111
         """
-        self._repeat(table=bit_flipped)
+        self._repeat(table=bit_flip_table)
 
     def reverse(self):
         """
@@ -575,7 +856,35 @@ class Decompressed:
     def _repeat(self, direction=1, table=None):
         self.get_offset()
         self.direction = direction
-        # Note: appends must be one at a time (this way, repeats can draw from themselves if required)
-        for i in range(self.length):
-            byte = self.output[ self.offset + i * direction ]
-            self.output.append( table[byte] if table else byte )
+
+        start  = self.output_address
+        length = self.length
+        offset = self.offset
+
+        if direction == 1 and 0 <= offset and offset + length <= start:
+            data = self.output[ offset : offset + length ]
+
+        elif direction == -1 and length - 1 <= offset < start:
+            data = self.output[ offset - length + 1 : offset + 1 ][::-1]
+
+        elif direction == 1 and table is None and 0 <= offset < start:
+            # The source runs into the bytes being written, so it repeats every start - offset bytes.
+            period = self.output[ offset : start ]
+            data = (period * (length // len(period) + 1))[:length]
+
+        else:
+            # Byte by byte, so repeats can draw from themselves if required.
+            for i in range(length):
+                index = offset + i * direction
+                if index < 0:
+                    # Wrap around from the current position.
+                    index += start + i
+                if index >= start + i:
+                    raise IndexError('lz lookback past the end of the output')
+                byte = self.output[ index ]
+                self.output[ start + i ] = table[byte] if table else byte
+            return
+
+        if table:
+            data = data.translate(table)
+        self.write(data)
@@ -49,11 +49,8 @@ def read_map_blockdata(map_header):
     height = map_header.second_map_header.blockdata.height.byte
 
     start_address = map_header.second_map_header.blockdata.address
-    end_address = start_address + (width * height)
 
-    blockdata = crystal.rom[start_address : end_address]
-
-    return [ord(x) for x in blockdata]
+    return crystal.rom.interval(start_address, width * height, strings=False)
 
 def load_png(filepath):
     """
@@ -221,8 +218,7 @@ def load_all_sprite_images(config=config):
     current_image_id = 0
 
     for sprite_id in xrange(1, sprite_count):
-        rom_bytes = crystal.rom[current_address : current_address + sprite_header_size]
-        header = [ord(x) for x in rom_bytes]
+        header = crystal.rom.interval(current_address, sprite_header_size, strings=False)
 
         bank = header[3]
 
@@ -82,7 +82,7 @@ def old_parse(self, *args, **kwargs):
         #reset variables so we don't contaminate this command
         info, long_info, size = None, None, 0
         #read the current command byte
-        command_byte = ord(rom[offset])
+        command_byte = rom[offset]
         #setup the current command representation
         command = {"type": command_byte, "start_address": offset}
 
@@ -205,7 +205,7 @@ def old_parse(self, *args, **kwargs):
             .. then go to pointed script, else resume interpreting after the pointer
             """
             size = 4
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
             pointer = calculate_pointer_from_bytes_at(start_address+2)
             if debug:
                 print("in script starting at "+hex(original_start_address)+\
@@ -221,7 +221,7 @@ def old_parse(self, *args, **kwargs):
             .. then go to pointed script, else resume interpreting after the pointer
             """
             size = 4
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
             pointer = calculate_pointer_from_bytes_at(start_address+2)
             if debug:
                 print("in script starting at "+hex(original_start_address)+\
@@ -267,7 +267,7 @@ def old_parse(self, *args, **kwargs):
             .. then go to pointed script, else resume interpreting after the pointer
             """
             size = 4
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
             pointer = calculate_pointer_from_bytes_at(start_address+2)
             if debug:
                 print("in script starting at "+hex(original_start_address)+\
@@ -283,7 +283,7 @@ def old_parse(self, *args, **kwargs):
             .. then go to pointed script, else resume interpreting after the pointer
             """
             size = 4
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
             pointer = calculate_pointer_from_bytes_at(start_address+2)
             if debug:
                 print("in script starting at "+hex(original_start_address)+\
@@ -300,8 +300,8 @@ def old_parse(self, *args, **kwargs):
             """
             size = 3
             end = True
-            byte1 = ord(rom[offset+1])
-            byte2 = ord(rom[offset+2])
+            byte1 = rom[offset+1]
+            byte2 = rom[offset+2]
             number = byte1 + (byte2 << 8)
             #0000 to 000AD ... XXX how should these be handled?
             command["predefined_script_number"] = number
@@ -312,8 +312,8 @@ def old_parse(self, *args, **kwargs):
             [0D][xxyy]
             """
             size = 3
-            byte1 = ord(rom[offset+1])
-            byte2 = ord(rom[offset+2])
+            byte1 = rom[offset+1]
+            byte2 = rom[offset+2]
             number = byte1 + (byte2 << 8)
             #0000 to 000AD ... XXX how should these be handled?
             command["predefined_script_number"] = number
@@ -334,8 +334,8 @@ def old_parse(self, *args, **kwargs):
             NOTE: For (some) dialogues the font needs to be loaded with the Text box&font code.
             """
             size = 3
-            byte1 = ord(rom[offset+1])
-            byte2 = ord(rom[offset+2])
+            byte1 = rom[offset+1]
+            byte2 = rom[offset+2]
             number = byte1 + (byte2 << 8)
             command["predefined_script_number"] = number
         elif command_byte == 0x10: #ASM code2 [2b]
@@ -355,8 +355,8 @@ def old_parse(self, *args, **kwargs):
             [11][map group][map number]
             """
             size = 3
-            command["map_group"] = ord(rom[start_address+1])
-            command["map_id"] = ord(rom[start_address+2])
+            command["map_group"] = rom[start_address+1]
+            command["map_id"] = rom[start_address+2]
         elif command_byte == 0x12: #Activate trigger event from afar [xxyyzz]
             info = "Activate trigger event from afar [xx][yy][zz]"
             long_info = """
@@ -365,9 +365,9 @@ def old_parse(self, *args, **kwargs):
             [12][MapBank][MapNo][xx]
             """
             size = 4
-            command["map_group"] = ord(rom[start_address+1])
-            command["map_id"] = ord(rom[start_address+2])
-            command["trigger_number"] = ord(rom[start_address+3])
+            command["map_group"] = rom[start_address+1]
+            command["map_id"] = rom[start_address+2]
+            command["trigger_number"] = rom[start_address+3]
         elif command_byte == 0x13: #Trigger event check
             info = "Trigger event check"
             long_info = """
@@ -384,12 +384,12 @@ def old_parse(self, *args, **kwargs):
             deactivate? Just activate a different trigger event number. There's a limit of 1 active trigger.
             """
             size = 2
-            command["trigger_number"] = ord(rom[start_address+1])
+            command["trigger_number"] = rom[start_address+1]
         elif command_byte == 0x15: #Load variable into RAM [xx]
             info = "Load variable into RAM [xx]"
             long_info = "[15][xx]"
             size = 2
-            command["variable"] = ord(rom[start_address+1])
+            command["variable"] = rom[start_address+1]
         elif command_byte == 0x16: #Add variables [xx]
             info = "Add variables [xx]"
             long_info = """
@@ -397,7 +397,7 @@ def old_parse(self, *args, **kwargs):
             #[16][xx]
             """
             size = 2
-            command["variable"] = ord(rom[start_address+1])
+            command["variable"] = rom[start_address+1]
         elif command_byte == 0x17: #Random number [xx]
             info = "Random number [xx]"
             long_info = """
@@ -407,7 +407,7 @@ def old_parse(self, *args, **kwargs):
             #Random number gets written to RAM.
             """
             size = 2
-            command["rarest"] = ord(rom[start_address+1])
+            command["rarest"] = rom[start_address+1]
         elif command_byte == 0x18: #Version check
             info = "G/S version check"
             long_info = """
@@ -442,7 +442,7 @@ def old_parse(self, *args, **kwargs):
             """
             size = 4
             command["pointer"] = calculate_pointer_from_bytes_at(start_address+1, bank=False)
-            command["value"] = ord(rom[start_address+3])
+            command["value"] = rom[start_address+3]
         elif command_byte == 0x1C: #Check codes [xx]
             #XXX no idea what's going on in this one :(
             info = "Check pre-ID-mapped RAM location [xx]"
@@ -490,7 +490,7 @@ def old_parse(self, *args, **kwargs):
             #14 = phone call number
             """
             size = 2 #i think?
-            command["following_part"] = ord(rom[start_address+1])
+            command["following_part"] = rom[start_address+1]
         elif command_byte == 0x1D: #Input code1 [xx]
             info = "Write to pre-ID-mapped RAM location [xx]"
             long_info = """
@@ -499,7 +499,7 @@ def old_parse(self, *args, **kwargs):
             #where [following part] is the same as 0x1C
             """
             size = 2
-            command["following_part"] = ord(rom[start_address+1])
+            command["following_part"] = rom[start_address+1]
         elif command_byte == 0x1E: #Input code2 [xxyy]
             info = "Write byte value to pre-ID-mapped RAM location [aa][xx]"
             long_info = """
@@ -508,8 +508,8 @@ def old_parse(self, *args, **kwargs):
             #where [following part] is the same as 0x1C
             """
             size = 3
-            command["following_part"] = ord(rom[start_address+1])
-            command["value"] = ord(rom[start_address+2])
+            command["following_part"] = rom[start_address+1]
+            command["value"] = rom[start_address+2]
         elif command_byte == 0x1F: #Give item code [xxyy]
             info = "Give item by id and quantity [xx][yy]"
             long_info = """
@@ -520,8 +520,8 @@ def old_parse(self, *args, **kwargs):
             #[1F][item no][amount]
             """
             size = 3
-            command["item_id"] = ord(rom[start_address+1])
-            command["quantity"] = ord(rom[start_address+2])
+            command["item_id"] = rom[start_address+1]
+            command["quantity"] = rom[start_address+2]
         elif command_byte == 0x20: #Take item code [xxyy]
             info = "Take item by id and quantity [xx][yy]"
             long_info = """
@@ -531,8 +531,8 @@ def old_parse(self, *args, **kwargs):
             #[20][item no][amount]
             """
             size = 3
-            command["item_id"] = ord(rom[start_address+1])
-            command["quantity"] = ord(rom[start_address+2])
+            command["item_id"] = rom[start_address+1]
+            command["quantity"] = rom[start_address+2]
         elif command_byte == 0x21: #Check for item code [xx]
             info = "Check if player has item [xx]"
             long_info = """
@@ -543,7 +543,7 @@ def old_parse(self, *args, **kwargs):
             #[21][item no]
             """
             size = 2
-            command["item_id"] = ord(rom[start_address+1])
+            command["item_id"] = rom[start_address+1]
         elif command_byte == 0x22: #Give money code [xxyyzzaa]
             info = "Give money to HIRO/account [xxyyzzaa]"
             long_info = """
@@ -634,7 +634,7 @@ def old_parse(self, *args, **kwargs):
             #04 = elm
             """
             size = 2
-            command["number"] = ord(rom[start_address+1])
+            command["number"] = rom[start_address+1]
         elif command_byte == 0x29: #Take cell phone number [xx]
             info = "Delete cell phone number [xx]"
             long_info = """
@@ -646,7 +646,7 @@ def old_parse(self, *args, **kwargs):
             #[29][xx]
             """
             size = 2
-            command["number"] = ord(rom[start_address+1])
+            command["number"] = rom[start_address+1]
         elif command_byte == 0x2A: #Check for cell phone number [xx]
             info = "Check for cell phone number [xx]"
             long_info = """
@@ -658,7 +658,7 @@ def old_parse(self, *args, **kwargs):
             #[2A][xx]
             """
             size = 2
-            command["number"] = ord(rom[start_address+1])
+            command["number"] = rom[start_address+1]
         elif command_byte == 0x2B: #Check time of day [xx]
             info = "Check time of day [xx]"
             long_info = """
@@ -669,7 +669,7 @@ def old_parse(self, *args, **kwargs):
             #[2B][time of day (01morn-04night)]
             """
             size = 2
-            command["time_of_day"] = ord(rom[start_address+1])
+            command["time_of_day"] = rom[start_address+1]
         elif command_byte == 0x2C: #Check for PKMN [xx]
             info = "Check for pokemon [xx]"
             long_info = """
@@ -681,7 +681,7 @@ def old_parse(self, *args, **kwargs):
             #[2C][xx]
             """
             size = 2
-            command["pokemon_id"] = ord(rom[start_address+1])
+            command["pokemon_id"] = rom[start_address+1]
         elif command_byte == 0x2D: #Give PKMN [xxyyzzaa(+2b +2b)]
             info = "Give pokemon [pokemon][level][item][trainer2b][...]"
             long_info = """
@@ -715,8 +715,8 @@ def old_parse(self, *args, **kwargs):
             #[2E][PKMN][PKMNlvl]
             """
             size = 3
-            command["pokemon_id"] = ord(rom[start_address+1])
-            command["pokemon_level"] = ord(rom[start_address+2])
+            command["pokemon_id"] = rom[start_address+1]
+            command["pokemon_level"] = rom[start_address+2]
         elif command_byte == 0x2F: #Attach item code [2B]
             info = "Attach item to last pokemon in list [xxyy]"
             long_info = """
@@ -848,8 +848,8 @@ def old_parse(self, *args, **kwargs):
             #[3B][Map bank][Map no]
             """
             size = 3
-            command["map_group"] = ord(rom[start_address+1])
-            command["map_id"] = ord(rom[start_address+2])
+            command["map_group"] = rom[start_address+1]
+            command["map_id"] = rom[start_address+2]
         elif command_byte == 0x3C: #Warp code [xxyyzzaa]
             info = "Warp to [map group][map id][x][y]"
             long_info = """
@@ -860,10 +860,10 @@ def old_parse(self, *args, **kwargs):
             #[3C][Map bank][Map no][X][Y]
             """
             size = 5
-            command["map_group"] = ord(rom[start_address+1])
-            command["map_id"] = ord(rom[start_address+2])
-            command["x"] = ord(rom[start_address+3])
-            command["y"] = ord(rom[start_address+4])
+            command["map_group"] = rom[start_address+1]
+            command["map_id"] = rom[start_address+2]
+            command["x"] = rom[start_address+3]
+            command["y"] = rom[start_address+4]
         elif command_byte == 0x3D: #Account code [xxyy]
             info = "Read money amount [xx][yy]"
             long_info = """
@@ -873,8 +873,8 @@ def old_parse(self, *args, **kwargs):
             #see http://hax.iimarck.us/files/scriptingcodes_eng.htm#InText01
             """
             size = 3
-            command["account_id"] = ord(rom[start_address+1])
-            command["memory_id"] = ord(rom[start_address+2])
+            command["account_id"] = rom[start_address+1]
+            command["memory_id"] = rom[start_address+2]
         elif command_byte == 0x3E: #Coin case code [xx]
             info = "Read coins amount [xx]"
             long_info = """
@@ -883,7 +883,7 @@ def old_parse(self, *args, **kwargs):
             #[3E][00-02 MEMORY]
             """
             size = 2
-            command["memory_id"] = ord(rom[start_address+1])
+            command["memory_id"] = rom[start_address+1]
         elif command_byte == 0x3F: #Display RAM [xx]
             info = "Copy script RAM value into memX [xx]"
             long_info = """
@@ -891,7 +891,7 @@ def old_parse(self, *args, **kwargs):
             #[3F][00-02 MEMORY]
             """
             size = 2
-            command["memory_id"] = ord(rom[start_address+1])
+            command["memory_id"] = rom[start_address+1]
         elif command_byte == 0x40: #Display pokémon name [xxyy]
             info = "Copy pokemon name (by id) to memX [id][xx]"
             long_info = """
@@ -899,8 +899,8 @@ def old_parse(self, *args, **kwargs):
             #[40][PKMN no][00-02 MEMORY]
             """
             size = 3
-            command["map_id"] = ord(rom[start_address+1])
-            command["memory_id"] = ord(rom[start_address+2])
+            command["map_id"] = rom[start_address+1]
+            command["memory_id"] = rom[start_address+2]
         elif command_byte == 0x41: #Display item name [xxyy]
             info = "Copy item name (by id) to memX [id][xx]"
             long_info = """
@@ -908,8 +908,8 @@ def old_parse(self, *args, **kwargs):
             #[41][Item no][00-02 MEMORY]
             """
             size = 3
-            command["item_id"] = ord(rom[start_address+1])
-            command["memory_id"] = ord(rom[start_address+2])
+            command["item_id"] = rom[start_address+1]
+            command["memory_id"] = rom[start_address+2]
         elif command_byte == 0x42: #Display location name [xx]
             info = "Copy map name to memX [xx]"
             long_info = """
@@ -917,7 +917,7 @@ def old_parse(self, *args, **kwargs):
             #[42][00-02 MEMORY]
             """
             size = 2
-            command["memory_id"] = ord(rom[start_address+1])
+            command["memory_id"] = rom[start_address+1]
         elif command_byte == 0x43: #Display trainer name [xxyyzz]
             info = "Copy trainer name (by id&group) to memZ [xx][yy][zz]"
             long_info = """
@@ -925,9 +925,9 @@ def old_parse(self, *args, **kwargs):
             #[43][Trainer number][Trainer group][00-02 MEMORY]
             """
             size = 4
-            command["trainer_id"] = ord(rom[start_address+1])
-            command["trainer_group"] = ord(rom[start_address+2])
-            command["memory_id"] = ord(rom[start_address+3])
+            command["trainer_id"] = rom[start_address+1]
+            command["trainer_group"] = rom[start_address+2]
+            command["memory_id"] = rom[start_address+3]
         elif command_byte == 0x44: #Display strings [2b + xx]
             info = "Copy text (by pointer) to memX [aabb][xx]"
             long_info = """
@@ -937,7 +937,7 @@ def old_parse(self, *args, **kwargs):
             """
             size = 4
             command["pointer"] = calculate_pointer_from_bytes_at(start_address+1, bank=False)
-            command["memory_id"] = ord(rom[start_address+3])
+            command["memory_id"] = rom[start_address+3]
             command["text"] = parse_text_engine_script_at(command["pointer"], map_group=map_group, map_id=map_id, debug=debug)
         elif command_byte == 0x45: #Stow away item code
             info = "Show HIRO put the ITEMNAME in the ITEMPOCKET text box"
@@ -965,7 +965,7 @@ def old_parse(self, *args, **kwargs):
             #xx is a dummy byte
             """
             size = 2
-            command["dummy"] = ord(rom[start_address+1])
+            command["dummy"] = rom[start_address+1]
         elif command_byte == 0x49: #Load moving sprites
             info = "Load moving sprites into memory"
             long_info = "Loads moving sprites for person events into ram."
@@ -977,7 +977,7 @@ def old_parse(self, *args, **kwargs):
             #[4A][Byte]
             """
             size = 2
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
         elif command_byte == 0x4B: #Display text [3b]
             info = "Display text by pointer [bb][xxyy]"
             long_info = """
@@ -985,7 +985,7 @@ def old_parse(self, *args, **kwargs):
             #[4B][Text bank][2byte text pointer]
             """
             size = 4
-            command["text_group"] = ord(rom[start_address+1])
+            command["text_group"] = rom[start_address+1]
             command["pointer"] = calculate_pointer_from_bytes_at(start_address+1, bank=True)
             command["text"] = parse_text_engine_script_at(command["pointer"], map_group=map_group, map_id=map_id, debug=debug)
         elif command_byte == 0x4C: #Display text [2b]
@@ -1070,7 +1070,7 @@ def old_parse(self, *args, **kwargs):
             #     =00 : Pokémon no gets read from RAM
             """
             size = 2
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
         elif command_byte == 0x57: #Pokémon picture YES/NO code
             info = "?? Display a pokemon picture and a yes/no box"
             long_info = """
@@ -1123,8 +1123,8 @@ def old_parse(self, *args, **kwargs):
             #[5C][Poke no][Level]
             """
             size = 3
-            command["pokemon_id"] = ord(rom[start_address+1])
-            command["pokemon_level"] = ord(rom[start_address+2])
+            command["pokemon_id"] = rom[start_address+1]
+            command["pokemon_level"] = rom[start_address+2]
         elif command_byte == 0x5E: #Load trainer data2 [xxyy]
             info = "Load trainer by group/id for BattleRAM [xx][yy]"
             long_info = """
@@ -1133,8 +1133,8 @@ def old_parse(self, *args, **kwargs):
             #[5D][Trainer group][Trainer no]
             """
             size = 3
-            command["trainer_group"] = ord(rom[start_address+1])
-            command["trainer_id"] = ord(rom[start_address+2])
+            command["trainer_group"] = rom[start_address+1]
+            command["trainer_id"] = rom[start_address+2]
         elif command_byte == 0x5F: #Start battle
             info = "Start pre-configured battle"
             long_info = """
@@ -1160,7 +1160,7 @@ def old_parse(self, *args, **kwargs):
             #itself when using the item system.
             """
             size = 2
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
         elif command_byte == 0x62: #Trainer text code
             info = "Set trainer text by id [xx]"
             long_info = """
@@ -1171,7 +1171,7 @@ def old_parse(self, *args, **kwargs):
             #see http://hax.iimarck.us/files/scriptingcodes_eng.htm#Eventaufbau
             """
             size = 2
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
         elif command_byte == 0x63: #Trainer status code [xx]
             info = "? Check trainer status [xx]"
             long_info = """
@@ -1184,7 +1184,7 @@ def old_parse(self, *args, **kwargs):
             #   02 = check
             """
             size = 2
-            command["byte"] = ord(rom[start_address+1])
+            command["byte"] = rom[start_address+1]
         elif command_byte == 0x64: #Pointer Win/Lose [2b + 2b]
             info = "Set win/lose pointers for battle [xxyy][xxyy]"
             long_info = """
@@ -1241,7 +1241,7 @@ def old_parse(self, *args, **kwargs):
             #[67][person]
             """
             size = 2
-            command["person_id"] = ord(rom[start_address+1])
+            command["person_id"] = rom[start_address+1]
         elif command_byte == 0x69: #Moving code [xx + 2b]
             info = "Move person (by id) with moving data (by pointer) [id][xxyy]"
             long_info = """
@@ -1250,7 +1250,7 @@ def old_parse(self, *args, **kwargs):
             #see also http://hax.iimarck.us/files/scriptingcodes_eng.htm#ZusatzB68bis69
             """
             size = 4
-            command["person_id"] = ord(rom[start_address+1])
+            command["person_id"] = rom[start_address+1]
             command["moving_data_pointer"] = calculate_pointer_from_bytes_at(start_address+2, bank=False)
         elif command_byte == 0x6A: #Moving code for talked-to person [2b]
             info = "Move talked-to person with moving data (by pointer) [xxyy]"
@@ -1276,8 +1276,8 @@ def old_parse(self, *args, **kwargs):
             #Person1 = If number equals 0xFE, then take number of talked-to person.
             """
             size = 3
-            command["person2_id"] = ord(rom[start_address+1])
-            command["person1_id"] = ord(rom[start_address+2])
+            command["person2_id"] = rom[start_address+1]
+            command["person1_id"] = rom[start_address+2]
         elif command_byte == 0x6D: #Variable sprites [xxyy]
             info = "Store value in variable sprite RAM location x by id Y [xx][yy]"
             long_info = """
@@ -1286,8 +1286,8 @@ def old_parse(self, *args, **kwargs):
             #xx: Number between 0x00 and 0x0F
             """
             size = 3
-            command["number"] = ord(rom[start_address+1])
-            command["sprite_id"] = ord(rom[start_address+2])
+            command["number"] = rom[start_address+1]
+            command["sprite_id"] = rom[start_address+2]
         elif command_byte == 0x6E: #Hide person [xx]
             info = "Hide person by id [xx]"
             long_info = """
@@ -1295,7 +1295,7 @@ def old_parse(self, *args, **kwargs):
             #[6D][person id]
             """
             size = 2
-            command["person_id"] = ord(rom[start_address+1])
+            command["person_id"] = rom[start_address+1]
         elif command_byte == 0x6F: #Show person [xx]
             info = "Show person by id [xx]"
             long_info = """
@@ -1303,7 +1303,7 @@ def old_parse(self, *args, **kwargs):
             #[6E][person id]
             """
             size = 2
-            command["person_id"] = ord(rom[start_address+1])
+            command["person_id"] = rom[start_address+1]
         elif command_byte == 0x70: #Following code1 [xxyy]
             info = "Following code1 [leader id][follower id]"
             long_info = """
@@ -1313,8 +1313,8 @@ def old_parse(self, *args, **kwargs):
             #[6F][Leader Person2][Follower Person1]
             """
             size = 3
-            command["leader_person_id"] = ord(rom[start_address+1])
-            command["follower_person_id"] = ord(rom[start_address+2])
+            command["leader_person_id"] = rom[start_address+1]
+            command["follower_person_id"] = rom[start_address+2]
         elif command_byte == 0x71: #Stop following code
             info = "Stop all follow code"
             long_info = "Ends all current follow codes."
@@ -1327,9 +1327,9 @@ def old_parse(self, *args, **kwargs):
             #[71][Person][X][Y]
             """
             size = 4
-            command["person_id"] = ord(rom[start_address+1])
-            command["x"] = ord(rom[start_address+2])
-            command["y"] = ord(rom[start_address+3])
+            command["person_id"] = rom[start_address+1]
+            command["x"] = rom[start_address+2]
+            command["y"] = rom[start_address+3]
         elif command_byte == 0x73: #Write person location [xx] (lock person location?)
             info = "Lock person's location by id [id]"
             long_info = """
@@ -1340,7 +1340,7 @@ def old_parse(self, *args, **kwargs):
             #[72][person]
             """
             size = 2
-            command["person_id"] = ord(rom[start_address+1])
+            command["person_id"] = rom[start_address+1]
         elif command_byte == 0x74: #Load emoticons [xx]
             info = "Load emoticon bubble [xx]"
             long_info = """
@@ -1357,7 +1357,7 @@ def old_parse(self, *args, **kwargs):
             #  07 = Fish
             """
             size = 2
-            command["bubble_number"] = ord(rom[start_address+1])
+            command["bubble_number"] = rom[start_address+1]
         elif command_byte == 0x75: #Display emoticon [xxyyzz]
             info = "Display emoticon by bubble id and person id and time [xx][yy][zz]"
             long_info = """
@@ -1367,9 +1367,9 @@ def old_parse(self, *args, **kwargs):
             #for bubble ids see 0x73
             """
             size = 4
-            command["bubble_number"] = ord(rom[start_address+1])
-            command["person_id"] = ord(rom[start_address+2])
-            command["time"] = ord(rom[start_address+3])
+            command["bubble_number"] = rom[start_address+1]
+            command["person_id"] = rom[start_address+2]
+            command["time"] = rom[start_address+3]
         elif command_byte == 0x76: #Change facing [xxyy]
             info = "Set facing direction of person [person][facing]"
             long_info = """
@@ -1377,8 +1377,8 @@ def old_parse(self, *args, **kwargs):
             #[75][person][facing]
             """
             size = 3
-            command["person_id"] = ord(rom[start_address+1])
-            command["facing"] = ord(rom[start_address+2])
+            command["person_id"] = rom[start_address+1]
+            command["facing"] = rom[start_address+2]
         elif command_byte == 0x77: #Following code2 [xxyy]
             info = "Following code2 [leader id][follower id]"
             long_info = """
@@ -1387,8 +1387,8 @@ def old_parse(self, *args, **kwargs):
             #[76][Leader Person2][Follower Person1]
             """
             size = 3
-            command["leader_person_id"] = ord(rom[start_address+1])
-            command["follower_person_id"] = ord(rom[start_address+2])
+            command["leader_person_id"] = rom[start_address+1]
+            command["follower_person_id"] = rom[start_address+2]
         elif command_byte == 0x78: #Earth quake [xx]
             info = "Earthquake [xx]"
             long_info = """
@@ -1396,7 +1396,7 @@ def old_parse(self, *args, **kwargs):
             #[77][xx]
             """
             size = 2
-            command["shake_byte"] = ord(rom[start_address+1])
+            command["shake_byte"] = rom[start_address+1]
         elif command_byte == 0x79: #Exchange map [3b]
             info = "Draw map data over current map [bank][pointer]"
             long_info = """
@@ -1415,9 +1415,9 @@ def old_parse(self, *args, **kwargs):
             #[79][X][Y][Block]
             """
             size = 4
-            command["x"] = ord(rom[start_address+1])
-            command["y"] = ord(rom[start_address+2])
-            command["block"] = ord(rom[start_address+3])
+            command["x"] = rom[start_address+1]
+            command["y"] = rom[start_address+2]
+            command["block"] = rom[start_address+3]
         elif command_byte == 0x7B: #Reload map code
             info = "Reload/redisplay map"
             long_info = """
@@ -1452,7 +1452,7 @@ def old_parse(self, *args, **kwargs):
             """
             #XXX wtf?
             size = 2
-            command["first_command"] = ord(rom[start_address+1])
+            command["first_command"] = rom[start_address+1]
         elif command_byte == 0x7F: #Song code1 [xxyy]
             info = "Play music by number [xxyy]"
             long_info = """
@@ -1481,7 +1481,7 @@ def old_parse(self, *args, **kwargs):
             """
             size = 4
             command["music_number"] = rom_interval(start_address+1, 2, strings=False)
-            command["fade_time"] = ord(rom[start_address+3])
+            command["fade_time"] = rom[start_address+3]
         elif command_byte == 0x82: #Play map music code
             info = "Play map's music"
             long_info = """
@@ -1505,8 +1505,8 @@ def old_parse(self, *args, **kwargs):
             #If the cry no = 00 then the number is taken from RAM.
             """
             size = 3
-            command["cry_number"] = ord(rom[start_address+1])
-            command["other_byte"] = ord(rom[start_address+2])
+            command["cry_number"] = rom[start_address+1]
+            command["other_byte"] = rom[start_address+2]
         elif command_byte == 0x85: #Sound code [xxyy]
             info = "Play sound by sound number [xxyy]"
             long_info = """
@@ -1559,7 +1559,7 @@ def old_parse(self, *args, **kwargs):
             #   http://hax.iimarck.us/files/scriptingcodes_eng.htm#ZusatzDok5_5550
             """
             size = 2
-            command["number"] = ord(rom[start_address+1])
+            command["number"] = rom[start_address+1]
         elif command_byte == 0x8B: #Waiting code [xx]
             info = "Wait code"
             long_info = """
@@ -1569,7 +1569,7 @@ def old_parse(self, *args, **kwargs):
             #If 0x00 is chosen then the time can be manipulated by previously loading a number to RAM2.
             """
             size = 2
-            command["time"] = ord(rom[start_address+1])
+            command["time"] = rom[start_address+1]
         elif command_byte == 0x8C: #Deactivate static facing [xx]
             info = "Deactive static facing after time [xx]"
             long_info = """
@@ -1577,7 +1577,7 @@ def old_parse(self, *args, **kwargs):
             #[8B][xx]
             """
             size = 2
-            command["time"] = ord(rom[start_address+1])
+            command["time"] = rom[start_address+1]
         elif command_byte == 0x8D: #Priority jump1 [2b]
             info = "Priority jump to script by pointer [xxyy]"
             long_info = """
@@ -1672,7 +1672,7 @@ def old_parse(self, *args, **kwargs):
             #see http://hax.iimarck.us/files/scriptingcodes_eng.htm#ZusatzB93
             """
             size = 4
-            command["dialog_number"] = ord(rom[start_address+1])
+            command["dialog_number"] = rom[start_address+1]
             command["mart_number"] = rom_interval(start_address+2, 2, strings=False)
         elif command_byte == 0x95: #Elevator menu [2b]
             info = "Display elevator menu by pointer [xxyy]"
@@ -1691,7 +1691,7 @@ def old_parse(self, *args, **kwargs):
             #see http://hax.iimarck.us/files/scriptingcodes_eng.htm#ZusatzDokTausch
             """
             size = 2
-            command["trade_number"] = ord(rom[start_address+1])
+            command["trade_number"] = rom[start_address+1]
         elif command_byte == 0x97: #Give cell phone number with YES/NO [xx]
             info = "Give cell phone number by id with YES/NO [id]"
             long_info = """
@@ -1704,7 +1704,7 @@ def old_parse(self, *args, **kwargs):
             """
             size = 2
             #maybe this next param should be called "phone_number"
-            command["number"] = ord(rom[start_address+1])
+            command["number"] = rom[start_address+1]
         elif command_byte == 0x98: #Call code [2b]
             info = "Call code pointing to name of caller [xxyy]"
             long_info = """
@@ -1733,7 +1733,7 @@ def old_parse(self, *args, **kwargs):
             #  04 = Console
             """
             size = 2
-            command["ornament"] = ord(rom[start_address+1])
+            command["ornament"] = rom[start_address+1]
         elif command_byte == 0x9B: #Berry tree code [xx]
             info = "Berry tree by tree id [xx]"
             long_info = """
@@ -1745,7 +1745,7 @@ def old_parse(self, *args, **kwargs):
             """
             size = 2
             end = True
-            command["tree_id"] = ord(rom[start_address+1])
+            command["tree_id"] = rom[start_address+1]
         elif command_byte == 0x9C: #Cell phone call code [xx00]
             #XXX confirm this?
             info = "Cell phone call [2-byte call id]" #was originally: [call id][00]
@@ -1763,7 +1763,7 @@ def old_parse(self, *args, **kwargs):
             #  08 = PROF. ELM has got something for HIRO a second time
             """
             size = 3
-            command["call_id"] = ord(rom[start_address+1])
+            command["call_id"] = rom[start_address+1]
             command["id"] = rom_interval(start_address+2, 2, strings=False)
         elif command_byte == 0x9D: #Check cell phone call code
             info = "Check if/which a phone call is active"
@@ -1783,8 +1783,8 @@ def old_parse(self, *args, **kwargs):
             #[9D][Item][Amount]
             """
             size = 3
-            command["item_id"] = ord(rom[start_address+1])
-            command["quantity"] = ord(rom[start_address+2])
+            command["item_id"] = rom[start_address+1]
+            command["quantity"] = rom[start_address+2]
         elif command_byte == 0x9F: #Commented ive item code?
             info = "Give item by id and quantity with 'put in pocket' text [id][qty]"
             long_info = """
@@ -1793,8 +1793,8 @@ def old_parse(self, *args, **kwargs):
             #[9D][Item][Amount]
             """
             size = 3
-            command["item_id"] = ord(rom[start_address+1])
-            command["quantity"] = ord(rom[start_address+2])
+            command["item_id"] = rom[start_address+1]
+            command["quantity"] = rom[start_address+2]
         elif command_byte == 0xA0: #Load special wild PKMN data [xxyy]
             info = "Load wild pokemon data for a remote map [map group][map id]"
             long_info = """
@@ -1803,8 +1803,8 @@ def old_parse(self, *args, **kwargs):
             #see also http://hax.iimarck.us/files/scriptingcodes_eng.htm#ZusatzDok3E_66ED
             """
             size = 3
-            command["map_group"] = ord(rom[start_address+1])
-            command["map_id"] = ord(rom[start_address+2])
+            command["map_group"] = rom[start_address+1]
+            command["map_id"] = rom[start_address+2]
         elif command_byte == 0xA1: #Hall of Fame code
             info = "Hall of Fame"
             long_info = """
@@ -1827,11 +1827,11 @@ def old_parse(self, *args, **kwargs):
             #[A1][Facing (00-03)][Map bank][Map no][X][Y]
             """
             size = 6
-            command["facing"] = ord(rom[start_address+1])
-            command["map_group"] = ord(rom[start_address+2])
-            command["map_id"] = ord(rom[start_address+3])
-            command["x"] = ord(rom[start_address+4])
-            command["y"] = ord(rom[start_address+5])
+            command["facing"] = rom[start_address+1]
+            command["map_group"] = rom[start_address+2]
+            command["map_id"] = rom[start_address+3]
+            command["x"] = rom[start_address+4]
+            command["y"] = rom[start_address+5]
         elif command_byte == 0xA4: #MEMORY code [2b + Bank + xx]
             info = "Set memX to a string by a pointer [aabb][bank][xx]"
             long_info = """
@@ -1841,8 +1841,8 @@ def old_parse(self, *args, **kwargs):
             """
             size = 5
             command["string_pointer"] = calculate_pointer_from_bytes_at(start_address+1, bank="reversed")
-            command["string_pointer_bank"] = ord(rom[start_address+3])
-            command["memory_id"] = ord(rom[start_address+4])
+            command["string_pointer_bank"] = rom[start_address+3]
+            command["memory_id"] = rom[start_address+4]
         elif command_byte == 0xA5: #Display any location name [xx]
             info = "Copy the name of a location (by id) to TEMPMEMORY1"
             long_info = """
@@ -1850,7 +1850,7 @@ def old_parse(self, *args, **kwargs):
             #[A3][Location no]
             """
             size = 2
-            command["location_number"] = ord(rom[start_address+1])
+            command["location_number"] = rom[start_address+1]
         else:
             size = 1
             #end = True
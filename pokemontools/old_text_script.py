@@ -137,7 +137,7 @@ class OldTextScript:
         while not end:
             address = offset
             command = {}
-            command_byte = ord(rom[address])
+            command_byte = rom[address]
             if debug:
                 logging.debug(
                     "TextScript.parse_script_at has encountered a command byte {0} at {1}"
@@ -146,9 +146,9 @@ class OldTextScript:
             end_address = address + 1
             if  command_byte == 0:
                 # read until $57, $50 or $58
-                jump57 = how_many_until(chr(0x57), offset, rom)
-                jump50 = how_many_until(chr(0x50), offset, rom)
-                jump58 = how_many_until(chr(0x58), offset, rom)
+                jump57 = how_many_until(0x57, offset, rom)
+                jump50 = how_many_until(0x50, offset, rom)
+                jump58 = how_many_until(0x58, offset, rom)
 
                 # whichever command comes first
                 jump = min([jump57, jump50, jump58])
@@ -171,9 +171,9 @@ class OldTextScript:
                 offset += jump
             elif command_byte == 0x17:
                 # TX_FAR [pointer][bank]
-                pointer_byte1 = ord(rom[offset+1])
-                pointer_byte2 = ord(rom[offset+2])
-                pointer_bank = ord(rom[offset+3])
+                pointer_byte1 = rom[offset+1]
+                pointer_byte2 = rom[offset+2]
+                pointer_bank = rom[offset+3]
 
                 pointer = (pointer_byte1 + (pointer_byte2 << 8))
                 pointer = extract_maps.calculate_pointer(pointer, pointer_bank)
@@ -201,7 +201,7 @@ class OldTextScript:
                 end = True
 
                 # this byte simply indicates to end the script
-                if command_byte == 0x50 and ord(rom[offset+1]) == 0x50: # $50$50 means end completely
+                if command_byte == 0x50 and rom[offset+1] == 0x50: # $50$50 means end completely
                     end = True
                     commands[command_counter+1] = command
 
@@ -218,8 +218,8 @@ class OldTextScript:
             elif command_byte == 0x1:
                 # 01 = text from RAM. [01][2-byte pointer]
                 size = 3 # total size, including the command byte
-                pointer_byte1 = ord(rom[offset+1])
-                pointer_byte2 = ord(rom[offset+2])
+                pointer_byte1 = rom[offset+1]
+                pointer_byte2 = rom[offset+2]
 
                 command = {"type": command_byte,
                            "start_address": offset+1,
@@ -237,7 +237,7 @@ class OldTextScript:
 
                 # use this to look at the surrounding bytes
                 if debug:
-                    logging.debug("next command is {0}".format(hex(ord(rom[offset]))))
+                    logging.debug("next command is {0}".format(hex(rom[offset])))
                     logging.debug(
                         ".. current command number is {counter} near {offset} on map_id={map_id}"
                         .format(
@@ -266,17 +266,17 @@ class OldTextScript:
                             "type": command_byte,
                             "start_address": offset,
                             "end_address": offset + size,
-                            "pointer_bytes": [ord(rom[offset+1]), ord(rom[offset+2])],
-                            "y": ord(rom[offset+3]),
-                            "x": ord(rom[offset+4]),
+                            "pointer_bytes": [rom[offset+1], rom[offset+2]],
+                            "y": rom[offset+3],
+                            "x": rom[offset+4],
                           }
                 offset += size + 1
             elif command_byte == 0x5:
                 # 05 = write text starting at 2nd line of text-box. [05][text][ending command]
                 # read until $57, $50 or $58
-                jump57 = how_many_until(chr(0x57), offset, rom)
-                jump50 = how_many_until(chr(0x50), offset, rom)
-                jump58 = how_many_until(chr(0x58), offset, rom)
+                jump57 = how_many_until(0x57, offset, rom)
+                jump50 = how_many_until(0x50, offset, rom)
+                jump58 = how_many_until(0x58, offset, rom)
 
                 # whichever command comes first
                 jump = min([jump57, jump50, jump58])
@@ -314,9 +314,9 @@ class OldTextScript:
                 #  bbbb = how many bytes to read (read number is big-endian)
                 #  cccc = how many digits display (decimal)
                 #(note: max of decimal digits is 7,i.e. max number correctly displayable is 9999999)
-                ram_address_byte1 = ord(rom[offset+1])
-                ram_address_byte2 = ord(rom[offset+2])
-                read_byte = ord(rom[offset+3])
+                ram_address_byte1 = rom[offset+1]
+                ram_address_byte2 = rom[offset+2]
+                read_byte = rom[offset+3]
 
                 command = {
                             "type": command_byte,
@@ -333,7 +333,7 @@ class OldTextScript:
                         "Unknown text command at {offset} - command: {command} on map_id={map_id}"
                         .format(
                             offset=hex(offset),
-                            command=hex(ord(rom[offset])),
+                            command=hex(rom[offset]),
                             map_id=map_id,
                         )
                     )
@@ -6,30 +6,32 @@ from __future__ import print_function
 
 import argparse
 import os
-import struct
+import sys
 import wave
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 BASE_SAMPLE_RATE = 22050
 
+# Number of bytes or frames to convert at a time.
+CHUNK_SIZE = 0x10000
+
+# Each pcm byte as 8 wav samples, for when numpy isn't available.
+wav_bytes = [
+    bytes(bytearray(0xff if (byte >> bit) & 1 else 0 for bit in range(7, -1, -1)))
+    for byte in range(0x100)
+]
+
 def convert_to_wav(filenames=[]):
     """
     Converts a file containing 1-bit pcm data into a .wav file.
     """
     for filename in filenames:
-        with open(filename, 'rb') as pcm_file:
-            # Generate array of on/off pcm values.
-            samples = []
-            byte = pcm_file.read(1)
-            while byte != "":
-                byte = struct.unpack('B', byte)[0]
-                for i in range(8):
-                    bit_index = 7 - i
-                    value = (byte >> bit_index) & 1
-                    samples.append(value)
-                byte = pcm_file.read(1)
-
-        # Write a .wav file using the pcm data.
         name, extension = os.path.splitext(filename)
         wav_filename = name + '.wav'
         wave_file = wave.open(wav_filename, 'w')
@@ -37,12 +39,18 @@ def convert_to_wav(filenames=[]):
         wave_file.setnchannels(1)
         wave_file.setsampwidth(1)
 
-        for value in samples:
-            if value > 0:
-                value = 0xff
-
-            packed_value = struct.pack('B', value)
-            wave_file.writeframesraw(packed_value)
+        # Each bit is a sample, either off (0) or on (0xff).
+        with open(filename, 'rb') as pcm_file:
+            while True:
+                data = pcm_file.read(CHUNK_SIZE)
+                if not data:
+                    break
+                if numpy is not None:
+                    bits = numpy.unpackbits(numpy.frombuffer(data, dtype=numpy.uint8))
+                    frames = (bits * 0xff).astype(numpy.uint8).tobytes()
+                else:
+                    frames = b''.join(wav_bytes[byte] for byte in bytearray(data))
+                wave_file.writeframes(frames)
 
         wave_file.close()
 
@@ -53,88 +61,162 @@ def convert_to_pcm(filenames=[]):
     Samples in the .wav file are simply clamped to on/off.
 
     This currently works correctly on .wav files with the following attributes:
-            1. Sample Width = 1 or 2 bytes (Some wave files use 3 bytes per sample...)
+            1. Sample Width = 1, 2 or 3 bytes
             2. Arbitrary sample sample_rate
             3. Mono or Stereo (1 or 2 channels)
     """
     for filename in filenames:
-        samples, average_sample = get_wav_samples(filename)
-
-        # Generate a list of clamped samples
-        clamped_samples = []
-        for sample in samples:
-            # Clamp the raw sample to on/off
-            if sample < average_sample:
-                clamped_samples.append(0)
-            else:
-                clamped_samples.append(1)
-
-        # The pcm data must be a multiple of 8, so pad the clamped samples with 0.
-        while len(clamped_samples) % 8 != 0:
-            clamped_samples.append(0)
-
-        # Pack the 1-bit samples together.
-        packed_samples = bytearray()
-        for i in range(0, len(clamped_samples), 8):
-            # Read 8 pcm values to pack one byte.
-            packed_value = 0
-            for j in range(8):
-                packed_value <<= 1
-                packed_value += clamped_samples[i + j]
-            packed_samples.append(packed_value)
-
-        # Open the output .pcm file, and write all 1-bit samples.
+        # The average is needed before anything can be clamped,
+        # so the samples are read through twice.
+        total_value = 0
+        num_samples = 0
+        for samples in iter_wav_samples(filename):
+            total_value += int(numpy.sum(samples)) if numpy is not None else sum(samples)
+            num_samples += len(samples)
+        average_sample = total_value / num_samples
+
         name, extension = os.path.splitext(filename)
         pcm_filename = name + '.pcm'
         with open(pcm_filename, 'wb') as out_file:
-            out_file.write(packed_samples)
+            # Bits that don't fill a byte are carried over to the next chunk.
+            leftover = []
+            for samples in iter_wav_samples(filename):
+                if numpy is not None:
+                    # Clamp the raw samples to on/off
+                    bits = numpy.concatenate([leftover, samples >= average_sample]).astype(numpy.uint8)
+                    length = len(bits) - len(bits) % 8
+                    out_file.write(numpy.packbits(bits[:length]).tobytes())
+                else:
+                    bits = leftover + [int(sample >= average_sample) for sample in samples]
+                    length = len(bits) - len(bits) % 8
+                    out_file.write(pack_bits(bits[:length]))
+                leftover = bits[length:]
+
+            # The pcm data must be a multiple of 8, so pad the clamped samples with 0.
+            if len(leftover):
+                bits = list(leftover) + [0] * (8 - len(leftover))
+                out_file.write(pack_bits(bits))
+
+
+def pack_bits(bits):
+    """
+    Pack a list of 1-bit samples into bytes, 8 at a time.
+    """
+    packed_samples = bytearray()
+    for i in range(0, len(bits), 8):
+        packed_value = 0
+        for bit in bits[i:i + 8]:
+            packed_value = (packed_value << 1) | int(bit)
+        packed_samples.append(packed_value)
+    return bytes(packed_samples)
 
 
-def get_wav_samples(filename):
+def unpack_samples(frames, sample_width, num_channels):
     """
-    Reads the given .wav file and returns a list of its samples after re-sampling
-    to BASE_SAMPLE_RATE.
-    Also returns the average sample amplitude.
+    Return the samples in the first audio channel of raw wav frames.
+    1-byte samples are unsigned, and wider samples are signed.
     """
-    wav_file = wave.open(filename, 'r')
-    sample_width = wav_file.getsampwidth()
-    sample_count = wav_file.getnframes()
-    sample_rate = wav_file.getframerate()
-    num_channels = wav_file.getnchannels()
+    if sample_width not in (1, 2, 3):
+        raise Exception("Unsupported sample width: " + str(sample_width))
 
-    samples = bytearray(wav_file.readframes(sample_count))
+    frame_size = sample_width * num_channels
+    frames = frames[:len(frames) - len(frames) % frame_size]
 
-    # Unpack the values based on the sample byte width.
-    unpacked_samples = []
-    for i in range(0, len(samples), sample_width):
+    if numpy is not None:
+        data = numpy.frombuffer(frames, dtype=numpy.uint8).reshape(-1, frame_size)
         if sample_width == 1:
-            fmt = 'B'
+            return data[:, 0].astype(int)
         elif sample_width == 2:
-            fmt = 'h'
+            return data[:, 0:2].copy().view('<i2')[:, 0].astype(int)
         else:
-            # todo: support 3-byte sample width
-            raise Exception("Unsupported sample width: " + str(sample_width))
+            # Sign extend 24-bit samples by putting them in the top of 32 bits.
+            padded = numpy.zeros((len(data), 4), dtype=numpy.uint8)
+            padded[:, 1:] = data[:, 0:3]
+            return padded.view('<i4')[:, 0].astype(int) >> 8
+
+    if sample_width == 1:
+        return list(bytearray(frames[::frame_size]))
+    elif sample_width == 2:
+        samples = array('h', frames)
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        return samples[::num_channels].tolist()
+    else:
+        frames = bytearray(frames)
+        samples = []
+        for i in range(0, len(frames), frame_size):
+            sample = frames[i] | (frames[i + 1] << 8) | (frames[i + 2] << 16)
+            if sample & 0x800000:
+                sample -= 0x1000000
+            samples.append(sample)
+        return samples
+
+
+def get_resample_indexes(index, start, length, interval):
+    """
+    Step through frames start to start + length by interval, from index.
+    Return the frames landed on (relative to start), and the next index.
 
-        value = struct.unpack(fmt, samples[i:i + sample_width])[0]
-        unpacked_samples.append(value)
+    The index is a running total of intervals (not n * interval), so that
+    the same samples are picked no matter how the frames are split up.
+    """
+    end = start + length
+    if numpy is not None:
+        count = int((end - index) / interval) + 2
+        steps = numpy.empty(count + 1)
+        steps[0] = index
+        steps[1:] = interval
+        indexes = numpy.cumsum(steps)
+        num_indexes = numpy.searchsorted(indexes, end)
+        return indexes[:num_indexes].astype(int) - start, indexes[num_indexes]
+
+    indexes = []
+    while index < end:
+        indexes.append(int(index) - start)
+        index += interval
+    return indexes, index
 
-    # Only keep the samples from the first audio channel.
-    unpacked_samples = unpacked_samples[::num_channels]
 
-    # Approximate the BASE_SAMPLE_RATE.
-    # Also find the average amplitude of the samples.
-    resampled_samples = []
-    total_value = 0
+def iter_wav_samples(filename, chunk_size=CHUNK_SIZE):
+    """
+    Read the given .wav file a chunk at a time, and yield its samples after
+    re-sampling to BASE_SAMPLE_RATE.
+    """
+    wav_file = wave.open(filename, 'r')
+    sample_width = wav_file.getsampwidth()
+    sample_count = wav_file.getnframes()
+    sample_rate = wav_file.getframerate()
+    num_channels = wav_file.getnchannels()
+
     interval = sample_rate / BASE_SAMPLE_RATE
     index = 0
-    while index < sample_count:
-        sample = unpacked_samples[int(index)]
-        total_value += sample
+    start = 0
+    while start < sample_count:
+        frames = wav_file.readframes(chunk_size)
+        samples = unpack_samples(frames, sample_width, num_channels)
+        if not len(samples):
+            break
+        indexes, index = get_resample_indexes(index, start, len(samples), interval)
+        if numpy is not None:
+            yield samples[indexes]
+        else:
+            yield [samples[i] for i in indexes]
+        start += len(samples)
 
-        resampled_samples.append(sample)
-        index += interval
+    wav_file.close()
+
+
+def get_wav_samples(filename):
+    """
+    Reads the given .wav file and returns a list of its samples after re-sampling
+    to BASE_SAMPLE_RATE.
+    Also returns the average sample amplitude.
+    """
+    resampled_samples = []
+    for samples in iter_wav_samples(filename):
+        resampled_samples += list(samples)
 
-    average_sample = total_value / len(resampled_samples)
+    average_sample = sum(resampled_samples) / len(resampled_samples)
 
     return resampled_samples, average_sample
 
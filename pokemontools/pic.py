@@ -8,10 +8,13 @@ from __future__ import division
 
 import os
 import sys
+import re
 import argparse
+import binascii
+import operator
 from math import sqrt
 
-from .gfx import transpose_tiles
+from .gfx import transpose_tiles, run_conversions
 
 
 def bitflip(x, n):
@@ -43,7 +46,7 @@ class Decompressor:
 
 
     def __init__(self, f, mirror=False, planar=True):
-        self.bs = fbitstream(f)
+        self.bs = BitReader(f)
         self.mirror = mirror
         self.planar = planar
         self.data = None
@@ -85,9 +88,9 @@ class Decompressor:
 
         data = []
         if self.planar:
-            for a, b in zip(rams[0], rams[1]):
-                data += [a, b]
-            self.data = bytearray(data)
+            self.data = bytearray(len(rams[0]) + len(rams[1]))
+            self.data[0::2] = rams[0]
+            self.data[1::2] = rams[1]
         else:
             for a, b in zip(bitstream(rams[0]), bitstream(rams[1])):
                 data.append(a | (b << 1))
@@ -111,16 +114,13 @@ class Decompressor:
 
     def _read_rle_chunk(self, ram):
 
-        i = 0
-        while self._readbit():
-            i += 1
+        i = self.bs.read_unary()
 
         n = self.table1[i]
         a = self._readint(i + 1)
         n += a
 
-        for i in range(n):
-            ram.append(0)
+        ram += [0] * n
 
     def _read_data_chunk(self, ram, size):
         while 1:
@@ -170,55 +170,146 @@ class Decompressor:
             ram2[i] ^= ram1[i]
 
     def _deinterlace_bitgroups(self, bits):
-        l = []
+        # Each row of 4 * sizex bitgroups is 4 runs of sizex,
+        # which are interleaved.
+        l = [0] * (4 * self.sizex * self.sizey)
         for y in range(self.sizey):
-            for x in range(self.sizex):
-                i = 4 * y * self.sizex + x
-                for j in range(4):
-                    l.append(bits[i])
-                    i += self.sizex
+            i = 4 * y * self.sizex
+            for j in range(4):
+                l[i + j : i + 4 * self.sizex : 4] = bits[i + j * self.sizex : i + (j + 1) * self.sizex]
         return l
 
 
     def _readbit(self):
-        return next(self.bs)
+        return self.bs.read(1)
 
     def _readint(self, count):
-        return readint(self.bs, count)
+        return self.bs.read(count)
 
 
-def fbitstream(f):
-    while 1:
-        char = f.read(1)
-        if not char:
-            break
-        byte = ord(char)
+class BitReader:
+    """
+    Read big-endian bit fields from a file or buffer.
 
-        for i in range(7, -1, -1):
-            yield (byte >> i) & 1
+    Bytes are loaded a block at a time, and fields are shifted out of an accumulator.
+    """
+
+    block_size = 0x100
+
+    def __init__(self, source):
+        if hasattr(source, 'read'):
+            self.file = source
+            self.buffer = bytearray()
+        else:
+            self.file = None
+            self.buffer = bytearray(source)
+        self.index = 0
+        self.value = 0
+        self.bits = 0
+
+    def _fill(self, count):
+        while self.bits < count:
+            if self.index >= len(self.buffer):
+                block = self.file.read(self.block_size) if self.file else None
+                if not block:
+                    raise EOFError('ran out of bits')
+                self.buffer = bytearray(block)
+                self.index = 0
+            # Top up the accumulator 64 bits at a time.
+            chunk = self.buffer[self.index : self.index + 8]
+            self.index += len(chunk)
+            self.value = (self.value << (8 * len(chunk))) | int(binascii.hexlify(chunk), 16)
+            self.bits += 8 * len(chunk)
+
+    def read(self, count):
+        """
+        Read a <count>-bit integer.
+        """
+        if self.bits < count:
+            self._fill(count)
+        self.bits -= count
+        n = self.value >> self.bits
+        self.value &= (1 << self.bits) - 1
+        return n
+
+    def read_unary(self):
+        """
+        Count 1 bits up to the next 0 bit, and skip past it.
+        """
+        count = 0
+        while True:
+            if not self.bits:
+                self._fill(1)
+            mask = (1 << self.bits) - 1
+            rest = (self.value ^ mask).bit_length()
+            count += self.bits - rest
+            if rest:
+                self.bits = rest - 1
+                self.value &= (1 << self.bits) - 1
+                return count
+            self.bits = self.value = 0
+
+
+class BitWriter:
+    """
+    Write big-endian bit fields to a byte buffer.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.value = 0
+        self.bits = 0
+        self.length = 0
+
+    def write(self, n, count):
+        """
+        Write the lowest <count> bits of <n>.
+        """
+        self.value = (self.value << count) | (n & ((1 << count) - 1))
+        self.bits += count
+        self.length += count
+        if self.bits >= 64:
+            self._flush()
+
+    def _flush(self):
+        rest = self.bits % 8
+        num_bytes = self.bits // 8
+        if num_bytes:
+            n = self.value >> rest
+            self.data += binascii.unhexlify('%0*x' % (num_bytes * 2, n))
+            self.value &= (1 << rest) - 1
+            self.bits = rest
+
+    def getvalue(self):
+        """
+        Return the bytes written so far. The last byte is padded with 0 bits.
+        """
+        self._flush()
+        data = bytearray(self.data)
+        if self.bits:
+            data.append((self.value << (8 - self.bits)) & 0xff)
+        return data
+
+
+# Translation tables to pull each bitgroup out of a byte, left to right.
+bitgroup_tables = [
+    bytearray((i >> shift) & 3 for i in range(0x100))
+    for shift in (6, 4, 2, 0)
+]
+
+# Translate bitgroups to base 4 digits.
+base4_digits = bytearray(b'0123') + bytearray(0x100 - 4)
 
 def bitstream(b):
     for byte in b:
         for i in range(7, -1, -1):
             yield (byte >> i) & 1
 
-def readint(bs, count):
-    n = 0
-    while count:
-        n <<= 1
-        n |= next(bs)
-        count -= 1
-    return n
-
 def bitgroups_to_bytes(bits):
-    l = []
-    for i in range(0, len(bits) - 3, 4):
-        n = ((bits[i + 0] << 6)
-           | (bits[i + 1] << 4)
-           | (bits[i + 2] << 2)
-           | (bits[i + 3] << 0))
-        l.append(n)
-    return bytearray(l)
+    return bytearray(
+        (a << 6) | (b << 4) | (c << 2) | d
+        for a, b, c, d in zip(bits[0::4], bits[1::4], bits[2::4], bits[3::4])
+    )
 
 
 def bytes_to_bits(bytelist):
@@ -250,140 +341,132 @@ class Compressor:
         elif not width and not height: width = height = int(sqrt(tile_size))
         self.width, self.height = width, height
 
-    def compress(self):
-        """
-        Compress the image five times (twice for each mode, except 0)
-        and use the smallest one (in bits).
-        """
-        rams = [[],[]]
-        datas = []
-
-        for mode in range(3):
+    # (mode, order) for each way to compress a pic, in order of preference.
 
-            # Order is redundant for mode 0.
+    # Order is redundant for mode 0.
 
-            # While this seems like an optimization,
-            # it's actually required for 1:1 compression
-            # to the original compressed pics.
+    # While this seems like an optimization,
+    # it's actually required for 1:1 compression
+    # to the original compressed pics.
 
-            # This appears to be the algorithm
-            # that Game Freak's compressor used.
+    # This appears to be the algorithm
+    # that Game Freak's compressor used.
 
-            # Using order 0 instead of 1 breaks this feature.
+    # Using order 0 instead of 1 breaks this feature.
 
-            for order in range(2):
-                if mode == 0 and order == 0:
-                    continue
-                for i in range(2):
-                    rams[i] = self.image[i::2]
-                self._interpret_compress(rams, mode, order)
-                datas += [(self.data[:], int(self.which_bit))]
+    modes = [(0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
 
-        # Pick the smallest pic, measured in bits.
-        datas = sorted(datas, key=lambda data_bit: (len(data_bit[0]), -data_bit[1]))
-        self.data, self.which_bit = datas[0]
-
-    def _interpret_compress(self, rams, mode, order):
-        self.data = []
-        self.which_bit = 0
+    def compress(self):
+        """
+        Compress the image five ways (twice for each mode, except 0)
+        and use the smallest one (in bits).
 
+        The size of each is kept in self.sizes, by (mode, order).
+        """
+        rams = [self.image[0::2], self.image[1::2]]
+
+        # Each mode is made of the same few rams, so they're only filled once.
+        # Modes 1 and 2 xor the rams together before encoding.
+        xor = bytearray(map(operator.xor, rams[0], rams[1]))
+        encoded = [self._encode(bytearray(ram)) for ram in rams]
+        fills = {
+            'encoded': [self._fillram(ram) for ram in encoded],
+            'xor': self._fillram(xor),
+            'encoded xor': self._fillram(self._encode(bytearray(xor))),
+        }
+
+        self.sizes = {}
+        best = None
+        for mode, order in self.modes:
+            bits = self._interpret_compress(fills, mode, order)
+            self.sizes[(mode, order)] = len(bits)
+            if best is None or len(bits) < len(best):
+                best = bits
+                self.mode, self.order = mode, order
+
+        self.output = BitWriter()
+        self.output.write(int(best, 2), len(best))
+        self.data = list(self.output.getvalue())
+        # The last bit written in the last byte (7 is the leftmost).
+        self.which_bit = -len(best) % 8
+
+    def _interpret_compress(self, fills, mode, order):
+        """
+        Return a pic as a string of bits, given the filled rams for each mode.
+        """
         r1 = order
         r2 = order ^ 1
 
         if mode == 0:
-            self._encode(rams[1])
-            self._encode(rams[0])
+            first, second = fills['encoded'][r1], fills['encoded'][r2]
         elif mode == 1:
-            self._xor(rams[r1], rams[r2])
-            self._encode(rams[r1])
+            first, second = fills['encoded'][r1], fills['xor']
         elif mode == 2:
-            self._xor(rams[r1], rams[r2])
-            self._encode(rams[r1])
-            self._encode(rams[r2], mirror=False)
+            first, second = fills['encoded'][r1], fills['encoded xor']
         else:
             raise Exception('invalid interlace mode!')
 
-        self._writeint(self.height, 4)
-        self._writeint(self.width,  4)
-
-        self._writebit(order)
-
-        self._fillram(rams[r1])
+        bits = '{0:04b}{1:04b}'.format(self.height, self.width)
+        bits += str(order)
+        bits += first
         if mode == 0:
-            self._writebit(0)
+            bits += '0'
         else:
-            self._writebit(1)
-            self._writebit(mode - 1)
-        self._fillram(rams[r2])
+            bits += '1' + str(mode - 1)
+        bits += second
+        return bits
 
-    def _fillram(self, ram):
-        rle = 0
-        nums = 0
-        bitgroups = []
+    packets = re.compile(b'\x00+|[^\x00]+')
 
+    def _get_bitgroups(self, ram):
+        """
+        Return the bitgroups in a ram in the order they're written:
+        each column of bytes, 2 bits at a time.
+        """
+        ram = bytearray(ram)
+        column_length = self.height * 8
+        bitgroups = bytearray()
         for x in range(self.width):
-            for bit in range(0, 8, 2):
-                byte = x * self.height * 8
-                for y in range(self.height * 8):
-                    bitgroup = (ram[byte] >> (6 - bit)) & 3
-                    if bitgroup == 0:
-                        if rle == 0:
-                            self._writebit(0)
-                        elif rle == 1:
-                            nums += 1
-                        else:
-                            self._data_packet(bitgroups)
-                            self._writebit(0)
-                            self._writebit(0)
-                        rle = 1
-                        bitgroups = []
-                    else:
-                        if rle == 0:
-                            self._writebit(1)
-                        elif rle == 1:
-                            self._rle(nums)
-                        rle = -1
-                        bitgroups += [bitgroup]
-                        nums = 0
-                    byte += 1
-
-        if rle == 1:
-            self._rle(nums)
-        else:
-            self._data_packet(bitgroups)
-
-    def _data_packet(self, bitgroups):
-        for bitgroup in bitgroups:
-            self._writebit((bitgroup >> 1) & 1)
-            self._writebit((bitgroup >> 0) & 1)
-
-    def _rle(self, nums):
-        nums += 1
-
-        # Get the previous power of 2.
-        # Deriving the bitcount from that seems to be
-        # faster on average than using the lookup table.
-        v = nums
-        v += 1
-        v |= v >> 1
-        v |= v >> 2
-        v |= v >> 4
-        v |= v >> 8
-        v |= v >> 16
-        v -= v >> 1
-        v -= 1
-        number = nums - v
-
-        bitcount = -1
-        while v:
-            v >>= 1
-            bitcount += 1
-
-        for j in range(bitcount):
-            self._writebit(1)
-        self._writebit(0)
-        for j in range(bitcount, -1, -1):
-            self._writebit((number >> j) & 1)
+            column = ram[x * column_length : (x + 1) * column_length]
+            for table in bitgroup_tables:
+                bitgroups += column.translate(table)
+        return bytes(bitgroups)
+
+    def _fillram(self, ram):
+        """
+        Return a ram as rle and data packets, in a string of bits.
+        """
+        bitgroups = self._get_bitgroups(ram)
+
+        # Data packets are sliced straight out of the bitgroups.
+        digits = bytearray(bitgroups).translate(base4_digits).decode('ascii')
+        data = '{0:0{1}b}'.format(int(digits, 4), len(bitgroups) * 2)
+
+        # The first bit is the first packet type (0: rle, 1: data).
+        # They alternate from there.
+        bits = ['1' if bitgroups[:1] != b'\x00' else '0']
+        for match in self.packets.finditer(bitgroups):
+            start, end = match.span()
+            if bitgroups[start:start + 1] == b'\x00':
+                bits += [self._rle(end - start)]
+            else:
+                bits += [data[start * 2 : end * 2]]
+                # Data packets end in a 0 bitgroup, unless they end the ram.
+                if end < len(bitgroups):
+                    bits += ['00']
+
+        return ''.join(bits)
+
+    def _rle(self, length):
+        """
+        Return an rle packet for <length> 0 bitgroups as a string of bits.
+        """
+        # The count is split into 2**(bitcount + 1) - 1 and the rest.
+        bitcount = (length + 1).bit_length() - 2
+        number = length - ((2 << bitcount) - 1)
+
+        # bitcount 1s, a 0, then the number in bitcount + 1 bits
+        return '1' * bitcount + '0' + '{0:0{1}b}'.format(number, bitcount + 1)
 
     def _encode(self, ram, mirror=None):
         a = b = 0
@@ -403,29 +486,7 @@ class Compressor:
 
             ram[j] = (code_1 << 4) | code_2
 
-    def _xor(self, ram1, ram2):
-        for i in range(len(ram2)):
-            ram2[i] ^= ram1[i]
-
-    def _writebit(self, bit):
-        self.which_bit -= 1
-        if self.which_bit == -1:
-            self.which_bit = 7
-            self.data += [0]
-        if bit: self.data[-1] |= bit << self.which_bit
-
-    def _writeint(self, num, size=None):
-        bits = []
-        if size:
-            for i in range(size):
-                bits += [num & 1]
-                num >>= 1
-        else:
-            while num > 0:
-                bits += [num & 1]
-                num >>= 1
-        for bit in reversed(bits):
-            self._writebit(bit)
+        return ram
 
 
 def decompress(f, offset=None, mirror=False):
@@ -464,26 +525,58 @@ def decompress_file(filename):
         out.write(image)
 
 def compress_file(filename):
+    """
+    Compress a 2bpp file to a pic. Return the size in bits of each (mode, order).
+    """
     image = open(filename, 'rb').read()
     image = transpose_tiles(image)
-    pic = compress(image)
-    pic = bytearray(pic)
+    comp = Compressor(image)
+    comp.compress()
+    pic = bytearray(comp.data)
     output_filename = os.path.splitext(filename)[0] + '.pic'
     with open(output_filename, 'wb') as out:
         out.write(pic)
+    return comp.sizes
+
+
+conversion_methods = {
+    'decompress': decompress_file,
+    'compress': compress_file,
+}
+
+def convert_files(mode, filenames, jobs=1, report=None):
+    """
+    Convert <filenames> with <mode>, spread across <jobs> processes.
+    report(filename, result) is called as each file finishes, and the names
+    of any files that failed are returned.
+    """
+    return run_conversions(conversion_methods[mode], filenames, jobs=jobs, report=report)
+
+def format_sizes(sizes):
+    return ', '.join(
+        'mode {} order {}: {} bits'.format(mode, order, sizes[(mode, order)])
+        for mode, order in Compressor.modes
+    )
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('mode')
     ap.add_argument('filenames', nargs='*')
+    ap.add_argument('-j', '--jobs', type=int, default=1, help='number of processes to use (0 for one per cpu)')
+    ap.add_argument('-s', '--sizes', action='store_true', help='report the size of each compression mode')
     args = ap.parse_args()
 
-    for filename in args.filenames:
-        if args.mode == 'decompress':
-            decompress_file(filename)
-        elif args.mode == 'compress':
-            compress_file(filename)
+    if args.mode not in conversion_methods:
+        raise Exception("Unknown conversion method!")
+
+    def report(filename, sizes):
+        if args.sizes and args.mode == 'compress':
+            print('{}: {}'.format(filename, format_sizes(sizes)))
+
+    failed = convert_files(args.mode, args.filenames, jobs=args.jobs, report=report)
+    if failed:
+        raise Exception("Failed to convert {} files!".format(len(failed)))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+A rom image that's mapped from disk and shared by everything that reads it.
+"""
+
+import os
+import mmap
+import struct
+
+
+class RomImage(object):
+    """
+    A read-only rom image. Indexing gives ints, like a bytearray.
+
+    Use load_rom_image to open one, so each rom is only mapped once.
+    """
+
+    filename = None
+
+    @classmethod
+    def open(cls, filename):
+        with open(filename, 'rb') as rom_file:
+            # Python 2's mmap indexes as 1-byte strings, and empty files
+            # can't be mapped, so read those into a bytearray instead.
+            if bytes is str or not os.fstat(rom_file.fileno()).st_size:
+                rom = BufferedRomImage(rom_file.read())
+            else:
+                rom = MappedRomImage(rom_file.fileno(), 0, access=mmap.ACCESS_READ)
+        rom.filename = filename
+        return rom
+
+    def __reduce__(self):
+        # Worker processes map the file themselves instead of copying it.
+        if self.filename is None:
+            return super(RomImage, self).__reduce__()
+        return (load_rom_image, (self.filename,))
+
+    def __repr__(self):
+        return "RomImage(%r, %d bytes)" % (self.filename, len(self))
+
+    def u8(self, address):
+        return self[address]
+
+    def le16(self, address):
+        return struct.unpack_from('<H', self, address)[0]
+
+    def pointer(self, address, bank=None):
+        """
+        Return the rom address of the little-endian pointer at <address>.
+        Pointers into 4000-7fff are in <bank>, or else in the same bank as
+        the pointer. Pointers outside of rom are left as is.
+        """
+        local_address = self.le16(address)
+        if 0x4000 <= local_address < 0x8000:
+            if bank is None:
+                bank = address // 0x4000
+            return local_address + (bank - 1) * 0x4000 if bank else local_address
+        return local_address
+
+    def banked_pointer(self, address):
+        """
+        Return the rom address of a 3-byte bank and pointer at <address>.
+        """
+        return self.pointer(address + 1, bank=self.u8(address))
+
+    def view(self, start, end):
+        """
+        Return a memoryview of the rom from <start> to <end>, without copying.
+        """
+        return memoryview(self)[start:end]
+
+    def interval(self, offset, length, strings=True, debug=True):
+        """
+        Return the bytes from <offset> to <offset> + <length> as a list of
+        ints, or of hex strings if <strings> is set.
+        """
+        if strings:
+            return [hex(byte) for byte in self[offset:offset+length]]
+        return list(bytearray(self[offset:offset+length]))
+
+    def until(self, offset, byte, strings=True, debug=False):
+        """
+        Like interval, but stop before the next <byte> after <offset>.
+        """
+        return self.interval(offset, self.find(bytearray([byte]), offset) - offset, strings=strings)
+
+
+class MappedRomImage(RomImage, mmap.mmap):
+    pass
+
+
+class BufferedRomImage(RomImage, bytearray):
+    pass
+
+
+# loaded rom images by path
+rom_images = {}
+
+def load_rom_image(filename):
+    """
+    Return a RomImage of <filename>, reusing it if it's already been loaded.
+    """
+    key = os.path.realpath(filename)
+    if key not in rom_images:
+        rom_images[key] = RomImage.open(filename)
+    return rom_images[key]
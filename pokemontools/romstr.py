@@ -119,14 +119,17 @@ class RomStr(str):
     def get_address_for(self, label):
         """
         Return the address of a label.
-
-        This is slow and could be improved dramatically.
         """
         label = str(label)
-        for address in self.labels.keys():
-            if self.labels[address] == label:
-                return address
-        return None
+        # look labels up by name, as long as the labels are the same
+        cache = getattr(self, "_label_addresses", None)
+        if cache is None or cache[0] is not self.labels or cache[1] != len(self.labels):
+            addresses = {}
+            for address in self.labels.keys():
+                addresses.setdefault(self.labels[address], address)
+            cache = (self.labels, len(self.labels), addresses)
+            self._label_addresses = cache
+        return cache[2].get(label)
 
     def length(self):
         """
@@ -4,6 +4,18 @@ import os
 import re
 import sys
 import json
+import bisect
+import struct
+
+from . import configuration
+from . import cache
+config = configuration.Config()
+
+# Parsed labels are cached by the path, mtime and size of the file they came from.
+symbol_cache = cache.Cache(os.path.join(config.cache_path, 'sym'))
+
+# Bump this when the cached format changes.
+symbol_cache_version = 1
 
 def make_sym_from_json(filename = 'pokecrystal.sym', j = 'labels.json'):
     output = ''
@@ -23,6 +35,12 @@ def read_mapfile(filename='pokecrystal.map'):
     """
     Scrape label addresses from an rgbds mapfile.
     """
+    return read_cached(parse_mapfile, filename)
+
+def parse_mapfile(filename='pokecrystal.map'):
+    """
+    Scrape label addresses from an rgbds mapfile, without the cache.
+    """
 
     labels = []
 
@@ -86,6 +104,12 @@ def read_symfile(filename='pokecrystal.sym'):
     """
     Scrape label addresses from an rgbds .sym file.
     """
+    return read_cached(parse_symfile, filename)
+
+def parse_symfile(filename='pokecrystal.sym'):
+    """
+    Scrape label addresses from an rgbds .sym file, without the cache.
+    """
     labels = []
 
     with open(filename, 'r') as symfile:
@@ -116,6 +140,192 @@ def read_symfile(filename='pokecrystal.sym'):
     return labels
 
 
+def read_cached(parse, filename):
+    """
+    Return parse(filename), reusing the labels in symbol_cache if the file
+    hasn't changed since it was last parsed.
+
+    Set symbol_cache to None to always parse from scratch.
+    """
+    if symbol_cache is None:
+        return parse(filename)
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return parse(filename)
+
+    key = cache.hash_key(
+        parse.__name__,
+        os.path.abspath(filename),
+        stat.st_mtime,
+        stat.st_size,
+        symbol_cache_version,
+    )
+    data = symbol_cache.get(key)
+    if data is not None:
+        return unpack_labels(data)
+
+    labels = parse(filename)
+    symbol_cache.set(key, pack_labels(labels))
+    return labels
+
+def pack_labels(labels):
+    """
+    Pack labels into a count, an array of banks, an array of local
+    addresses, and the label names separated by newlines.
+    """
+    count = len(labels)
+    data = struct.pack('<I', count)
+    data += struct.pack('<%dH' % count, *[label['bank'] for label in labels])
+    data += struct.pack('<%dH' % count, *[label['local_address'] for label in labels])
+    data += '\n'.join(label['label'] for label in labels).encode('utf-8')
+    return bytearray(data)
+
+def unpack_labels(data):
+    """
+    Unpack labels from pack_labels into the same dicts as read_symfile.
+    """
+    data = bytes(data)
+    count, = struct.unpack_from('<I', data)
+    banks = struct.unpack_from('<%dH' % count, data, 4)
+    local_addresses = struct.unpack_from('<%dH' % count, data, 4 + count * 2)
+    names = data[4 + count * 4:]
+    if not isinstance(names, str):
+        names = names.decode('utf-8')
+    names = names.split('\n') if count else []
+
+    labels = []
+    for label, bank, local_address in zip(names, banks, local_addresses):
+        absolute_address = local_address
+        if local_address < 0x8000 and bank > 0:
+            absolute_address += (bank - 1) * 0x4000
+        labels += [{
+            'label': label,
+            'bank': bank,
+            'address': absolute_address,
+            'offset': absolute_address,
+            'local_address': local_address,
+        }]
+    return labels
+
+def get_absolute_address(local_address, bank):
+    """
+    Return the absolute rom address of a banked rom label.
+    Anything outside of rom is left as is.
+    """
+    if 0x4000 <= local_address < 0x8000 and bank > 0:
+        return local_address + (bank - 1) * 0x4000
+    return local_address
+
+class SymbolIndex(object):
+    """
+    Labels indexed by address and by name.
+
+    Labels can be looked up by bank and local address, by absolute address,
+    by local address in any bank (for banked ram when the bank isn't known),
+    or by name. If there's more than one label at an address (or more than
+    one address for a label), the first one added is used unless
+    <first_wins> is False, in which case the last one is. The label lists
+    used to be searched front to back, which is first-wins, but
+    gbz80disasm's symbol dicts were filled in order, which is last-wins.
+    """
+
+    def __init__(self, labels=(), first_wins=True):
+        """
+        <labels> is a list of label dicts, as from read_symfile or read_mapfile.
+        """
+        self.first_wins = first_wins
+        self.by_bank = {}
+        self.by_absolute = {}
+        self.by_local = {}
+        self.by_label = {}
+        self._sorted = None
+        for label in labels:
+            self.add(label['label'], label['bank'], label['local_address'])
+
+    def add(self, label, bank, local_address, address=None):
+        if address is None:
+            address = get_absolute_address(local_address, bank)
+        if self.first_wins:
+            self.by_bank.setdefault((bank, local_address), label)
+            self.by_absolute.setdefault(address, label)
+            self.by_local.setdefault(local_address, label)
+            self.by_label.setdefault(label, (bank, local_address, address))
+        else:
+            self.by_bank[(bank, local_address)] = label
+            self.by_absolute[address] = label
+            self.by_local[local_address] = label
+            self.by_label[label] = (bank, local_address, address)
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.by_label)
+
+    def __contains__(self, label):
+        return label in self.by_label
+
+    def __iter__(self):
+        """
+        Yield (bank, local address, label) for each address, in order.
+        """
+        for bank, local_address in self.sorted_keys():
+            yield bank, local_address, self.by_bank[(bank, local_address)]
+
+    def sorted_keys(self):
+        if self._sorted is None:
+            self._sorted = sorted(self.by_bank)
+        return self._sorted
+
+    def get(self, bank, local_address):
+        """
+        Return the label at <local_address> in <bank>.
+        Bank 0 is used for anything in rom0.
+        """
+        if local_address < 0x4000:
+            bank = 0
+        return self.by_bank.get((bank, local_address))
+
+    def get_absolute(self, address):
+        return self.by_absolute.get(address)
+
+    def get_unbanked(self, local_address):
+        """
+        Return the label at <local_address> in any bank.
+        """
+        return self.by_local.get(local_address)
+
+    def get_address(self, label):
+        """
+        Return the absolute address of <label>.
+        """
+        if label in self.by_label:
+            return self.by_label[label][2]
+        return None
+
+    def get_bank_address(self, label):
+        """
+        Return the bank and local address of <label>.
+        """
+        if label in self.by_label:
+            return self.by_label[label][:2]
+        return None
+
+    def get_preceding(self, bank, local_address):
+        """
+        Return (local address, label) of the nearest label at or before
+        <local_address> in <bank>, or None if there isn't one.
+        """
+        if local_address < 0x4000:
+            bank = 0
+        keys = self.sorted_keys()
+        i = bisect.bisect_right(keys, (bank, local_address))
+        if i and keys[i - 1][0] == bank:
+            key = keys[i - 1]
+            return key[1], self.by_bank[key]
+        return None
+
+
 if __name__ == "__main__":
     #if os.path.exists('../pokecrystal.sym'):
     #    sys.exit()
@@ -15,6 +15,7 @@ import json
 from . import configuration
 from . import labels
 from . import wram
+from .romimage import load_rom_image
 
 # New versions of json don't have read anymore.
 if not hasattr(json, "read"):
@@ -620,9 +621,8 @@ class Disassembler(object):
         self.wram.initialize()
         self.labels.initialize()
 
-        # TODO: fix how ROM is handled throughout the project.
         rom_path = os.path.join(self.config.path, "baserom.gbc")
-        self.rom = bytearray(open(rom_path, "rb").read())
+        self.rom = load_rom_image(rom_path)
 
     def find_label(self, local_address, bank_id=0):
         # keep an integer
@@ -630,10 +630,11 @@ class Disassembler(object):
             local_address = int(local_address.replace("$", "0x"), 16)
 
         if local_address < 0x8000:
-            for label_entry in self.labels.labels:
-                if get_local_address(label_entry["address"]) == local_address:
-                    if "bank" in label_entry and (label_entry["bank"] == bank_id or label_entry["bank"] == 0):
-                        return label_entry["label"]
+            label = self.labels.index.get(bank_id, local_address)
+            if label is None:
+                label = self.labels.index.get(0, local_address)
+            if label is not None:
+                return label
         if local_address in self.wram.wram_labels.keys():
             return self.wram.wram_labels[local_address][-1]
         for constants in [self.wram.gbhw_constants, self.wram.hram_constants]:
@@ -642,10 +643,7 @@ class Disassembler(object):
         return None
 
     def find_address_from_label(self, label):
-        for label_entry in self.labels.labels:
-            if label == label_entry["label"]:
-                return label_entry["address"]
-        return None
+        return self.labels.index.get_address(label)
 
     def output_bank_opcodes(self, original_offset, max_byte_count=0x4000, include_last_address=True, stop_at=[], debug=False):
         """
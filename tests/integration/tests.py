@@ -14,6 +14,8 @@ from pokemontools.romstr import (
     AsmList,
 )
 
+from pokemontools.romimage import RomImage
+
 from pokemontools.item_constants import (
     item_constants,
     find_item_label_by_id,
@@ -121,13 +123,12 @@ class BasicTestCase(unittest.TestCase):
     def test_direct_load_rom(self):
         rom = self.rom
         self.assertEqual(len(rom), 2097152)
-        self.failUnless(isinstance(rom, RomStr))
+        self.failUnless(isinstance(rom, RomImage))
 
     def test_load_rom(self):
         rom = load_rom()
         self.assertNotEqual(rom, None)
-        rom = load_rom()
-        self.assertNotEqual(rom, RomStr(None))
+        self.assertIs(load_rom(), rom)
 
     def test_load_asm(self):
         asm = load_asm()
@@ -153,7 +154,7 @@ class BasicTestCase(unittest.TestCase):
 
     def test_bizarre_http_presence(self):
         rom_segment = self.rom[0x112116:0x112116+8]
-        self.assertEqual(rom_segment, "HTTP/1.0")
+        self.assertEqual(rom_segment, b"HTTP/1.0")
 
     def test_rom_text_at(self):
         self.assertEquals(rom_text_at(0x112116, 8), b"HTTP/1.0")
@@ -180,7 +181,7 @@ class BasicTestCase(unittest.TestCase):
         self.failUnless(bytes[0] == 0xd5)
 
     def test_how_many_until(self):
-        how_many = how_many_until(chr(0x13), 0x1337, self.rom)
+        how_many = how_many_until(0x13, 0x1337, self.rom)
         self.assertEqual(how_many, 3)
 
     def test_calculate_pointer_from_bytes_at(self):
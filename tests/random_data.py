@@ -0,0 +1,17 @@
+"""
+Seeded random data for the graphics and compression tests
+"""
+
+import random
+
+def random_bytes(size, seed=0, common=()):
+    """
+    Return <size> random bytes. Each byte is drawn from <common> plus one
+    fully random value, so listing a few common bytes makes the data look more
+    like real graphics. <seed> can also be a random.Random to draw from.
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    common = list(common)
+    if not common:
+        return bytearray(rng.randrange(0x100) for _ in range(size))
+    return bytearray(rng.choice(common + [rng.randrange(0x100)]) for _ in range(size))
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools import bitplanes
+from pokemontools.gfx import (
+    flatten,
+    to_lines,
+    to_planar,
+    transpose,
+    interleave,
+    deinterleave,
+    get_tiles,
+    connect,
+)
+
+from random_data import random_bytes
+
+@unittest.skipIf(bitplanes.numpy is None, "numpy is not installed")
+class TestBitplanes(unittest.TestCase):
+    def test_to_lines(self):
+        image = random_bytes(12 * 0x10)
+        lines = bitplanes.to_lines(image, 32)
+        self.assertEqual(lines.tolist(), to_lines(flatten(image), 32))
+
+    def test_from_lines(self):
+        image = random_bytes(12 * 0x10)
+        pixels = flatten(image)
+        for width, height in [(32, 24), (8, 96), (96, 8)]:
+            lines = [pixel for line in to_lines(pixels, width) for pixel in line]
+            self.assertEqual(
+                list(bitplanes.from_lines(lines, width)),
+                to_planar(lines, width, height)
+            )
+
+    def test_short_tiles(self):
+        pixels = [3] * 16 * 4
+        self.assertEqual(list(bitplanes.from_lines(pixels, 16)), to_planar(pixels, 16, 4))
+
+    def test_irregular(self):
+        self.assertEqual(bitplanes.to_lines(random_bytes(3 * 0x10), 16), None)
+        self.assertEqual(bitplanes.interleave_tiles(random_bytes(3 * 0x10), 1), None)
+
+    def test_transpose(self):
+        image = random_bytes(36 * 0x10)
+        for width in [4, 5, 6]:
+            self.assertEqual(
+                list(bitplanes.transpose_tiles(image, width)),
+                connect(transpose(get_tiles(image), width))
+            )
+
+    def test_interleave(self):
+        image = random_bytes(24 * 0x10)
+        for width in [2, 3, 6]:
+            self.assertEqual(
+                list(bitplanes.interleave_tiles(image, width)),
+                connect(interleave(get_tiles(image), width))
+            )
+            self.assertEqual(
+                list(bitplanes.deinterleave_tiles(image, width)),
+                connect(deinterleave(get_tiles(image), width))
+            )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools.cache import (
+    Cache,
+    hash_key,
+)
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = Cache(os.path.join(self.path, 'lz'), max_size=0x100)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_hash_key(self):
+        self.assertEqual(hash_key(b'abc', 1), hash_key(bytearray(b'abc'), 1))
+        self.assertNotEqual(hash_key(b'abc', 1), hash_key(b'abc', 2))
+        self.assertNotEqual(hash_key(b'ab', b'c'), hash_key(b'a', b'bc'))
+
+    def test_get_set(self):
+        key = hash_key(b'abc')
+        self.assertEqual(self.cache.get(key), None)
+        self.cache.set(key, [1, 2, 3])
+        self.assertEqual(self.cache.get(key), bytearray([1, 2, 3]))
+
+    def test_evict(self):
+        keys = [hash_key(i) for i in range(8)]
+        for i, key in enumerate(keys):
+            self.cache.set(key, bytearray(0x40))
+            # Make sure the mtimes are in order.
+            os.utime(self.cache.get_filename(key), (i, i))
+        self.assertLessEqual(self.cache.get_size(), 0x100)
+        self.assertEqual(self.cache.get(keys[0]), None)
+        self.assertNotEqual(self.cache.get(keys[-1]), None)
+
+    def test_clear(self):
+        self.cache.clear()
+        self.cache.set(hash_key(0), b'abc')
+        self.cache.clear()
+        self.assertEqual(self.cache.get_size(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
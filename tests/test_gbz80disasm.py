@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools.gbz80disasm import (
+    ARGUMENT,
+    CALL,
+    CODE,
+    DATA,
+    END,
+    INVALID,
+    JUMP,
+    RELATIVE_OPERAND,
+    RETURN,
+    WORD_OPERAND,
+    Disassembler,
+    LabelTable,
+    decode,
+    opcodes,
+)
+
+class Config(object):
+    path = '.'
+
+def disassemble(code, start=0x4000, **kwargs):
+    disasm = Disassembler(Config())
+    disasm.rom = bytearray(start) + bytearray(code) + bytearray(0x10)
+    return disasm.output_bank_opcodes(start, None, **kwargs)
+
+class TestLabelTable(unittest.TestCase):
+    def test_undefined(self):
+        labels = LabelTable()
+        labels.add(0x4000, '.asm_4000', usage=1)
+        labels.add(0x4001, '.asm_4001', definition=True)
+        self.assertEqual(labels.undefined, set([0x4000]))
+        labels.define(0x4000)
+        self.assertFalse(labels.undefined)
+        self.assertTrue(labels[0x4000]["definition"])
+
+class TestDecode(unittest.TestCase):
+    def test_flow(self):
+        self.assertEqual(opcodes[0xcd].flow, CALL)
+        self.assertEqual(opcodes[0xc3].flow, JUMP | END)
+        self.assertEqual(opcodes[0x20].flow, JUMP)
+        self.assertEqual(opcodes[0xe9].flow, JUMP | END)
+        self.assertEqual(opcodes[0xc9].flow, RETURN | END)
+        self.assertEqual(opcodes[0xd8].flow, RETURN)
+        self.assertEqual(opcodes[0xd3].flow, INVALID)
+        self.assertEqual(opcodes[0x00].flow, 0)
+
+    def test_decode(self):
+        # ld hl, $4321; jr nz, -4; bit 7, a; ld a, [$ff00+$44]; call (cut off)
+        rom = bytearray([0x21, 0x21, 0x43, 0x20, 0xfc, 0xcb, 0x7f, 0xf0, 0x44, 0xcd, 0x00])
+        instructions = list(decode(rom, 0))
+        self.assertEqual([(i.address, i.opcode.byte, i.arg) for i in instructions], [
+            (0, 0x21, 0x4321),
+            (3, 0x20, 1),
+            (5, 0xcb, 0x7f),
+            (7, 0xf0, 0x44),
+        ])
+        self.assertEqual(instructions[0].opcode.operand, WORD_OPERAND)
+        self.assertEqual(instructions[1].opcode.operand, RELATIVE_OPERAND)
+        self.assertEqual([i.address for i in decode(rom, 3, end=7)], [3, 5])
+
+class TestDisassembler(unittest.TestCase):
+    def test_relative_jump(self):
+        # jr nz, .asm_4003; nop; .asm_4003: ret
+        output, offset = disassemble([0x20, 0x01, 0x00, 0xc9])[:2]
+        self.assertEqual(output.split("\n"), [
+            "Func_4000: ; 4000 (1:4000)",
+            "\tjr nz, .asm_4003",
+            "\tnop",
+            ".asm_4003",
+            "\tret",
+            "; 0x4004",
+        ])
+        self.assertEqual(offset, 0x4004)
+
+    def test_data_label(self):
+        # ld hl, .data_4004; ret; .data_4004: db $12
+        code = [0x21, 0x04, 0x40, 0xc9, 0x12]
+        output = disassemble(code, parse_data=True, include_last_address=False)[0]
+        self.assertIn("\tld hl, .data_4004\n", output)
+        self.assertIn(".data_4004\n\tdb $12\n", output)
+
+        # without parse_data, the pointer is left as is
+        output = disassemble(code, include_last_address=False)[0]
+        self.assertIn("\tld hl, $4004\n", output)
+        self.assertNotIn(".data_4004", output)
+
+    def test_indirect_jump(self):
+        # jp hl doesn't end the function: ld a, a; jp hl; ret
+        output = disassemble([0x7f, 0xe9, 0xc9], include_last_address=False)[0]
+        self.assertEqual(output, "Func_4000: ; 4000 (1:4000)\n\tld a, a\n\tjp [hl]\n\tret\n")
+
+    def test_unused_data_label(self):
+        # nothing in this function is at $40, so .data_40 is never defined
+        code = [0xfb, 0x0e, 0xfd, 0x83, 0xea, 0x41, 0x21, 0xf0, 0x67, 0xfa, 0x40, 0x00, 0xc9]
+        output = disassemble(code, parse_data=True, include_last_address=False)[0]
+        self.assertIn("\tld a, [$40]\n", output)
+        self.assertNotIn(".data_40", output)
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        rom = bytearray(0x4000 * 3)
+        # 0:0100: ld a, 2; ld [$2000], a; call $4000; jr @; db $12
+        rom[0x100:0x10b] = bytearray([0x3e, 0x02, 0xea, 0x00, 0x20, 0xcd, 0x00, 0x40, 0x18, 0xfe, 0x12])
+        # 2:4000: ret
+        rom[0x8000] = 0xc9
+        self.disasm = Disassembler(Config())
+        self.disasm.rom = rom
+
+    def test_bank_switch(self):
+        code_map, targets = self.disasm.trace_rom([0x100])
+        self.assertEqual(targets, {0x105: 0x8000, 0x108: 0x108})
+        self.assertEqual(list(code_map[0x100:0x10b]), [
+            CODE, ARGUMENT, CODE, ARGUMENT, ARGUMENT, CODE, ARGUMENT, ARGUMENT, CODE, ARGUMENT, DATA,
+        ])
+        self.assertEqual(code_map[0x8000], CODE)
+        # bank 1 was never switched in
+        self.assertEqual(code_map[0x4000], DATA)
+
+    def test_bank_overwritten(self):
+        rom = self.disasm.rom
+        # ld a, 2; ld a, [hl]; ld [$2000], a; call $4000; jr @
+        rom[0x200:0x20b] = bytearray([0x3e, 0x02, 0x7e, 0xea, 0x00, 0x20, 0xcd, 0x00, 0x40, 0x18, 0xfe])
+        # ld a, 2; call $0300; ld [$2000], a; call $4000; jr @
+        rom[0x210:0x21d] = bytearray([0x3e, 0x02, 0xcd, 0x00, 0x03, 0xea, 0x00, 0x20, 0xcd, 0x00, 0x40, 0x18, 0xfe])
+        # ld a, 2; swap a; ld [$2000], a; call $4000; jr @
+        rom[0x220:0x22d] = bytearray([0x3e, 0x02, 0xcb, 0x37, 0xea, 0x00, 0x20, 0xcd, 0x00, 0x40, 0x18, 0xfe, 0x00])
+        rom[0x300] = 0xc9
+        code_map, targets = self.disasm.trace_rom([0x200, 0x210, 0x220])
+        # a isn't known at the mbc write, so neither is the bank
+        self.assertNotIn(0x206, targets)
+        self.assertNotIn(0x218, targets)
+        self.assertNotIn(0x227, targets)
+        self.assertEqual(code_map[0x8000], DATA)
+
+    def test_output_bank(self):
+        seeds = [0x100]
+        code_map, targets = self.disasm.trace_rom(seeds)
+        labels = self.disasm.get_rom_labels(seeds, code_map, targets)
+        output = self.disasm.output_bank(0, code_map, targets, labels)
+        self.assertIn("\tcall Func_8000\n\nFunc_108: ; 108 (0:108)\n\tjr Func_108\n\tdb $12, $00", output)
+        output = self.disasm.output_bank(2, code_map, targets, labels)
+        self.assertTrue(output.startswith('SECTION "bank2", ROMX[$4000], BANK[$2]\n\nFunc_8000: ; 8000 (2:4000)\n\tret\n'))
+
+    def test_output_rom_jobs(self):
+        paths = [tempfile.mkdtemp() for _ in range(2)]
+        try:
+            outputs = []
+            for path, jobs in zip(paths, (1, 2)):
+                filenames = self.disasm.output_rom(path, seeds=[0x100], jobs=jobs)
+                self.assertEqual([os.path.basename(filename) for filename in filenames], ['bank00.asm', 'bank01.asm', 'bank02.asm'])
+                outputs.append([open(filename).read() for filename in filenames])
+            self.assertEqual(outputs[0], outputs[1])
+        finally:
+            for path in paths:
+                shutil.rmtree(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import sys
+import tempfile
+from io import BytesIO
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools import gfx, png
+from pokemontools.cache import Cache
+from pokemontools.gfx import (
+    condense_tiles_to_map,
+    condense_tiles_to_flipped_map,
+    count_colors,
+    flip_tile,
+    get_pic_animation,
+    get_png_lines,
+    png_to_2bpp,
+    quantize,
+    test_condense_tiles_to_map,
+    x_flip,
+    y_flip,
+)
+
+class TestCondenseTiles(unittest.TestCase):
+    def test_condense_tiles_to_map(self):
+        test_condense_tiles_to_map()
+
+    def test_unhashable_tiles(self):
+        tiles = [[1] * 16, [2] * 16, [1] * 16]
+        self.assertEqual(condense_tiles_to_map(tiles), ([[1] * 16, [2] * 16], [0, 1, 0]))
+
+    def test_flip_tile(self):
+        tile = list(range(16))
+        self.assertEqual(flip_tile(flip_tile(tile, x_flip), x_flip), tile)
+        self.assertEqual(flip_tile(tile, y_flip)[:2], [14, 15])
+        self.assertEqual(flip_tile(tile, x_flip)[1], 0x80)
+
+    def test_flipped_map(self):
+        tile = list(range(16))
+        tiles = [
+            tile,
+            flip_tile(tile, x_flip),
+            flip_tile(tile, y_flip),
+            [0] * 16,
+            flip_tile(tile, x_flip | y_flip),
+        ]
+        new_tiles, tilemap, attrmap = condense_tiles_to_flipped_map(tiles)
+        self.assertEqual(new_tiles, [tile, [0] * 16])
+        self.assertEqual(tilemap, [0, 0, 0, 1, 0])
+        self.assertEqual(attrmap, [0, x_flip, y_flip, 0, x_flip | y_flip])
+
+    def test_pic_animation(self):
+        frame_text, bitmask_text = get_pic_animation([0, 1, 2, 3, 0, 5, 2, 3, 4, 1, 2, 3], 2, 2)
+        self.assertIn('db $05', frame_text)
+        self.assertIn('db $01 ; bitmask', frame_text)
+        self.assertEqual(bitmask_text.count('db %'), 2)
+
+class TestPngLines(unittest.TestCase):
+    def test_tile_rows(self):
+        # two tile rows of one tile each: color 1, then color 2
+        image = bytearray([0xff, 0x00] * 8 + [0x00, 0xff] * 8)
+        lines = list(get_png_lines(image, 8, 16))
+        self.assertEqual(lines, [bytearray([1] * 8)] * 8 + [bytearray([2] * 8)] * 8)
+
+    def test_greyscale(self):
+        image = bytearray([0xff, 0x00] * 8)
+        lines = list(get_png_lines(image, 8, 8, greyscale=True))
+        self.assertEqual(lines, [bytearray([2] * 8)] * 8)
+
+class TestPngTo2bpp(unittest.TestCase):
+    def test_round_trip(self):
+        image = bytearray([0xff, 0x00] * 8 + [0x00, 0xff] * 8 + [0xff, 0xff] * 8 + [0x00, 0x00] * 8)
+        f = BytesIO()
+        png.Writer(8, 32, greyscale=True, bitdepth=2).write(f, get_png_lines(image, 8, 32, greyscale=True))
+        f.seek(0)
+
+        # count the decodes
+        reader = png.Reader
+        readers = []
+        def counting_reader(*args, **kwargs):
+            readers.append(reader(*args, **kwargs))
+            return readers[-1]
+        png.Reader = counting_reader
+        try:
+            output, arguments = png_to_2bpp(f)
+        finally:
+            png.Reader = reader
+
+        self.assertEqual(output, image)
+        self.assertEqual(len(readers), 1)
+        self.assertEqual(arguments['palette'][1], {'r': 0xaa, 'g': 0xaa, 'b': 0xaa, 'a': 0xff})
+
+class TestQuantize(unittest.TestCase):
+    def test_count_colors(self):
+        red, blue = (0xff, 0, 0, 0xff), (0, 0, 0xff, 0xff)
+        colors, counts = count_colors([[blue, red], [red, red]])
+        self.assertEqual(colors, [blue, red])
+        self.assertEqual(counts[red], 3)
+
+    def get_palette(self, colors):
+        colors, counts = count_colors([colors])
+        return quantize(colors, counts)
+
+    def test_small_palette(self):
+        red = (0xff, 0, 0, 0xff)
+        palette, color_ids = self.get_palette([red, red])
+        self.assertEqual(len(palette), 4)
+        self.assertEqual(palette[color_ids[red]], {'r': 0xff, 'g': 0, 'b': 0, 'a': 0xff})
+        self.assertEqual(palette[0], {'r': 0xff, 'g': 0xff, 'b': 0xff, 'a': 0xff})
+
+    def test_nearest_shade(self):
+        colors = [
+            (0xff, 0xff, 0xff, 0xff),
+            (0xf0, 0xf0, 0xf0, 0xff),
+            (0xa0, 0xa0, 0xb0, 0xff),
+            (0x50, 0x60, 0x50, 0xff),
+            (0x08, 0x00, 0x00, 0xff),
+            (0x08, 0x00, 0x00, 0xff),
+        ]
+        palette, color_ids = self.get_palette(colors)
+        self.assertEqual([color_ids[color] for color in colors], [0, 0, 1, 2, 3, 3])
+        self.assertEqual(palette[3], {'r': 0x08, 'g': 0, 'b': 0, 'a': 0xff})
+
+    def test_transparent(self):
+        colors = [(0, 0, 0, 0), (0, 0, 0, 0xff), (1, 1, 1, 0xff), (2, 2, 2, 0xff), (3, 3, 3, 0xff)]
+        palette, color_ids = self.get_palette(colors)
+        self.assertEqual(color_ids[(0, 0, 0, 0)], 0)
+
+class TestConvertFilesCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.lz_cache = gfx.lz_cache
+        gfx.lz_cache = Cache(os.path.join(self.path, 'lz'))
+        self.filenames = []
+        for i in range(2):
+            filename = os.path.join(self.path, '{}.2bpp'.format(i))
+            with open(filename, 'wb') as f:
+                f.write(bytearray([i] * 0x40))
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        gfx.lz_cache = self.lz_cache
+        shutil.rmtree(self.path)
+
+    def test_no_cache(self):
+        for jobs in (1, 2):
+            gfx.convert_files('lz', self.filenames, jobs=jobs, use_cache=False)
+            self.assertEqual(gfx.lz_cache.get_entries(), [])
+        self.assertTrue(os.path.exists(self.filenames[0] + '.lz'))
+
+    def test_cache(self):
+        gfx.convert_files('lz', self.filenames, jobs=2)
+        self.assertEqual(len(gfx.lz_cache.get_entries()), 2)
+
+    def test_lz_compress(self):
+        data = bytearray([1, 2, 3] * 0x20)
+        cached = gfx.lz_compress(data)
+        self.assertIsInstance(cached, bytearray)
+        self.assertEqual(gfx.lz_compress(data), cached)
+        gfx.lz_cache = None
+        uncached = gfx.lz_compress(data)
+        self.assertIsInstance(uncached, bytearray)
+        self.assertEqual(uncached, cached)
+
+    def test_failures(self):
+        missing = os.path.join(self.path, 'missing.2bpp')
+        stderr = sys.stderr
+        for jobs in (1, 2):
+            for filenames in ([missing], [missing] + self.filenames):
+                sys.stderr = StringIO()
+                try:
+                    failed = gfx.convert_files('lz', filenames, jobs=jobs)
+                    output = sys.stderr.getvalue()
+                finally:
+                    sys.stderr = stderr
+                self.assertEqual(failed, [missing])
+                self.assertIn(missing, output)
+        self.assertTrue(os.path.exists(self.filenames[-1] + '.lz'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools.lz import (
+    Compressed,
+    Decompressed,
+    LookbackIndex,
+    bit_flipped,
+)
+
+from random_data import random_bytes
+
+def make_tiles(seed=0, size=0x400):
+    """
+    Some random data that is full of repeats, flips and reversals, like real 2bpp.
+    """
+    rng = random.Random(seed)
+    data = bytearray()
+    while len(data) < size:
+        if len(data) > 0x10 and rng.random() < 0.4:
+            start = rng.randrange(len(data))
+            chunk = data[start : start + rng.randrange(4, 0x20)]
+            mutation = rng.choice(['repeat', 'flip', 'reverse'])
+            if mutation == 'flip':
+                chunk = bytearray(bit_flipped[byte] for byte in chunk)
+            elif mutation == 'reverse':
+                chunk = chunk[::-1]
+            data += chunk
+        else:
+            data += random_bytes(rng.randrange(1, 8), rng)
+    return data[:size]
+
+class TestLookbackIndex(unittest.TestCase):
+    def test_repeat(self):
+        data = bytearray([1, 2, 3, 4, 5, 9, 1, 2, 3, 4, 5])
+        index = LookbackIndex(data)
+        self.assertEqual(index.find('repeat', 6), (5, 0))
+        self.assertEqual(index.find('repeat', 0), (0, None))
+
+    def test_flip(self):
+        data = bytearray([1, 2, 3, 4, 9])
+        data += bytearray(bit_flipped[byte] for byte in data[:4])
+        index = LookbackIndex(data)
+        self.assertEqual(index.find('flip', 5), (4, 0))
+
+    def test_reverse(self):
+        data = bytearray([1, 2, 3, 4, 9, 4, 3, 2, 1])
+        index = LookbackIndex(data)
+        self.assertEqual(index.find('reverse', 5), (4, 3))
+
+    def test_prefers_nearest(self):
+        data = bytearray([1, 2, 3, 4]) * 3
+        index = LookbackIndex(data)
+        self.assertEqual(index.find('repeat', 8), (4, 4))
+
+class TestCompressed(unittest.TestCase):
+    def test_round_trip(self):
+        for seed in range(4):
+            data = make_tiles(seed)
+            lz = Compressed(data).output
+            self.assertEqual(bytearray(Decompressed(lz).output), data)
+
+    def test_uses_lookbacks(self):
+        data = make_tiles()
+        self.assertLess(len(Compressed(data).output), len(data))
+
+    def test_optimal(self):
+        for seed in range(4):
+            data = make_tiles(seed)
+            lz = Compressed(data, optimal=True).output
+            self.assertLessEqual(len(lz), len(Compressed(data).output))
+            self.assertEqual(bytearray(Decompressed(lz).output), data)
+
+    def test_optimal_runs(self):
+        data = bytearray(0x800) + bytearray([1, 2] * 0x30) + bytearray([3] * 0x21)
+        lz = Compressed(data, optimal=True).output
+        # two long blanks, a long alternate and a long iterate
+        self.assertEqual(len(lz), 2 + 2 + 4 + 3 + 1)
+        self.assertEqual(bytearray(Decompressed(lz).output), data)
+
+    def test_blank(self):
+        data = bytearray(0x800)
+        lz = Compressed(data).output
+        self.assertLess(len(lz), 0x10)
+        self.assertEqual(bytearray(Decompressed(lz).output), data)
+
+class TestDecompressed(unittest.TestCase):
+    def test_overlapping_repeat(self):
+        # literal 1 2 3, then repeat 7 from 3 back
+        lz = bytearray([0x02, 1, 2, 3, 0x86, 0x82, 0xff])
+        self.assertEqual(Decompressed(lz).output, bytearray([1, 2, 3] * 3 + [1]))
+
+    def test_overlapping_flip(self):
+        # literal 1, then flip 3 from 1 back
+        lz = bytearray([0x00, 1, 0xa2, 0x80, 0xff])
+        self.assertEqual(Decompressed(lz).output, bytearray([1, 0x80, 1, 0x80]))
+
+    def test_reverse(self):
+        # literal 1 2 3, then reverse 3 from the last byte
+        lz = bytearray([0x02, 1, 2, 3, 0xc2, 0x80, 0xff])
+        self.assertEqual(Decompressed(lz).output, bytearray([1, 2, 3, 3, 2, 1]))
+
+    def test_rom_offset(self):
+        data = make_tiles()
+        lz = bytearray(Compressed(data).output)
+        rom = bytearray(0x100) + lz + bytearray(0x100)
+        for source in (rom, bytes(rom)):
+            de = Decompressed(source, start=0x100)
+            self.assertEqual(de.output, data)
+            self.assertEqual(de.compressed_data, lz)
+            self.assertEqual(de.compressed_length, len(lz))
+
+    def test_command_list(self):
+        lz = Compressed(make_tiles()).output
+        self.assertEqual(Decompressed(lz).used_commands, [])
+        self.assertTrue(Decompressed(lz, debug=True).used_commands)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools import pcm
+
+class TestPcm(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_round_trip(self):
+        data = bytes(bytearray(range(0x100)) * 3)
+        filename = os.path.join(self.path, 'test.pcm')
+        with open(filename, 'wb') as f:
+            f.write(data)
+        pcm.convert_to_wav([filename])
+        os.remove(filename)
+        pcm.convert_to_pcm([os.path.join(self.path, 'test.wav')])
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_unpack_samples(self):
+        frames = b''.join(struct.pack('<i', n)[:3] * 2 for n in (0, 1, -1, 0x7fffff, -0x800000))
+        samples = pcm.unpack_samples(frames, 3, 2)
+        self.assertEqual(list(samples), [0, 1, -1, 0x7fffff, -0x800000])
+
+        frames = struct.pack('<4h', 1, 2, -3, 4)
+        self.assertEqual(list(pcm.unpack_samples(frames, 2, 2)), [1, -3])
+
+    def test_resample(self):
+        indexes, index = pcm.get_resample_indexes(0, 0, 10, 2.5)
+        self.assertEqual(list(indexes), [0, 2, 5, 7])
+        indexes, index = pcm.get_resample_indexes(index, 10, 10, 2.5)
+        self.assertEqual(list(indexes), [0, 2, 5, 7])
+
+if __name__ == "__main__":
+    unittest.main()
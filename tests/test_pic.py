@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools.pic import (
+    BitReader,
+    BitWriter,
+    Compressor,
+    convert_files,
+    decompress,
+)
+
+from random_data import random_bytes
+
+def random_pic(seed=0, size=7):
+    return random_bytes(size * size * 0x10, seed, common=[0, 0, 0, 0xff, 0x3c])
+
+class TestBitstream(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(0)
+        fields = [(rng.getrandbits(n), n) for n in [rng.randrange(1, 70) for _ in range(100)]]
+        writer = BitWriter()
+        for n, count in fields:
+            writer.write(n, count)
+        data = writer.getvalue()
+        self.assertEqual(len(data), (writer.length + 7) // 8)
+        for source in (data, io.BytesIO(bytes(data))):
+            reader = BitReader(source)
+            self.assertEqual([(reader.read(count), count) for n, count in fields], fields)
+
+    def test_read_unary(self):
+        reader = BitReader(bytearray([0xfe, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xf0]))
+        self.assertEqual(reader.read_unary(), 7)
+        self.assertEqual(reader.read_unary(), 60)
+        self.assertEqual(reader.read(3), 0)
+        self.assertRaises(EOFError, reader.read, 1)
+
+class TestPic(unittest.TestCase):
+    def test_round_trip(self):
+        for seed in range(3):
+            image = random_pic(seed)
+            compressor = Compressor(image)
+            compressor.compress()
+            pic = bytes(bytearray(compressor.data))
+            self.assertEqual(decompress(io.BytesIO(pic)), image)
+
+    def test_smallest_mode(self):
+        compressor = Compressor(random_pic())
+        compressor.compress()
+        self.assertEqual(sorted(compressor.sizes), sorted(Compressor.modes))
+        smallest = min(compressor.sizes.values())
+        self.assertEqual(compressor.sizes[(compressor.mode, compressor.order)], smallest)
+        self.assertEqual(len(compressor.data), (smallest + 7) // 8)
+
+class TestConvertFiles(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'pic.2bpp')
+        with open(self.filename, 'wb') as f:
+            f.write(random_pic(size=5))
+        self.missing = os.path.join(self.path, 'missing.2bpp')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_failures(self):
+        stderr = sys.stderr
+        for jobs in (1, 2):
+            reported = []
+            sys.stderr = StringIO()
+            try:
+                failed = convert_files('compress', [self.missing, self.filename], jobs=jobs,
+                                       report=lambda filename, sizes: reported.append(filename))
+            finally:
+                sys.stderr = stderr
+            self.assertEqual(failed, [self.missing])
+            self.assertEqual(reported, [self.filename])
+            self.assertTrue(os.path.exists(os.path.join(self.path, 'pic.pic')))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import random
+import zlib
+from array import array
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools import png
+
+from random_data import random_bytes
+
+def random_lines(seed=0, width=24, height=8):
+    rng = random.Random(seed)
+    return [array('B', random_bytes(width, rng, common=[0, 0xff])) for _ in range(height)]
+
+class TestFilters(unittest.TestCase):
+    def undo(self, filtered, fo, previous):
+        reader = png.Reader(bytes=b'')
+        reader.psize = fo
+        return reader.undo_filter(filtered[0], filtered[1:], previous)
+
+    def test_round_trip(self):
+        for fo in (1, 3, 4):
+            lines = random_lines(fo)
+            for filter_type in range(5):
+                prev = None
+                for line in lines:
+                    filtered = png.filter_scanline(filter_type, line, fo, prev)
+                    self.assertEqual(filtered[0], filter_type)
+                    self.assertEqual(list(self.undo(filtered, fo, prev)), list(line))
+                    prev = line
+
+    def test_choose_filter(self):
+        line = array('B', range(0x40))
+        filtered = png.choose_filter((0, 1), line, 1, compressor=zlib.compressobj())
+        # a ramp compresses best as a run of 1s
+        self.assertEqual(list(filtered), [1] + [0] + [1] * 0x3f)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools.romimage import (
+    RomImage,
+    load_rom_image,
+    rom_images,
+)
+
+class TestRomImage(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'baserom.gbc')
+        data = bytearray(0x4000 * 3)
+        # 0:0100: dw $4002; db 2, $34, $52
+        data[0x100:0x105] = bytearray([0x02, 0x40, 0x02, 0x34, 0x52])
+        # 1:4010: dw $4020, $0150
+        data[0x4010:0x4014] = bytearray([0x20, 0x40, 0x50, 0x01])
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+        self.rom = RomImage.open(self.filename)
+
+    def tearDown(self):
+        rom_images.clear()
+        shutil.rmtree(self.path)
+
+    def test_accessors(self):
+        self.assertEqual(len(self.rom), 0xc000)
+        self.assertEqual(self.rom[0x100], 0x02)
+        self.assertEqual(self.rom.u8(0x101), 0x40)
+        self.assertEqual(self.rom.le16(0x100), 0x4002)
+        self.assertEqual(self.rom.view(0x100, 0x103).tobytes(), b'\x02\x40\x02')
+
+    def test_interval(self):
+        self.assertEqual(self.rom.interval(0x100, 3, strings=False), [0x02, 0x40, 0x02])
+        self.assertEqual(self.rom.interval(0x100, 3), ['0x2', '0x40', '0x2'])
+        self.assertEqual(self.rom.until(0x100, 0x34, strings=False), [0x02, 0x40, 0x02])
+
+    def test_pointers(self):
+        # a home bank pointer into romx needs a bank
+        self.assertEqual(self.rom.pointer(0x100), 0x4002)
+        self.assertEqual(self.rom.pointer(0x100, bank=2), 0x8002)
+        self.assertEqual(self.rom.banked_pointer(0x102), 0x9234)
+        # pointers in romx are in the same bank by default
+        self.assertEqual(self.rom.pointer(0x4010), 0x4020)
+        self.assertEqual(self.rom.pointer(0x4012), 0x150)
+
+    def test_shared(self):
+        rom = load_rom_image(self.filename)
+        self.assertIs(load_rom_image(os.path.join(self.path, '.', 'baserom.gbc')), rom)
+        self.assertIs(pickle.loads(pickle.dumps(rom)), rom)
+
+    def test_empty(self):
+        filename = os.path.join(self.path, 'empty.gbc')
+        open(filename, 'wb').close()
+        rom = load_rom_image(filename)
+        self.assertIsInstance(rom, RomImage)
+        self.assertEqual(len(rom), 0)
+        self.assertEqual(rom.interval(0, 4), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pokemontools import cache
+from pokemontools import sym
+from pokemontools.sym import (
+    SymbolIndex,
+    parse_symfile,
+    read_symfile,
+)
+
+symfile = """\
+00:0150 Start
+00:0150 Start.alias
+01:4000 Bank1Func
+02:4000 Bank2Func
+02:4100 Bank2Func.loop
+00:c000 wStart
+01:d000 wBank1Thing
+02:d000 wBank2Thing
+"""
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        filename = os.path.join(self.path, 'test.sym')
+        with open(filename, 'w') as f:
+            f.write(symfile)
+        self.index_labels = parse_symfile(filename)
+        self.index = SymbolIndex(self.index_labels)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get(self):
+        self.assertEqual(self.index.get(0, 0x150), 'Start')
+        # rom0 is the same from any bank
+        self.assertEqual(self.index.get(5, 0x150), 'Start')
+        self.assertEqual(self.index.get(2, 0x4000), 'Bank2Func')
+        self.assertEqual(self.index.get(3, 0x4000), None)
+        self.assertEqual(self.index.get(2, 0xd000), 'wBank2Thing')
+
+    def test_addresses(self):
+        self.assertEqual(self.index.get_absolute(0x8000), 'Bank2Func')
+        self.assertEqual(self.index.get_address('Bank2Func.loop'), 0x8100)
+        self.assertEqual(self.index.get_bank_address('Bank2Func.loop'), (2, 0x4100))
+        self.assertEqual(self.index.get_address('Missing'), None)
+        self.assertEqual(self.index.get_unbanked(0xd000), 'wBank1Thing')
+        self.assertIn('wStart', self.index)
+        self.assertEqual(len(self.index), 8)
+
+    def test_preceding(self):
+        self.assertEqual(self.index.get_preceding(2, 0x40ff), (0x4000, 'Bank2Func'))
+        self.assertEqual(self.index.get_preceding(2, 0x4100), (0x4100, 'Bank2Func.loop'))
+        self.assertEqual(self.index.get_preceding(1, 0x7fff), (0x4000, 'Bank1Func'))
+        self.assertEqual(self.index.get_preceding(0, 0x100), None)
+
+    def test_iter(self):
+        self.assertEqual(list(self.index)[:3], [
+            (0, 0x150, 'Start'),
+            (0, 0xc000, 'wStart'),
+            (1, 0x4000, 'Bank1Func'),
+        ])
+
+    def test_precedence(self):
+        self.assertEqual(self.index.get_absolute(0x150), 'Start')
+        self.assertEqual(self.index.get_unbanked(0x150), 'Start')
+        index = SymbolIndex(self.index_labels, first_wins=False)
+        self.assertEqual(index.get(0, 0x150), 'Start.alias')
+        self.assertEqual(index.get_absolute(0x150), 'Start.alias')
+        self.assertEqual(index.get_unbanked(0xd000), 'wBank2Thing')
+        # both names still resolve
+        self.assertEqual(index.get_address('Start'), 0x150)
+        self.assertEqual(index.get_address('Start.alias'), 0x150)
+
+class TestSymbolCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'test.sym')
+        with open(self.filename, 'w') as f:
+            f.write(symfile)
+        self.symbol_cache = sym.symbol_cache
+        sym.symbol_cache = cache.Cache(os.path.join(self.path, 'cache'))
+
+    def tearDown(self):
+        sym.symbol_cache = self.symbol_cache
+        shutil.rmtree(self.path)
+
+    def test_round_trip(self):
+        labels = parse_symfile(self.filename)
+        self.assertEqual(read_symfile(self.filename), labels)
+        self.assertEqual(len(sym.symbol_cache.get_entries()), 1)
+        self.assertEqual(read_symfile(self.filename), labels)
+        self.assertEqual(len(sym.symbol_cache.get_entries()), 1)
+
+    def test_changed(self):
+        read_symfile(self.filename)
+        with open(self.filename, 'a') as f:
+            f.write('03:4000 Bank3Func\n')
+        labels = read_symfile(self.filename)
+        self.assertEqual(labels[-1]['label'], 'Bank3Func')
+        self.assertEqual(labels[-1]['address'], 0xc000)
+        self.assertEqual(len(sym.symbol_cache.get_entries()), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import os
+import shutil
+import tempfile
 from copy import copy
 import hashlib
+import pickle
 import random
 import json
 
+from pokemontools import cache
+from pokemontools import crystal
 from pokemontools.interval_map import IntervalMap
 from pokemontools.chars import chars, jap_chars
 
@@ -274,6 +279,142 @@ class TestIntervalMap(unittest.TestCase):
         self.assertEqual(results[0], ((0, 5), "hello world"))
         self.assertEqual(results[1], ((5, 10), "testing 123"))
 
+    def test_overwrite(self):
+        i = IntervalMap()
+        i[0:10] = "outer"
+        i[4:6] = "inner"
+        self.assertEqual(list(i.items()), [
+            ((0, 4), "outer"),
+            ((4, 6), "inner"),
+            ((6, 10), "outer"),
+        ])
+        i[2:8] = None
+        self.assertEqual(i[5], None)
+        self.assertEqual(list(i.items()), [((0, 2), "outer"), ((8, 10), "outer")])
+
+    def test_overlapping(self):
+        i = IntervalMap()
+        i.chunk_size = 2
+        for start in range(0, 100, 10):
+            i[start:start + 5] = start
+        self.assertEqual(list(i.values()), list(range(0, 100, 10)))
+        self.assertEqual(list(i.overlapping(25, 41)), [
+            ((30, 35), 30),
+            ((40, 45), 40),
+        ])
+        i[None:12] = "low"
+        self.assertEqual(i[-100], "low")
+        # the interval hanging over the end is trimmed
+        self.assertEqual(i[12], 10)
+        self.assertEqual(list(i.items())[:3], [((None, 12), "low"), ((12, 15), 10), ((20, 25), 20)])
+
+class TestParsedRomCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.parse_rom_cache = crystal.parse_rom_cache
+        crystal.parse_rom_cache = cache.Cache(self.path)
+
+    def tearDown(self):
+        crystal.parse_rom_cache = self.parse_rom_cache
+        del crystal.all_texts[:]
+        crystal.script_parse_table[0x100:0x110] = None
+        crystal.trainer_group_maximums.clear()
+        shutil.rmtree(self.path)
+
+    def test_key(self):
+        self.assertEqual(crystal.get_parse_rom_key(b"rom"), crystal.get_parse_rom_key(b"rom"))
+        self.assertNotEqual(crystal.get_parse_rom_key(b"rom"), crystal.get_parse_rom_key(b"rom2"))
+
+    def test_dependency_changes_key(self):
+        # a copy of the package, so that one of crystal's dependencies can be edited
+        package = os.path.join(self.path, "pokemontools")
+        shutil.copytree(crystal.parser_source_path, package, ignore=shutil.ignore_patterns("*.pyc", "__pycache__"))
+        parser_source_path = crystal.parser_source_path
+        crystal.parser_source_path = package
+        try:
+            key = crystal.get_parse_rom_key(b"rom")
+            self.assertEqual(crystal.get_parse_rom_key(b"rom"), key)
+            with open(os.path.join(package, "pksv.py"), "a") as f:
+                f.write("\n# a new command\n")
+            self.assertNotEqual(crystal.get_parse_rom_key(b"rom"), key)
+        finally:
+            crystal.parser_source_path = parser_source_path
+
+    def test_round_trip(self):
+        texts = crystal.all_texts
+        texts.append({"label": "TestText"})
+        crystal.script_parse_table[0x100:0x110] = "parsed"
+        crystal.trainer_group_maximums[1] = set([2])
+        self.assertTrue(crystal.save_parsed_rom("key"))
+
+        del texts[:]
+        crystal.script_parse_table[0x100:0x110] = None
+        crystal.trainer_group_maximums.clear()
+        self.assertFalse(crystal.load_parsed_rom("missing"))
+        self.assertTrue(crystal.load_parsed_rom("key"))
+
+        # restored in place
+        self.assertIs(crystal.all_texts, texts)
+        self.assertEqual(texts, [{"label": "TestText"}])
+        self.assertEqual(crystal.script_parse_table[0x105], "parsed")
+        self.assertEqual(crystal.script_parse_table[0x110], None)
+        self.assertIs(crystal.Command.trainer_group_maximums, crystal.trainer_group_maximums)
+        self.assertEqual(crystal.trainer_group_maximums, {1: set([2])})
+
+    def test_deep_graph(self):
+        # parsed objects refer to each other, so pickle recurses through the whole chain
+        label = {"label": "End"}
+        for i in range(5000):
+            label = crystal.Label(name="Label%d" % i, address=0x100, object=label, add_to_globals=False)
+        crystal.all_texts.append(label)
+        self.assertTrue(crystal.save_parsed_rom("key"))
+        del crystal.all_texts[:]
+        self.assertTrue(crystal.load_parsed_rom("key"))
+        label = crystal.all_texts[0]
+        for i in range(5000):
+            label = label.object
+        self.assertEqual(label, {"label": "End"})
+
+    def test_stale_interval_map(self):
+        crystal.script_parse_table[0x100:0x110] = "parsed"
+        self.assertTrue(crystal.save_parsed_rom("key"))
+        crystal.script_parse_table[0x100:0x110] = None
+
+        # an IntervalMap pickled before its internals changed
+        class OldIntervalMap(object):
+            pass
+        data = pickle.loads(bytes(crystal.parse_rom_cache.get("key")))
+        old_map = OldIntervalMap()
+        old_map._bounds, old_map._items, old_map._upperitem = [0x100, 0x110], [None, "parsed"], None
+        old_map.__class__ = crystal.interval_map.IntervalMap
+        data["script_parse_table"] = old_map
+        crystal.parse_rom_cache.set("key", pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+        self.assertFalse(crystal.load_parsed_rom("key"))
+        self.assertEqual(crystal.script_parse_table[0x105], None)
+
+class TestCommandTable(unittest.TestCase):
+    def test_families(self):
+        for classes in (crystal.command_classes, crystal.movement_command_classes, crystal.music_classes):
+            table = crystal.get_command_table(classes)
+            self.assertEqual(len(table), 0x100)
+            self.assertIs(crystal.get_command_table(classes), table)
+            for class_ in classes:
+                self.assertIs(table[class_.id], class_)
+        self.assertIs(crystal.command_table, crystal.get_command_table(crystal.command_classes))
+
+    def test_ids(self):
+        class First(object):
+            id = 1
+        class Second(object):
+            id = 1
+        class Several(object):
+            id = [2, 3]
+        table = crystal.get_command_table([("First", First), ("Second", Second), ("Several", Several)])
+        # like the linear search, the last class with an id wins
+        self.assertIs(table[1], Second)
+        self.assertEqual(table[2:5], [Several, Several, None])
+
 class TestRomStr(unittest.TestCase):
     """RomStr is a class that should act exactly like str()
     except that it never shows the contents of it string
@@ -576,6 +717,25 @@ class TestLabel(unittest.TestCase):
         self.assertEqual(l.name, label_name)
         self.assertEqual(l.address, address)
 
+    def test_command_label(self):
+        class NoParamCommand(crystal.Command):
+            id = 0x00
+            macro_name = "noparams"
+            param_types = {}
+
+        old_rom = crystal.rom
+        crystal.rom = bytearray(0x200)
+        try:
+            count = len(crystal.all_new_labels)
+            command = NoParamCommand(address=0x150)
+            # labels are only made when asked for
+            self.assertEqual(len(crystal.all_new_labels), count)
+            self.assertEqual(command.label.name, "UnseenLabel_0x150")
+            self.assertIs(command.label.object, command)
+            self.assertEqual(len(crystal.all_new_labels), count + 1)
+        finally:
+            crystal.rom = old_rom
+
 # run the unit tests when this file is executed directly
 if __name__ == "__main__":
     unittest.main()